@@ -0,0 +1,69 @@
+"""
+Protocolo binario de frames para el WebSocket /ws.
+
+Evita enviar JPEG como base64 dentro de JSON (~33% más grande y dos copias
+extra por frame). Cada mensaje binario tiene la forma:
+
+    +-------+---------+------+-------------+-------------+---------------+
+    | "NT"  | versión | tipo | largo meta  | meta (JSON) | JPEG crudo    |
+    | 2 B   | 1 B     | 1 B  | 4 B (BE)    | N bytes     | resto         |
+    +-------+---------+------+-------------+-------------+---------------+
+
+- Tipo 1 (cliente → servidor): frame de cámara. La meta lleva los mismos
+  campos que el mensaje JSON ``image_stream`` (``session_id``, ``camera_active``...).
+- Tipo 2 (servidor → cliente): resultado del análisis. La meta es el mismo
+  objeto ``realtime_analysis`` del modo JSON, sin ``annotated_image``; el
+  JPEG anotado va como payload (vacío si no hay imagen).
+"""
+import json
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+MAGIC = b"NT"
+VERSION = 1
+
+KIND_CAMERA_FRAME = 1
+KIND_ANALYSIS_FRAME = 2
+
+_HEADER = struct.Struct(">2sBBI")
+HEADER_SIZE = _HEADER.size
+
+
+class FrameProtocolError(ValueError):
+    """Mensaje binario mal formado"""
+
+
+def pack_frame(kind: int, meta: Optional[Dict[str, Any]] = None, payload: bytes = b"") -> bytes:
+    """Serializa un frame binario (cabecera + meta JSON + payload)"""
+    meta_bytes = json.dumps(meta or {}, separators=(",", ":")).encode("utf-8")
+    return b"".join((_HEADER.pack(MAGIC, VERSION, kind, len(meta_bytes)), meta_bytes, payload))
+
+
+def unpack_frame(data: bytes) -> Tuple[int, Dict[str, Any], memoryview]:
+    """
+    Parsea un frame binario.
+
+    Returns:
+        (tipo, meta, payload) - el payload es una vista sin copia sobre ``data``
+    """
+    if len(data) < HEADER_SIZE:
+        raise FrameProtocolError("Frame binario demasiado corto")
+
+    magic, version, kind, meta_len = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise FrameProtocolError("Cabecera inválida (magic)")
+    if version != VERSION:
+        raise FrameProtocolError(f"Versión de protocolo no soportada: {version}")
+
+    meta_end = HEADER_SIZE + meta_len
+    if meta_end > len(data):
+        raise FrameProtocolError("Largo de meta fuera de rango")
+
+    view = memoryview(data)
+    try:
+        meta = json.loads(bytes(view[HEADER_SIZE:meta_end]).decode("utf-8")) if meta_len else {}
+    except (UnicodeDecodeError, ValueError) as e:
+        raise FrameProtocolError(f"Meta JSON inválida: {e}") from e
+    if not isinstance(meta, dict):
+        raise FrameProtocolError("La meta debe ser un objeto JSON")
+    return kind, meta, view[meta_end:]
@@ -2,16 +2,25 @@ from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from api.routers import asr, cv, productos, sesiones, recomendaciones, analytics, busqueda, tracking, visualization, shifts, product_detail, search_analytics, dashboard, calificaciones, calificaciones_grupo, compra, demo, demo_simple, visualization_session, session_control
-from services.ai.real_detection import analyze_realtime_stream_real
+from services.ai.model_pool import mediapipe_pool
+from services.ai.cv_workers import cv_worker_pool
+from services.asr.model_registry import asr_models, PRELOAD as ASR_PRELOAD
+from services.asr.scheduler import asr_scheduler
 from services.nlu.heuristics import extract_intent_advanced
 from services.shift_manager import ShiftManager
+from services.pipeline_manager import pipeline_manager
 from services.cron_jobs import start_cron_jobs, stop_cron_jobs
 from database.database import SessionLocal
 from database import models
+from api.frame_protocol import (
+    VERSION as FRAME_PROTOCOL_VERSION, KIND_CAMERA_FRAME, KIND_ANALYSIS_FRAME,
+    FrameProtocolError, pack_frame, unpack_frame
+)
 import json
+import base64
 import asyncio
 from datetime import datetime
-from typing import List
+from typing import Dict, List, Optional, Union
 
 app = FastAPI(title="NeoTotem API - Tiempo Real con MediaPipe")
 
@@ -22,11 +31,26 @@ async def startup_event():
     start_cron_jobs()
     print("✅ Sistema de cron jobs iniciado")
 
+    # Pre-calentar grafos MediaPipe para que el primer frame no pague la carga
+    await asyncio.get_running_loop().run_in_executor(None, mediapipe_pool.warmup)
+    print(f"✅ Pool MediaPipe pre-calentado: {mediapipe_pool.stats()}")
+
+    # Procesos de análisis de visión (cada uno con sus propios grafos)
+    await cv_worker_pool.start()
+    print(f"✅ Workers de visión listos: {cv_worker_pool.stats()}")
+
+    # Modelo ASR en segundo plano: la app atiende mientras carga (/asr/ready responde 503)
+    if ASR_PRELOAD:
+        app.state.asr_preload = asyncio.create_task(asr_models.preload())
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Detiene el sistema de tareas programadas al cerrar la app"""
     stop_cron_jobs()
     print("🛑 Sistema de cron jobs detenido")
+    mediapipe_pool.close()
+    cv_worker_pool.shutdown()
+    asr_scheduler.shutdown()
 
 # Agregar CORS
 app.add_middleware(
@@ -128,11 +152,13 @@ class ConnectionManager:
     def __init__(self):
         self.active_connections: List[WebSocket] = []
         self.last_broadcast_time = {}  # Control de throttling por conexión
+        self.client_options = {}  # Preferencias de protocolo por conexión
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
         self.active_connections.append(websocket)
         self.last_broadcast_time[id(websocket)] = 0  # Inicializar timestamp
+        self.client_options[id(websocket)] = {"binary_frames": False, "annotations": "image"}
 
     def disconnect(self, websocket: WebSocket):
         self.active_connections.remove(websocket)
@@ -140,6 +166,18 @@ class ConnectionManager:
         ws_id = id(websocket)
         if ws_id in self.last_broadcast_time:
             del self.last_broadcast_time[ws_id]
+        self.client_options.pop(ws_id, None)
+
+    def set_options(self, websocket: WebSocket, **options):
+        """Actualiza las preferencias de protocolo de una conexión"""
+        self.client_options.setdefault(id(websocket), {}).update(options)
+
+    def wants_annotations(self, mode: str) -> bool:
+        """True si alguna conexión activa pide anotaciones en ``mode`` ("image"/"overlay")"""
+        return any(
+            self.client_options.get(id(connection), {}).get("annotations", "image") == mode
+            for connection in self.active_connections
+        )
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         try:
@@ -152,6 +190,51 @@ class ConnectionManager:
             except:
                 pass
 
+    def _encode_analysis(self, websocket: WebSocket, response: dict, annotated_jpeg: Optional[bytes],
+                         cache: Dict[str, Union[str, bytes]]) -> Union[str, bytes]:
+        """
+        Serializa un resultado de análisis según el protocolo de la conexión.
+        Cada formato se codifica una sola vez por frame (``cache``).
+        
+        Según ``annotations`` el cliente recibe la imagen anotada ("image"),
+        solo las primitivas del overlay ("overlay") o ninguna de las dos ("none").
+        """
+        options = self.client_options.get(id(websocket), {})
+        binary = options.get("binary_frames", False)
+        annotations = options.get("annotations", "image")
+        key = f"{'binary' if binary else 'json'}:{annotations}"
+        if key not in cache:
+            image = annotated_jpeg if annotations == "image" else None
+            message = {k: v for k, v in response.items()
+                       if not (k == "overlay" and annotations != "overlay")}
+            if binary:
+                message.pop("annotated_image", None)
+                cache[key] = pack_frame(KIND_ANALYSIS_FRAME, message, image or b"")
+            else:
+                if "annotated_image" in message:
+                    message["annotated_image"] = base64.b64encode(image).decode('utf-8') if image else None
+                cache[key] = json.dumps(message)
+        return cache[key]
+
+    async def _send_payload(self, websocket: WebSocket, payload: Union[str, bytes]):
+        if isinstance(payload, bytes):
+            await websocket.send_bytes(payload)
+        else:
+            await websocket.send_text(payload)
+
+    async def send_analysis(self, response: dict, annotated_jpeg: Optional[bytes], websocket: WebSocket,
+                            cache: Optional[Dict[str, Union[str, bytes]]] = None):
+        """Envía un resultado de análisis (JSON+base64 o frame binario) a una conexión"""
+        cache = {} if cache is None else cache
+        try:
+            await self._send_payload(websocket, self._encode_analysis(websocket, response, annotated_jpeg, cache))
+        except Exception as e:
+            print(f"⚠️ Error enviando mensaje personal: {e}")
+            try:
+                self.disconnect(websocket)
+            except:
+                pass
+
     async def broadcast(self, message: str, min_interval_ms: int = 300):
         """
         Broadcast con throttling para evitar saturación.
@@ -185,6 +268,44 @@ class ConnectionManager:
                 except ValueError:
                     pass
 
+    async def broadcast_analysis(self, response: dict, annotated_jpeg: Optional[bytes] = None,
+                                 min_interval_ms: int = 300, exclude: Optional[WebSocket] = None,
+                                 cache: Optional[Dict[str, Union[str, bytes]]] = None):
+        """
+        Broadcast de un resultado de análisis con throttling, respetando el
+        protocolo (JSON o binario) de cada conexión.
+        
+        Args:
+            response: Mensaje realtime_analysis (sin imagen codificada)
+            annotated_jpeg: JPEG anotado crudo, si existe
+            min_interval_ms: Intervalo mínimo entre mensajes (ms)
+            exclude: Conexión que ya recibió el resultado como mensaje personal
+            cache: Payloads ya codificados para este frame
+        """
+        import time
+        current_time = time.time() * 1000  # Tiempo en ms
+        cache = {} if cache is None else cache
+        
+        for connection in list(self.active_connections):
+            if connection is exclude:
+                continue
+            try:
+                ws_id = id(connection)
+                last_time = self.last_broadcast_time.get(ws_id, 0)
+                
+                # Solo enviar si ha pasado el intervalo mínimo
+                if current_time - last_time >= min_interval_ms:
+                    await self._send_payload(connection, self._encode_analysis(connection, response, annotated_jpeg, cache))
+                    self.last_broadcast_time[ws_id] = current_time
+                    
+            except Exception as e:
+                print(f"Error enviando mensaje a cliente: {e}")
+                # Remover conexión problemática
+                try:
+                    self.disconnect(connection)
+                except ValueError:
+                    pass
+
 manager = ConnectionManager()
 
 @app.websocket("/ws")
@@ -196,6 +317,7 @@ async def websocket_endpoint(websocket: WebSocket):
         "type": "connected",
         "message": "🔗 NeoTotem Retail conectado - Detección REAL activada",
         "features": ["deteccion_real_prendas", "analisis_colores", "estimacion_edad", "recomendaciones_personalizadas"],
+        "frame_protocol": {"version": FRAME_PROTOCOL_VERSION, "binary_frames": True},
         "timestamp": datetime.now().isoformat()
     }
     await manager.send_personal_message(json.dumps(welcome_msg), websocket)
@@ -216,17 +338,253 @@ async def websocket_endpoint(websocket: WebSocket):
         except:
             pass
     
+    async def process_image_stream(camera, message: dict):
+        """Analiza un frame de la cámara ``camera`` (CameraPipeline) y envía el resultado"""
+        # Análisis de imagen en tiempo real con MediaPipe
+        try:
+            image_bytes = message.get("image_bytes")  # Frame binario (JPEG crudo)
+            image_data = message.get("image_data", "")  # Frame JSON (base64)
+            camera_active = message.get("camera_active", False)
+            annotated_jpeg = None
+            
+            if (image_bytes or image_data) and camera_active:
+                if image_bytes is None:
+                    image_bytes = base64.b64decode(image_data)
+                
+                # Análisis REAL con imagen de la cámara. El JPEG anotado solo se
+                # dibuja/codifica si algún cliente conectado lo pide; los clientes
+                # en modo overlay reciben solo la geometría
+                return_annotated = manager.wants_annotations("image")
+                return_overlay = manager.wants_annotations("overlay")
+                
+                # Compuerta de cambio: si la escena no cambió se reutiliza el último
+                # análisis sin pasar por el worker (miniatura decodificada a 1/8)
+                variant = (return_annotated, return_overlay)
+                analysis, signature = camera.gate.lookup(image_bytes, variant)
+                if analysis is None:
+                    # Se ejecuta en un proceso worker para no bloquear el event loop
+                    analysis = await cv_worker_pool.analyze_frame_bytes(
+                        image_bytes,
+                        return_annotated=return_annotated,
+                        annotated_encoding="jpeg",
+                        return_overlay=return_overlay,
+                        stream_key=camera.stream_key,
+                        shard=camera.shard
+                    )
+                    camera.gate.store(signature, analysis, variant)
+                
+                # JPEG anotado crudo; se codifica por cliente (base64 en JSON o payload binario)
+                annotated_jpeg = analysis.pop('annotated_jpeg', None)
+                overlay = analysis.pop('overlay', None)
+                
+                response = {
+                    "type": "realtime_analysis",
+                    "analysis": analysis,
+                    "annotated_image": None,  # Imagen con detecciones visuales (se completa al enviar)
+                    "overlay": overlay,  # Recuadros/landmarks normalizados (clientes en modo overlay)
+                    "timestamp": datetime.now().isoformat(),
+                    "engine": "real_detection_mediapipe",
+                    "camera_source": "real",
+                    "camera_id": camera.camera_id
+                }
+            else:
+                # Análisis específico para RETAIL: prendas, colores y edad
+                import random
+                
+                # Datos específicos para retail/fashion
+                age_ranges = ["18-25", "26-35", "36-45", "46-55", "55+"]
+                clothing_types = ["casual", "formal", "deportivo", "elegante", "juvenil"]
+                colors_detected = ["azul", "negro", "blanco", "rojo", "verde", "gris", "beige", "marron"]
+                clothing_items = ["camiseta", "pantalon", "chaqueta", "vestido", "falda", "zapatos", "accesorios"]
+                
+                # Simulación de análisis de prendas y colores
+                person_detected = random.choice([True, True, True, False])  # 75% probabilidad
+                age_range = random.choice(age_ranges)
+                clothing_style = random.choice(clothing_types)
+                primary_color = random.choice(colors_detected)
+                secondary_color = random.choice(colors_detected) if random.random() > 0.5 else None
+                clothing_item = random.choice(clothing_items)
+                confidence = random.uniform(0.6, 0.95)
+                
+                # Recomendaciones basadas en análisis de prendas
+                if age_range in ["18-25", "26-35"]:
+                    recommended_categories = ["moda_joven", "casual", "deportivo"]
+                elif age_range in ["36-45", "46-55"]:
+                    recommended_categories = ["profesional", "elegante", "casual"]
+                else:
+                    recommended_categories = ["clasico", "comodo", "elegante"]
+                
+                response = {
+                    "type": "realtime_analysis",
+                    "analysis": {
+                        "person_detected": person_detected,
+                        "age_range": age_range,
+                        "clothing_style": clothing_style,
+                        "primary_color": primary_color,
+                        "secondary_color": secondary_color,
+                        "clothing_item": clothing_item,
+                        "detection_confidence": round(confidence, 2),
+                        "recommendations": {
+                            "target_categories": recommended_categories,
+                            "color_preference": primary_color,
+                            "style_suggestion": clothing_style,
+                            "age_appropriate": True,
+                            "interaction_tips": [
+                                f"Cliente {age_range} años - estilo {clothing_style}",
+                                f"Color principal: {primary_color}",
+                                f"Recomendar: {', '.join(recommended_categories)}"
+                            ]
+                        }
+                    },
+                    "timestamp": datetime.now().isoformat(),
+                    "engine": "retail_fashion_analysis",
+                    "camera_source": "simulated",
+                    "camera_id": camera.camera_id
+                }
+            
+            # Almacenar detección en base de datos
+            try:
+                db = SessionLocal()
+                
+                # Guardar en tabla deteccion (con session_id)
+                from database import models
+                analysis_data = response['analysis']
+                session_id = message.get('session_id', 'unknown')
+                
+                if analysis_data.get('person_detected', False):
+                    deteccion = models.Deteccion(
+                        id_sesion=session_id,
+                        prenda=analysis_data.get('clothing_item', 'desconocido'),
+                        color=analysis_data.get('primary_color', 'desconocido'),
+                        rango_etario=analysis_data.get('age_range', 'desconocido'),
+                        confianza=analysis_data.get('detection_confidence', 0.0)
+                    )
+                    db.add(deteccion)
+                    db.commit()
+                    print(f"✅ Detección guardada: session={session_id}, prenda={deteccion.prenda}, color={deteccion.color}")
+                
+                # También guardar en buffer de turnos (opcional)
+                shift_manager = ShiftManager(db)
+                shift_manager.store_detection(
+                    response['analysis'],
+                    engine=response.get('engine', 'unknown'),
+                    camera_source=response.get('camera_source', 'unknown')
+                )
+                
+                db.close()
+            except Exception as e:
+                # Error no crítico - la detección ya fue guardada en la tabla principal
+                print(f"⚠️ No se pudo guardar en buffer de turnos (no crítico): {e}")
+            
+            # Estadísticas de la cámara: frames descartados por sobrecarga, fps, latencia y compuerta
+            response["stream"] = camera.stats()
+            # Captura recomendada al totem (fps, resolución, calidad) según la carga medida
+            response["capture_hints"] = pipeline_manager.capture_hints(camera)
+            
+            # Cada formato (JSON/binario) se serializa una sola vez por frame
+            encoded_cache = {}
+            
+            # Enviar respuesta al cliente que envió la imagen
+            await manager.send_analysis(response, annotated_jpeg, websocket, cache=encoded_cache)
+            
+            # Transmitir datos de análisis al resto de clientes conectados (incluyendo visualización)
+            # Con throttling de 500ms para evitar saturación
+            await manager.broadcast_analysis(
+                response, annotated_jpeg, min_interval_ms=500, exclude=websocket, cache=encoded_cache
+            )
+            
+        except Exception as e:
+            error_response = {
+                "type": "analysis_error",
+                "error": str(e),
+                "timestamp": datetime.now().isoformat()
+            }
+            await manager.send_personal_message(json.dumps(error_response), websocket)
+    
     # Iniciar tarea de keepalive
     keepalive_task = asyncio.create_task(send_keepalive())
     
+    # Cámara de la conexión (?camera_id=... o "hello"); cada frame puede indicar
+    # otra con "camera_id". Sin id, la conexión es su propia cámara
+    connection_camera = websocket.query_params.get("camera_id") or f"ws-{id(websocket)}"
+    camera_weight = None
+    attached_cameras = set()
+    
+    def camera_for(message: dict) -> str:
+        """Cámara del frame; la conexión se registra en su pipeline la primera vez"""
+        camera_id = str(message.get("camera_id") or connection_camera)
+        if camera_id not in attached_cameras:
+            pipeline_manager.attach(camera_id, weight=camera_weight if camera_id == connection_camera else None)
+            attached_cameras.add(camera_id)
+        return camera_id
+    
+    def detach_cameras():
+        """Suelta las cámaras de la conexión; las que quedan sin conexiones liberan su analizador"""
+        for camera_id in attached_cameras:
+            camera = pipeline_manager.detach(camera_id)
+            if camera is not None and camera.stream_key:
+                asyncio.create_task(cv_worker_pool.release_stream(camera.stream_key, shard=camera.shard))
+        attached_cameras.clear()
+    
     try:
         while True:
-            # Recibir datos del cliente
-            data = await websocket.receive_text()
-            message = json.loads(data)
+            # Recibir datos del cliente (texto JSON o frame binario)
+            raw = await websocket.receive()
+            if raw["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(raw.get("code", 1000))
+            
+            if raw.get("bytes") is not None:
+                try:
+                    kind, meta, payload = unpack_frame(raw["bytes"])
+                    if kind != KIND_CAMERA_FRAME:
+                        raise FrameProtocolError(f"Tipo de frame no soportado: {kind}")
+                except FrameProtocolError as e:
+                    error_response = {
+                        "type": "analysis_error",
+                        "error": str(e),
+                        "timestamp": datetime.now().isoformat()
+                    }
+                    await manager.send_personal_message(json.dumps(error_response), websocket)
+                    continue
+                
+                # Un cliente que envía frames binarios también los recibe binarios
+                manager.set_options(websocket, binary_frames=True)
+                message = {
+                    **meta,
+                    "type": "image_stream",
+                    "image_bytes": payload,
+                    "camera_active": meta.get("camera_active", True)
+                }
+            else:
+                message = json.loads(raw["text"])
             
             # Procesar diferentes tipos de mensajes
-            if message["type"] == "voice":
+            if message["type"] == "hello":
+                # Negociación de protocolo: {"type": "hello", "binary_frames": true, "annotations": "overlay"}
+                annotations = message.get("annotations", "image")
+                if annotations not in ("image", "overlay", "none"):
+                    annotations = "image"
+                manager.set_options(
+                    websocket,
+                    binary_frames=bool(message.get("binary_frames", False)),
+                    annotations=annotations
+                )
+                # Identificación del totem: {"camera_id": "entrada", "weight": 2}
+                if message.get("camera_id"):
+                    connection_camera = str(message["camera_id"])
+                if isinstance(message.get("weight"), int):
+                    camera_weight = message["weight"]
+                hello_ack = {
+                    "type": "hello_ack",
+                    "frame_protocol": FRAME_PROTOCOL_VERSION,
+                    "binary_frames": manager.client_options[id(websocket)]["binary_frames"],
+                    "annotations": annotations,
+                    "camera_id": connection_camera,
+                    "timestamp": datetime.now().isoformat()
+                }
+                await manager.send_personal_message(json.dumps(hello_ack), websocket)
+                
+            elif message["type"] == "voice":
                 # Procesamiento NLU avanzado
                 text = message.get("text", "")
                 intent, entities, confidence = extract_intent_advanced(text)
@@ -267,129 +625,9 @@ async def websocket_endpoint(websocket: WebSocket):
                 await manager.send_personal_message(json.dumps(response), websocket)
                 
             elif message["type"] == "image_stream":
-                # Análisis de imagen en tiempo real con MediaPipe
-                try:
-                    image_data = message.get("image_data", "")
-                    camera_active = message.get("camera_active", False)
-                    
-                    if image_data and camera_active:
-                        # Análisis REAL con imagen de la cámara (incluir imagen anotada)
-                        analysis = analyze_realtime_stream_real(image_data, return_annotated=True)
-                        
-                        # Extraer imagen anotada si está disponible
-                        annotated_image = analysis.pop('annotated_image', None)
-                        
-                        response = {
-                            "type": "realtime_analysis",
-                            "analysis": analysis,
-                            "annotated_image": annotated_image,  # Imagen con detecciones visuales
-                            "timestamp": datetime.now().isoformat(),
-                            "engine": "real_detection_mediapipe",
-                            "camera_source": "real"
-                        }
-                    else:
-                        # Análisis específico para RETAIL: prendas, colores y edad
-                        import random
-                        
-                        # Datos específicos para retail/fashion
-                        age_ranges = ["18-25", "26-35", "36-45", "46-55", "55+"]
-                        clothing_types = ["casual", "formal", "deportivo", "elegante", "juvenil"]
-                        colors_detected = ["azul", "negro", "blanco", "rojo", "verde", "gris", "beige", "marron"]
-                        clothing_items = ["camiseta", "pantalon", "chaqueta", "vestido", "falda", "zapatos", "accesorios"]
-                        
-                        # Simulación de análisis de prendas y colores
-                        person_detected = random.choice([True, True, True, False])  # 75% probabilidad
-                        age_range = random.choice(age_ranges)
-                        clothing_style = random.choice(clothing_types)
-                        primary_color = random.choice(colors_detected)
-                        secondary_color = random.choice(colors_detected) if random.random() > 0.5 else None
-                        clothing_item = random.choice(clothing_items)
-                        confidence = random.uniform(0.6, 0.95)
-                        
-                        # Recomendaciones basadas en análisis de prendas
-                        if age_range in ["18-25", "26-35"]:
-                            recommended_categories = ["moda_joven", "casual", "deportivo"]
-                        elif age_range in ["36-45", "46-55"]:
-                            recommended_categories = ["profesional", "elegante", "casual"]
-                        else:
-                            recommended_categories = ["clasico", "comodo", "elegante"]
-                        
-                        response = {
-                            "type": "realtime_analysis",
-                            "analysis": {
-                                "person_detected": person_detected,
-                                "age_range": age_range,
-                                "clothing_style": clothing_style,
-                                "primary_color": primary_color,
-                                "secondary_color": secondary_color,
-                                "clothing_item": clothing_item,
-                                "detection_confidence": round(confidence, 2),
-                                "recommendations": {
-                                    "target_categories": recommended_categories,
-                                    "color_preference": primary_color,
-                                    "style_suggestion": clothing_style,
-                                    "age_appropriate": True,
-                                    "interaction_tips": [
-                                        f"Cliente {age_range} años - estilo {clothing_style}",
-                                        f"Color principal: {primary_color}",
-                                        f"Recomendar: {', '.join(recommended_categories)}"
-                                    ]
-                                }
-                            },
-                            "timestamp": datetime.now().isoformat(),
-                            "engine": "retail_fashion_analysis",
-                            "camera_source": "simulated"
-                        }
-                    
-                    # Almacenar detección en base de datos
-                    try:
-                        db = SessionLocal()
-                        
-                        # Guardar en tabla deteccion (con session_id)
-                        from database import models
-                        analysis_data = response['analysis']
-                        session_id = message.get('session_id', 'unknown')
-                        
-                        if analysis_data.get('person_detected', False):
-                            deteccion = models.Deteccion(
-                                id_sesion=session_id,
-                                prenda=analysis_data.get('clothing_item', 'desconocido'),
-                                color=analysis_data.get('primary_color', 'desconocido'),
-                                rango_etario=analysis_data.get('age_range', 'desconocido'),
-                                confianza=analysis_data.get('detection_confidence', 0.0)
-                            )
-                            db.add(deteccion)
-                            db.commit()
-                            print(f"✅ Detección guardada: session={session_id}, prenda={deteccion.prenda}, color={deteccion.color}")
-                        
-                        # También guardar en buffer de turnos (opcional)
-                        shift_manager = ShiftManager(db)
-                        shift_manager.store_detection(
-                            response['analysis'],
-                            engine=response.get('engine', 'unknown'),
-                            camera_source=response.get('camera_source', 'unknown')
-                        )
-                        
-                        db.close()
-                    except Exception as e:
-                        # Error no crítico - la detección ya fue guardada en la tabla principal
-                        print(f"⚠️ No se pudo guardar en buffer de turnos (no crítico): {e}")
-                    
-                    # Enviar respuesta al cliente que envió la imagen
-                    await manager.send_personal_message(json.dumps(response), websocket)
-                    
-                    # Transmitir datos de análisis a TODOS los clientes conectados (incluyendo visualización)
-                    # Con throttling de 500ms para evitar saturación
-                    await manager.broadcast(json.dumps(response), min_interval_ms=500)
-                    
-                except Exception as e:
-                    error_response = {
-                        "type": "analysis_error",
-                        "error": str(e),
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    await manager.send_personal_message(json.dumps(error_response), websocket)
-            
+                # Latest-frame-wins por cámara: si hay un frame pendiente sin analizar, se reemplaza
+                pipeline_manager.submit(camera_for(message), process_image_stream, message)
+                
             elif message["type"] == "ping":
                 # Mantener conexión viva
                 pong_response = {
@@ -399,15 +637,17 @@ async def websocket_endpoint(websocket: WebSocket):
                 await manager.send_personal_message(json.dumps(pong_response), websocket)
                 
     except WebSocketDisconnect:
-        # Cancelar keepalive
+        # Cancelar keepalive y análisis pendiente
         if keepalive_task:
             keepalive_task.cancel()
+        detach_cameras()
         manager.disconnect(websocket)
         print(f"🔌 Cliente desconectado normalmente: {websocket.client}")
     except Exception as e:
-        # Cancelar keepalive
+        # Cancelar keepalive y análisis pendiente
         if keepalive_task:
             keepalive_task.cancel()
+        detach_cameras()
         print(f"❌ Error en WebSocket: {e}")
         try:
             manager.disconnect(websocket)
@@ -1,26 +1,33 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from database import models, database
 from api.schemas import ASRResponse
-from services.asr.engine import ASREngine
-import os
+from services.asr.model_registry import asr_models
+from services.asr.scheduler import asr_scheduler, ASRBusyError
+from services.asr.streaming import StreamingTranscriber, SAMPLE_RATE
+import asyncio
+import json
 import base64
-import tempfile
-from uuid import uuid4
+from typing import Optional
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/asr", tags=["ASR"])
 
 MAX_AUDIO_BYTES = 20 * 1024 * 1024
-
-# Inicializar motor ASR
-asr_engine = ASREngine()
+# Frecuencias de muestreo aceptadas en /asr/stream (el audio se remuestrea a 16 kHz)
+MIN_STREAM_SAMPLE_RATE = 8000
+MAX_STREAM_SAMPLE_RATE = 48000
 
 class TranscribeRequest(BaseModel):
     audio_data: str
     format: str = "wav"
     sample_rate: int = 16000
     language: str = "es"
+    # Modelo explícito (tiny/base/small...) o el configurado para el totem
+    model: Optional[str] = None
+    compute_type: Optional[str] = None
+    device_id: Optional[str] = None
 
 class TranscribeResponse(BaseModel):
     transcription: str
@@ -37,59 +44,159 @@ async def transcribe_audio(request: TranscribeRequest, db: Session = Depends(dat
         if len(audio_bytes) > MAX_AUDIO_BYTES:
             raise HTTPException(413, "Archivo demasiado grande")
         
-        # Crear archivo temporal
-        with tempfile.NamedTemporaryFile(suffix=f".{request.format}", delete=False) as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_path = tmp_file.name
+        # Decodificar en memoria y transcribir en la cola ASR
+        res = await asr_scheduler.submit(
+            lambda engine: engine.transcribe(audio_bytes, language=request.language,
+                                             audio_format=request.format, sample_rate=request.sample_rate),
+            model=request.model, compute_type=request.compute_type, device_id=request.device_id
+        )
+        
+        # Simular confianza basada en la longitud del texto
+        confidence = min(0.95, max(0.3, len(res["text"]) / 50.0))
         
-        try:
-            # Transcribir usando el motor ASR
-            res = asr_engine.transcribe_file(tmp_path, language=request.language)
-            
-            # Simular confianza basada en la longitud del texto
-            confidence = min(0.95, max(0.3, len(res["text"]) / 50.0))
-            
-            return TranscribeResponse(
-                transcription=res["text"],
-                confidence=confidence,
-                language=request.language
-            )
-        finally:
-            # Limpiar archivo temporal
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+        return TranscribeResponse(
+            transcription=res["text"],
+            confidence=confidence,
+            language=request.language
+        )
                 
+    except HTTPException:
+        raise
+    except ASRBusyError as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(400, str(e))
     except Exception as e:
         raise HTTPException(500, f"Error en transcripción: {str(e)}")
 
 @router.post("/voice", response_model=ASRResponse)
-async def voice_asr(file: UploadFile = File(...), id_sesion: str = None, db: Session = Depends(database.get_db)):
-    if file.content_type not in {"audio/wav","audio/x-wav","audio/wave","audio/mpeg","audio/mp3"}:
+async def voice_asr(file: UploadFile = File(...), id_sesion: str = None, model: Optional[str] = None,
+                    compute_type: Optional[str] = None, device_id: Optional[str] = None,
+                    db: Session = Depends(database.get_db)):
+    if file.content_type not in {"audio/wav","audio/x-wav","audio/wave","audio/mpeg","audio/mp3",
+                                 "audio/webm","audio/ogg","audio/opus"}:
         raise HTTPException(415, "Formato no soportado")
 
     data = await file.read()
     if len(data) > MAX_AUDIO_BYTES:
         raise HTTPException(413, "Archivo demasiado grande")
 
-    suffix = os.path.splitext(file.filename or "")[1] or ".tmp"
-    tmp = f"/tmp/upload_{uuid4().hex}{suffix}"
-    with open(tmp, "wb") as f:
-        f.write(data)
+    try:
+        res = await asr_scheduler.submit(lambda engine: engine.transcribe(data, language="es"),
+                                         model=model, compute_type=compute_type, device_id=device_id)
+    except ASRBusyError as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": "1"})
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    # Registrar en la base
+    if id_sesion:
+        consulta = models.ConsultaVoz(
+            id_sesion=id_sesion,
+            transcripcion=res["text"],
+            intencion="buscar_producto",
+            entidades="{}",
+            confianza="alta",
+            exito=True
+        )
+        db.add(consulta)
+        db.commit()
+    return ASRResponse(**res)
+
+@router.get("/ready")
+def asr_ready(model: Optional[str] = None, compute_type: Optional[str] = None, device_id: Optional[str] = None):
+    """
+    Readiness del ASR para health checks: 200 si el modelo (por defecto, o el
+    pedido) ya está cargado y pre-calentado, 503 mientras carga o si falló.
+    """
+    try:
+        ready = asr_models.is_ready(model, compute_type, device_id)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    status = {**asr_models.status(), "ready": ready, "scheduler": asr_scheduler.stats()}
+    return JSONResponse(status, status_code=200 if ready else 503)
+
+@router.websocket("/stream")
+async def asr_stream(websocket: WebSocket):
+    """
+    Reconocimiento en streaming.
+
+    Query: ``language`` (default es), ``sample_rate`` (default 16000),
+    ``model`` / ``compute_type`` / ``device_id`` (ver ``asr_models``).
+    Cliente -> servidor: trozos binarios PCM 16-bit mono little endian;
+    texto ``{"type": "end"}`` para cerrar el enunciado en curso.
+    Servidor -> cliente: ``speech_start``, ``partial`` (hipótesis mientras se
+    habla), ``final`` (al detectar el fin del enunciado) y ``end``.
+    """
+    await websocket.accept()
+    params = websocket.query_params
+    model = {"model": params.get("model"), "compute_type": params.get("compute_type"),
+             "device_id": params.get("device_id")}
+    try:
+        sample_rate = params.get("sample_rate", str(SAMPLE_RATE))
+        if not sample_rate.isdigit() or not MIN_STREAM_SAMPLE_RATE <= int(sample_rate) <= MAX_STREAM_SAMPLE_RATE:
+            raise ValueError(f"sample_rate inválido: {sample_rate} (entero entre "
+                             f"{MIN_STREAM_SAMPLE_RATE} y {MAX_STREAM_SAMPLE_RATE})")
+        # Solo se valida el modelo: cada decodificación obtiene su motor en
+        # asr_scheduler (degradación al modelo chico y rechazo con la cola llena)
+        asr_models.resolve(**model)
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "message": str(e)})
+        await websocket.close()
+        return
+    transcriber = StreamingTranscriber(
+        language=params.get("language", "es"),
+        sample_rate=int(sample_rate)
+    )
+    wake = asyncio.Event()
+    end_requested = False
+
+    async def decode_loop():
+        """Decodifica de a un trabajo, siempre con el audio más reciente"""
+        nonlocal end_requested
+        while True:
+            await wake.wait()
+            wake.clear()
+            while (job := transcriber.next_job()) is not None:
+                try:
+                    # Las parciales se omiten si el ASR está ocupado; los finales esperan su turno
+                    event = await asr_scheduler.submit(lambda engine: transcriber.run(job, engine), **model,
+                                                       best_effort=job[0] == "partial")
+                except ASRBusyError as e:
+                    event = None if job[0] == "partial" else {"type": "error", "message": str(e)}
+                except Exception as e:
+                    event = {"type": "error", "message": f"Error en transcripción: {e}"}
+                if event:
+                    await websocket.send_json(event)
+            if end_requested:
+                end_requested = False
+                await websocket.send_json({"type": "end"})
 
+    decoder = asyncio.create_task(decode_loop())
+    await websocket.send_json({"type": "ready", "sample_rate": transcriber.sample_rate,
+                               "language": transcriber.language})
     try:
-        res = asr_engine.transcribe_file(tmp, language="es")
-        # Registrar en la base
-        if id_sesion:
-            consulta = models.ConsultaVoz(
-                id_sesion=id_sesion,
-                transcripcion=res["text"],
-                intencion="buscar_producto",
-                entidades="{}",
-                confianza="alta",
-                exito=True
-            )
-            db.add(consulta)
-            db.commit()
-        return ASRResponse(**res)
+        while True:
+            raw = await websocket.receive()
+            if raw["type"] == "websocket.disconnect":
+                break
+            if raw.get("bytes") is not None:
+                for event in transcriber.push(raw["bytes"]):
+                    await websocket.send_json(event)
+            elif raw.get("text"):
+                try:
+                    message = json.loads(raw["text"])
+                except json.JSONDecodeError:
+                    continue
+                if message.get("type") == "end":
+                    transcriber.flush()
+                    end_requested = True
+                elif message.get("type") == "ping":
+                    await websocket.send_json({"type": "pong"})
+            if decoder.done():
+                break
+            wake.set()
+    except WebSocketDisconnect:
+        pass
     finally:
-        os.remove(tmp)
+        decoder.cancel()
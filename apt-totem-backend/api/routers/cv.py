@@ -1,18 +1,57 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from database import models, database
 from api.schemas import ColorResponse
 from services.cv.color import detect_dominant_hsv
-from services.ai.real_detection import analyze_realtime_stream_real
-from services.ai.yolo_clothing_detector import analyze_clothing_with_yolo
+from services.ai.yolo_clothing_detector import analyze_clothing_with_yolo_array
+from services.ai.frame_gate import gate_totals
+from services.ai.cv_workers import cv_worker_pool
+from services.pipeline_manager import pipeline_manager
+from services.ai.model_pool import mediapipe_pool
+from services.ai.instrumentation import BUCKETS_MS
+from services.cv.image_io import decode_image, MAX_ANALYSIS_DIMENSION
 import numpy as np, cv2 as cv
+import asyncio
+import io
+import json
+import os
 import random
-import base64
+import tarfile
+import time
+import zipfile
+import zlib
 from datetime import datetime
+from typing import List, Optional, Tuple
 
 router = APIRouter(prefix="/cv", tags=["Visión"])
 
 MAX_IMAGE_BYTES = 8 * 1024 * 1024
+ANALYSIS_CONTENT_TYPES = {"image/jpeg", "image/png", "image/jpg"}
+# Límites de /cv/analyze-batch
+MAX_BATCH_ITEMS = int(os.getenv("NEOTOTEM_BATCH_MAX_ITEMS", "500"))
+MAX_BATCH_BYTES = int(os.getenv("NEOTOTEM_BATCH_MAX_MB", "256")) * 1024 * 1024
+BATCH_IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+# Errores al leer un miembro de un zip/tar dañado (400 en lugar de 500)
+_ARCHIVE_READ_ERRORS = (zipfile.BadZipFile, tarfile.TarError, RuntimeError, NotImplementedError,
+                        zlib.error, EOFError, OSError)
+
+async def _read_upload_image(file: UploadFile, max_dimension: Optional[int] = None) -> np.ndarray:
+    """
+    Valida y decodifica la imagen subida (una sola vez por request).
+    Con ``max_dimension`` los JPEG grandes se decodifican directo a escala reducida.
+    """
+    if file.content_type not in ANALYSIS_CONTENT_TYPES:
+        raise HTTPException(415, "Formato de imagen no soportado")
+    
+    img_bytes = await file.read()
+    if len(img_bytes) > MAX_IMAGE_BYTES:
+        raise HTTPException(413, "Imagen demasiado grande")
+    
+    image = decode_image(img_bytes, max_dimension=max_dimension)
+    if image is None:
+        raise HTTPException(400, "Imagen inválida")
+    return image
 
 @router.post("/detect-frame", response_model=ColorResponse)
 async def detect_frame(file: UploadFile = File(...), id_sesion: str = None, db: Session = Depends(database.get_db)):
@@ -23,8 +62,7 @@ async def detect_frame(file: UploadFile = File(...), id_sesion: str = None, db:
     if len(img_bytes) > MAX_IMAGE_BYTES:
         raise HTTPException(413, "Imagen demasiado grande")
 
-    nparr = np.frombuffer(img_bytes, np.uint8)
-    img = cv.imdecode(nparr, cv.IMREAD_COLOR)
+    img = decode_image(img_bytes)
     if img is None:
         raise HTTPException(400, "Imagen inválida")
 
@@ -43,25 +81,184 @@ async def detect_frame(file: UploadFile = File(...), id_sesion: str = None, db:
 
     return ColorResponse(**res)
 
+def _archive_images(filename: str, data: bytes, max_items: int = MAX_BATCH_ITEMS,
+                    max_bytes: int = MAX_BATCH_BYTES) -> Optional[List[Tuple[str, bytes]]]:
+    """
+    Imágenes dentro de un zip/tar (None si ``data`` no es un archivo comprimido).
+
+    Los tamaños se validan con el encabezado de cada miembro antes de
+    descomprimirlo: un miembro mayor a ``MAX_IMAGE_BYTES``, más de
+    ``max_items`` imágenes o más de ``max_bytes`` descomprimidos cortan la
+    lectura con 413 (protección contra zip bombs).
+    """
+    images: List[Tuple[str, bytes]] = []
+    total = 0
+
+    def admit(name: str, size: int):
+        nonlocal total
+        if size > MAX_IMAGE_BYTES:
+            raise HTTPException(413, f"Imagen demasiado grande: {name}")
+        if len(images) >= max_items:
+            raise HTTPException(413, f"{filename} supera las {max_items} imágenes que caben en el lote")
+        total += size
+        if total > max_bytes:
+            raise HTTPException(413, "Lote demasiado grande")
+
+    # Miembros corruptos, cifrados o con compresión no soportada: 400 con su nombre
+    buffer = io.BytesIO(data)
+    name = filename
+    try:
+        if zipfile.is_zipfile(buffer):
+            with zipfile.ZipFile(buffer) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not info.filename.lower().endswith(BATCH_IMAGE_EXTENSIONS):
+                        continue
+                    name = f"{filename}/{info.filename}"
+                    admit(name, info.file_size)
+                    # ZipExtFile no entrega más de file_size bytes aunque el encabezado mienta
+                    images.append((name, archive.read(info)))
+            return images
+        buffer.seek(0)
+        try:
+            archive = tarfile.open(fileobj=buffer, mode="r:*")
+        except tarfile.TarError:
+            return None
+        with archive:
+            for member in archive:
+                if not member.isfile() or not member.name.lower().endswith(BATCH_IMAGE_EXTENSIONS):
+                    continue
+                name = f"{filename}/{member.name}"
+                admit(name, member.size)
+                images.append((name, archive.extractfile(member).read()))
+        return images
+    except _ARCHIVE_READ_ERRORS as e:
+        raise HTTPException(400, f"No se pudo leer {name}: {e}")
+
+async def _read_batch(files: List[UploadFile]) -> List[Tuple[str, bytes]]:
+    """Lee imágenes sueltas y archivos zip/tar en una lista (nombre, bytes)"""
+    items: List[Tuple[str, bytes]] = []
+    total = 0
+    for file in files:
+        data = await file.read()
+        total += len(data)
+        if total > MAX_BATCH_BYTES:
+            raise HTTPException(413, "Lote demasiado grande")
+        if file.content_type in ANALYSIS_CONTENT_TYPES:
+            if len(items) >= MAX_BATCH_ITEMS:
+                raise HTTPException(413, f"Máximo {MAX_BATCH_ITEMS} imágenes por lote")
+            items.append((file.filename, data))
+            continue
+        # Presupuesto restante: lo ya leído cuenta contra el total descomprimido
+        members = _archive_images(file.filename, data, MAX_BATCH_ITEMS - len(items),
+                                  MAX_BATCH_BYTES - total)
+        if members is None:
+            raise HTTPException(415, f"Formato no soportado: {file.filename}")
+        items.extend(members)
+        total += sum(len(content) for _, content in members)
+
+    if not items:
+        raise HTTPException(400, "El lote no contiene imágenes")
+    return items
+
+@router.post("/analyze-batch")
+async def analyze_batch(files: List[UploadFile] = File(...)):
+    """
+    Análisis de un lote de imágenes (varias en el multipart o un zip/tar).
+
+    Las imágenes se reparten entre los workers de visión y los resultados se
+    devuelven como NDJSON a medida que terminan (orden de término, no de
+    envío). Cada línea ``result`` trae el índice y nombre de la imagen, el
+    tiempo total (cola + análisis) y el tiempo de análisis en el worker; la
+    última línea ``summary`` trae el rendimiento del lote.
+    """
+    items = await _read_batch(files)
+
+    async def results():
+        start = time.perf_counter()
+        # Ventana de trabajos en curso: mantiene ocupados a todos los workers sin
+        # encolar el lote completo en memoria de los procesos
+        window = asyncio.Semaphore(cv_worker_pool.parallelism() * 2)
+
+        async def analyze(index: int, name: str, data: bytes) -> dict:
+            async with window:
+                item_start = time.perf_counter()
+                line = {"type": "result", "index": index, "name": name}
+                if len(data) > MAX_IMAGE_BYTES:
+                    line["error"] = "Imagen demasiado grande"
+                else:
+                    try:
+                        line.update(await cv_worker_pool.analyze_batch_item(data))
+                    except Exception as e:
+                        line["error"] = str(e)
+                if "error" in line.get("analysis", {}):
+                    line["error"] = line["analysis"]["error"]
+                line["elapsed_ms"] = round((time.perf_counter() - item_start) * 1000, 2)
+                return line
+
+        tasks = [asyncio.create_task(analyze(i, name, data)) for i, (name, data) in enumerate(items)]
+        errors = 0
+        try:
+            for task in asyncio.as_completed(tasks):
+                line = await task
+                errors += "error" in line
+                yield json.dumps(line, ensure_ascii=False, default=str) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        elapsed = time.perf_counter() - start
+        yield json.dumps({
+            "type": "summary",
+            "items": len(items),
+            "errors": errors,
+            "elapsed_ms": round(elapsed * 1000, 2),
+            "images_per_s": round(len(items) / elapsed, 2) if elapsed > 0 else None,
+            "workers": cv_worker_pool.stats()["workers"]
+        }) + "\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@router.get("/pipeline/stats")
+def pipeline_stats():
+    """
+    Estado del pipeline de visión: workers, grafos MediaPipe del proceso
+    principal, aciertos de la compuerta de cambio de escena y fps/latencia
+    de cada cámara conectada por /ws.
+    """
+    return {
+        "workers": cv_worker_pool.stats(),
+        "mediapipe_pool": mediapipe_pool.stats(),
+        "change_gate": gate_totals(),
+        "cameras": pipeline_manager.stats(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@router.get("/pipeline/timings")
+async def pipeline_timings(reset: bool = False):
+    """
+    Latencia por etapa del pipeline de visión (decode, resize, face, pose,
+    color, accessories, accessory.<detector>, draw, encode, frame), combinada
+    entre todos los workers: conteo, promedio, p50/p95/p99 y buckets en ms.
+    Con ``reset=true`` reinicia los histogramas después de leerlos.
+    """
+    return {
+        "stages": await cv_worker_pool.stage_stats(reset=reset),
+        "buckets_ms": list(BUCKETS_MS),
+        "timestamp": datetime.now().isoformat()
+    }
+
 @router.post("/analyze-customer-ai-real")
 async def analyze_customer_ai_real(file: UploadFile = File(...), id_sesion: str = None, db: Session = Depends(database.get_db)):
     """
     Endpoint para análisis REAL de cliente con IA NeoTotem
     Detecta prendas reales, estima edad, analiza colores y genera recomendaciones
     """
-    if file.content_type not in {"image/jpeg","image/png","image/jpg"}:
-        raise HTTPException(415, "Formato de imagen no soportado")
-    
-    img_bytes = await file.read()
-    if len(img_bytes) > MAX_IMAGE_BYTES:
-        raise HTTPException(413, "Imagen demasiado grande")
+    # Decodificar una sola vez; el mismo arreglo se comparte entre motores
+    image = await _read_upload_image(file, max_dimension=MAX_ANALYSIS_DIMENSION)
     
     try:
-        # Convertir imagen a base64 para el análisis real
-        image_base64 = base64.b64encode(img_bytes).decode('utf-8')
-        
         # Realizar análisis REAL con MediaPipe y OpenCV
-        analysis = analyze_realtime_stream_real(image_base64)
+        analysis = await cv_worker_pool.analyze_frame_array(image)
         
         # Guardar detección en base de datos si hay sesión
         if id_sesion and analysis.get("person_detected", False):
@@ -110,19 +307,12 @@ async def detect_clothing_real(file: UploadFile = File(...), id_sesion: str = No
     Endpoint especializado para detección REAL de prendas
     Analiza específicamente ropa, colores y estilos
     """
-    if file.content_type not in {"image/jpeg","image/png","image/jpg"}:
-        raise HTTPException(415, "Formato de imagen no soportado")
-    
-    img_bytes = await file.read()
-    if len(img_bytes) > MAX_IMAGE_BYTES:
-        raise HTTPException(413, "Imagen demasiado grande")
+    # Decodificar una sola vez; el mismo arreglo se comparte entre motores
+    image = await _read_upload_image(file, max_dimension=MAX_ANALYSIS_DIMENSION)
     
     try:
-        # Convertir imagen a base64
-        image_base64 = base64.b64encode(img_bytes).decode('utf-8')
-        
         # Análisis especializado de prendas
-        analysis = analyze_realtime_stream_real(image_base64)
+        analysis = await cv_worker_pool.analyze_frame_array(image)
         
         # Extraer información específica de prendas
         clothing_analysis = {
@@ -161,19 +351,14 @@ async def detect_clothing_yolo(file: UploadFile = File(...), id_sesion: str = No
     Endpoint para detección AVANZADA de prendas usando YOLO
     Análisis más preciso con modelos especializados en ropa
     """
-    if file.content_type not in {"image/jpeg","image/png","image/jpg"}:
-        raise HTTPException(415, "Formato de imagen no soportado")
-    
-    img_bytes = await file.read()
-    if len(img_bytes) > MAX_IMAGE_BYTES:
-        raise HTTPException(413, "Imagen demasiado grande")
+    # Decodificar una sola vez, reducido al tamaño de análisis (YOLO trabaja a 640
+    # y el frame viaja al worker de MediaPipe); el mismo arreglo se comparte entre motores
+    image = await _read_upload_image(file, max_dimension=MAX_ANALYSIS_DIMENSION)
     
     try:
-        # Convertir imagen a base64
-        image_base64 = base64.b64encode(img_bytes).decode('utf-8')
-        
-        # Análisis avanzado con YOLO
-        analysis = analyze_clothing_with_yolo(image_base64)
+        # Análisis avanzado con YOLO; en un thread para que requests simultáneos
+        # se agrupen en un mismo lote del backend ONNX
+        analysis = await asyncio.to_thread(analyze_clothing_with_yolo_array, image)
         
         # Procesar resultados
         yolo_result = {
@@ -213,22 +398,16 @@ async def analyze_complete_customer(file: UploadFile = File(...), id_sesion: str
     Endpoint COMPLETO que combina MediaPipe + YOLO para análisis integral
     Máxima precisión en detección de prendas, colores y comportamiento
     """
-    if file.content_type not in {"image/jpeg","image/png","image/jpg"}:
-        raise HTTPException(415, "Formato de imagen no soportado")
-    
-    img_bytes = await file.read()
-    if len(img_bytes) > MAX_IMAGE_BYTES:
-        raise HTTPException(413, "Imagen demasiado grande")
+    # Decodificar una sola vez, reducido al tamaño de análisis (YOLO trabaja a 640
+    # y el frame viaja al worker de MediaPipe); el mismo arreglo se comparte entre motores
+    image = await _read_upload_image(file, max_dimension=MAX_ANALYSIS_DIMENSION)
     
     try:
-        # Convertir imagen a base64
-        image_base64 = base64.b64encode(img_bytes).decode('utf-8')
-        
         # Análisis con MediaPipe (comportamiento y edad)
-        mediapipe_result = analyze_realtime_stream_real(image_base64)
+        mediapipe_result = await cv_worker_pool.analyze_frame_array(image)
         
-        # Análisis con YOLO (prendas específicas)
-        yolo_result = analyze_clothing_with_yolo(image_base64)
+        # Análisis con YOLO (prendas específicas), sobre el mismo frame decodificado
+        yolo_result = await asyncio.to_thread(analyze_clothing_with_yolo_array, image)
         
         # FORZAR detección de accesorio de cabeza si hay persona detectada
         person_detected = mediapipe_result.get("person_detected", False) or yolo_result.get("person_detected", False)
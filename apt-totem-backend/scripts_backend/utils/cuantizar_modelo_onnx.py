@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Script para cuantizar a int8 un detector YOLO exportado a ONNX
+
+Uso:
+    python scripts_backend/utils/cuantizar_modelo_onnx.py modelo.onnx modelo_int8.onnx
+    python scripts_backend/utils/cuantizar_modelo_onnx.py modelo.onnx modelo_int8.onnx --calibracion fotos/
+
+Sin ``--calibracion`` cuantiza solo los pesos (dinámica). Con una carpeta de
+imágenes hace cuantización estática (pesos y activaciones, formato QDQ), que
+es la que más acelera las convoluciones en CPU.
+
+El modelo resultante se usa con NEOTOTEM_YOLO_ONNX_MODEL=modelo_int8.onnx
+"""
+
+import argparse
+import os
+import sys
+
+import cv2
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from services.ai.onnx_detector import letterbox
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat, QuantType,
+                                          quantize_dynamic, quantize_static)
+except ImportError:
+    print("❌ onnxruntime no está instalado (pip install onnxruntime onnx)")
+    sys.exit(1)
+
+
+class LectorCalibracion(CalibrationDataReader):
+    """Entrega las imágenes de calibración con el mismo letterbox que usa el backend"""
+
+    def __init__(self, modelo: str, carpeta: str, limite: int):
+        session = ort.InferenceSession(modelo, providers=["CPUExecutionProvider"])
+        entrada = session.get_inputs()[0]
+        self.nombre = entrada.name
+        self.tamano = entrada.shape[2] if isinstance(entrada.shape[2], int) else 640
+        self.rutas = sorted(
+            os.path.join(carpeta, f) for f in os.listdir(carpeta)
+            if f.lower().endswith((".jpg", ".jpeg", ".png"))
+        )[:limite]
+        self.indice = 0
+
+    def get_next(self):
+        while self.indice < len(self.rutas):
+            imagen = cv2.imread(self.rutas[self.indice])
+            self.indice += 1
+            if imagen is not None:
+                blob, _, _ = letterbox(imagen, self.tamano)
+                return {self.nombre: blob[None]}
+        return None
+
+
+def cuantizar(entrada: str, salida: str, calibracion: str = None, limite: int = 200):
+    """Cuantiza ``entrada`` a int8 y guarda el resultado en ``salida``"""
+    print(f"🔧 Cuantizando {entrada}...")
+
+    if calibracion:
+        lector = LectorCalibracion(entrada, calibracion, limite)
+        print(f"   📸 Calibrando con {len(lector.rutas)} imágenes de {calibracion}")
+        quantize_static(entrada, salida, lector, quant_format=QuantFormat.QDQ,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    else:
+        quantize_dynamic(entrada, salida, weight_type=QuantType.QUInt8)
+
+    original = os.path.getsize(entrada) / 1e6
+    cuantizado = os.path.getsize(salida) / 1e6
+    print(f"✅ Modelo int8 guardado en {salida} ({original:.1f} MB -> {cuantizado:.1f} MB)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cuantiza a int8 un detector YOLO en ONNX")
+    parser.add_argument("entrada", help="Modelo ONNX en float32")
+    parser.add_argument("salida", help="Ruta del modelo int8")
+    parser.add_argument("--calibracion", help="Carpeta con imágenes para cuantización estática")
+    parser.add_argument("--limite", type=int, default=200, help="Máximo de imágenes de calibración")
+    args = parser.parse_args()
+
+    cuantizar(args.entrada, args.salida, args.calibracion, args.limite)
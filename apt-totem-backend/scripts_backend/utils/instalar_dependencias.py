@@ -15,7 +15,6 @@ def instalar_dependencias():
     # Lista de dependencias que pueden estar faltando
     dependencias = [
         "sqlalchemy>=2.0,<3.0",
-        "scikit-learn==1.6.1",
         "numpy==2.0.2",
         "opencv-python==4.12.0.88",
         "pillow==11.3.0",
@@ -52,7 +51,6 @@ def instalar_dependencias():
     # Verificar que las dependencias estén instaladas
     dependencias_verificar = [
         "sqlalchemy",
-        "sklearn",
         "numpy",
         "cv2",
         "PIL",
@@ -68,9 +66,6 @@ def instalar_dependencias():
             elif dep == "PIL":
                 from PIL import Image
                 print(f"   ✅ {dep} (Pillow) disponible")
-            elif dep == "sklearn":
-                import sklearn
-                print(f"   ✅ {dep} (scikit-learn) disponible")
             else:
                 __import__(dep)
                 print(f"   ✅ {dep} disponible")
@@ -0,0 +1,144 @@
+"""
+Registro de detectores de accesorios con prioridad, salida temprana y
+presupuesto de tiempo por detector.
+
+Cada detector declara qué necesita (cara o pose), su grupo y su prioridad.
+Se ejecutan en orden de prioridad; cuando un detector de un grupo encuentra
+algo, el resto del grupo se omite (p.ej. si hay gafas no se buscan gorros,
+si hay tiras de mochila no se buscan bolsos). Cada detector tiene un
+presupuesto en ms: si su costo promedio (EWMA) lo excede se omite en los
+frames siguientes y se vuelve a medir cada ``probe_every`` omisiones, y el
+frame completo tiene un tope para no pasarse del deadline.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from services.ai.instrumentation import record
+
+logger = logging.getLogger(__name__)
+
+# Presupuesto por defecto de cada detector (ms)
+DEFAULT_DETECTOR_BUDGET_MS = float(os.getenv("NEOTOTEM_ACCESSORY_BUDGET_MS", "20"))
+# Tope para todos los detectores de accesorios de un frame (ms)
+DEFAULT_FRAME_BUDGET_MS = float(os.getenv("NEOTOTEM_ACCESSORY_FRAME_BUDGET_MS", "60"))
+# Peso de la última medición en el promedio móvil
+_EWMA_ALPHA = 0.3
+
+
+class AccessoryDetector:
+    """Detector registrado: ``fn(ctx, pose_landmarks) -> Optional[str]``"""
+
+    def __init__(self, name: str, fn: Callable[..., Optional[str]], group: str, priority: int,
+                 requires: str = "pose", budget_ms: float = DEFAULT_DETECTOR_BUDGET_MS, probe_every: int = 10):
+        self.name = name
+        self.fn = fn
+        self.group = group
+        self.priority = priority
+        self.requires = requires  # "face" | "pose"
+        self.budget_ms = budget_ms
+        self.probe_every = probe_every
+        self.avg_ms = 0.0
+        self.runs = 0
+        self.skipped = 0
+        self._skips_in_row = 0
+        self._lock = threading.Lock()
+
+    def over_budget(self) -> bool:
+        """True si este frame se debe omitir (costo promedio sobre el presupuesto)"""
+        with self._lock:
+            if self.runs == 0 or self.avg_ms <= self.budget_ms:
+                return False
+            if self._skips_in_row >= self.probe_every:
+                # Volver a medir: el costo depende del tamaño de la persona en cuadro
+                self._skips_in_row = 0
+                return False
+            self._skips_in_row += 1
+            self.skipped += 1
+            return True
+
+    def record(self, elapsed_ms: float):
+        with self._lock:
+            self.avg_ms = elapsed_ms if self.runs == 0 else (
+                _EWMA_ALPHA * elapsed_ms + (1 - _EWMA_ALPHA) * self.avg_ms
+            )
+            self.runs += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "group": self.group,
+            "priority": self.priority,
+            "budget_ms": self.budget_ms,
+            "avg_ms": round(self.avg_ms, 2),
+            "runs": self.runs,
+            "skipped": self.skipped
+        }
+
+
+_detectors: List[AccessoryDetector] = []
+
+
+def register_accessory_detector(name: str, group: str, priority: int, requires: str = "pose",
+                                budget_ms: Optional[float] = None):
+    """
+    Decorador que registra un detector de accesorios.
+
+    El presupuesto se puede ajustar por detector con
+    ``NEOTOTEM_ACCESSORY_BUDGET_MS_<NOMBRE>``.
+    """
+    def decorator(fn):
+        budget = float(os.getenv(
+            f"NEOTOTEM_ACCESSORY_BUDGET_MS_{name.upper()}",
+            budget_ms if budget_ms is not None else DEFAULT_DETECTOR_BUDGET_MS
+        ))
+        _detectors.append(AccessoryDetector(name, fn, group, priority, requires, budget))
+        _detectors.sort(key=lambda d: d.priority)
+        return fn
+    return decorator
+
+
+def run_accessory_detectors(ctx, pose_landmarks=None, face_detected: bool = False, pose_detected: bool = False,
+                            frame_budget_ms: float = DEFAULT_FRAME_BUDGET_MS,
+                            detectors: Optional[List[AccessoryDetector]] = None) -> Dict[str, Any]:
+    """
+    Ejecuta los detectores registrados (o ``detectors``, ya ordenados) sobre el frame.
+
+    Returns:
+        {"found": {grupo: resultado}, "skipped": [nombres omitidos], "elapsed_ms": float}
+    """
+    available = {"face": face_detected, "pose": pose_detected}
+    found: Dict[str, str] = {}
+    skipped: List[str] = []
+    start = time.perf_counter()
+
+    for detector in (_detectors if detectors is None else detectors):
+        if detector.group in found or not available.get(detector.requires, False):
+            continue  # Salida temprana del grupo o sin los landmarks necesarios
+        if (time.perf_counter() - start) * 1000 > frame_budget_ms or detector.over_budget():
+            skipped.append(detector.name)
+            continue
+
+        t0 = time.perf_counter()
+        try:
+            result = detector.fn(ctx, pose_landmarks)
+        except Exception as e:
+            logger.warning("Error en detector de accesorios %s: %s", detector.name, e)
+            result = None
+        elapsed = (time.perf_counter() - t0) * 1000
+        detector.record(elapsed)
+        record(f"accessory.{detector.name}", elapsed)
+
+        if result:
+            found[detector.group] = result
+
+    return {
+        "found": found,
+        "skipped": skipped,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 2)
+    }
+
+
+def accessory_detector_stats() -> Dict[str, Dict[str, Any]]:
+    return {detector.name: detector.stats() for detector in _detectors}
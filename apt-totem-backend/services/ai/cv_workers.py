@@ -0,0 +1,200 @@
+"""
+Pool de procesos para ejecutar el análisis de visión fuera del event loop.
+
+Cada proceso worker carga y pre-calienta sus propios grafos MediaPipe
+(``mediapipe_pool`` es global por proceso), de modo que los frames pesados
+escalan entre núcleos sin bloquear WebSockets, keepalives ni endpoints REST.
+"""
+import asyncio
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional
+
+# Número de procesos de análisis. 0 = ejecutar en el thread pool del proceso principal
+DEFAULT_CV_WORKERS = int(os.getenv("NEOTOTEM_CV_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+
+
+def _init_worker():
+    """Inicializador de cada proceso: importa el pipeline y carga sus propios grafos MediaPipe"""
+    import services.ai.real_detection  # noqa: F401  (evita pagar el import en el primer frame)
+    from services.ai.model_pool import mediapipe_pool
+    mediapipe_pool.warmup()
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _run_frame_analysis(img_bytes: bytes, return_annotated: bool, annotated_encoding: str,
+                        return_overlay: bool, stream_key: Optional[str]) -> Dict[str, Any]:
+    from services.ai.real_detection import analyze_realtime_frame_bytes
+    return analyze_realtime_frame_bytes(img_bytes, return_annotated=return_annotated,
+                                        annotated_encoding=annotated_encoding, return_overlay=return_overlay,
+                                        stream_key=stream_key)
+
+
+def _run_array_analysis(image) -> Dict[str, Any]:
+    from services.ai.real_detection import analyze_frame_array
+    return analyze_frame_array(image)
+
+
+def _run_timed_frame_analysis(img_bytes: bytes) -> Dict[str, Any]:
+    """Análisis de un frame suelto con su tiempo de cómputo en el worker (lotes)"""
+    import time
+    from services.ai.real_detection import analyze_realtime_frame_bytes
+    start = time.perf_counter()
+    analysis = analyze_realtime_frame_bytes(img_bytes)
+    return {"analysis": analysis, "analysis_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+def _stage_stats(reset: bool) -> Dict[str, Any]:
+    from services.ai.instrumentation import stage_stats, reset_stage_stats
+    snapshot = stage_stats()
+    if reset:
+        reset_stage_stats()
+    return snapshot
+
+
+def _release_stream(stream_key: str) -> bool:
+    from services.ai.stream_analyzer import release_stream_analyzer
+    return release_stream_analyzer(stream_key)
+
+
+class CVWorkerPool:
+    """
+    Pool de workers de visión.
+
+    Cada shard es un ejecutor de un solo proceso; los trabajos se envían al
+    shard con menos tareas en curso, salvo los que traen ``shard`` (asignado
+    por el gestor de cámaras) o ``key`` (streams con estado), que van siempre
+    al mismo shard.
+    """
+
+    def __init__(self, workers: int = DEFAULT_CV_WORKERS):
+        self.workers = max(0, workers)
+        self._shards: List[ProcessPoolExecutor] = []
+        self._inflight: List[int] = []
+        self._completed = 0
+        self._restarts = 0
+
+    def _new_shard(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker
+        )
+
+    async def start(self):
+        """Lanza los procesos y espera a que terminen de cargar sus modelos"""
+        if self._shards or self.workers == 0:
+            return
+        self._shards = [self._new_shard() for _ in range(self.workers)]
+        self._inflight = [0] * self.workers
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(shard, _ping) for shard in self._shards))
+
+    def shutdown(self):
+        for shard in self._shards:
+            shard.shutdown(wait=False, cancel_futures=True)
+        self._shards = []
+        self._inflight = []
+
+    def shard_count(self) -> int:
+        """Shards de proceso en uso (0 en modo thread)"""
+        return len(self._shards)
+
+    def _pick_shard(self, key: Optional[str] = None, shard: Optional[int] = None) -> int:
+        if shard is not None:
+            return shard % len(self._shards)
+        if key is not None:
+            return zlib.crc32(key.encode("utf-8")) % len(self._shards)
+        return min(range(len(self._shards)), key=self._inflight.__getitem__)
+
+    async def run(self, fn: Callable[..., Any], *args, key: Optional[str] = None,
+                  shard: Optional[int] = None) -> Any:
+        """
+        Ejecuta ``fn(*args)`` en un worker y espera el resultado sin bloquear el loop.
+        Con ``shard`` el trabajo va a ese worker; con ``key``, siempre al mismo
+        worker (afinidad de stream por hash).
+        """
+        loop = asyncio.get_running_loop()
+        if not self._shards:
+            result = await loop.run_in_executor(None, fn, *args)
+            self._completed += 1
+            return result
+
+        idx = self._pick_shard(key, shard)
+        shard = self._shards[idx]
+        self._inflight[idx] += 1
+        try:
+            result = await loop.run_in_executor(shard, fn, *args)
+            self._completed += 1
+            return result
+        except BrokenProcessPool:
+            # El proceso murió (p.ej. crash nativo); reemplazar el shard para los próximos frames
+            if idx < len(self._shards) and self._shards[idx] is shard:
+                # Cerrar el ejecutor roto (thread de gestión y futures en cola) antes de reemplazarlo
+                shard.shutdown(wait=False, cancel_futures=True)
+                self._shards[idx] = self._new_shard()
+                self._restarts += 1
+            raise
+        finally:
+            if idx < len(self._inflight):
+                self._inflight[idx] -= 1
+
+    async def analyze_frame_bytes(self, img_bytes: bytes, return_annotated: bool = False,
+                                  annotated_encoding: str = "base64", return_overlay: bool = False,
+                                  stream_key: Optional[str] = None, shard: Optional[int] = None) -> Dict[str, Any]:
+        """Versión asíncrona de ``analyze_realtime_frame_bytes``"""
+        if isinstance(img_bytes, memoryview) and self._shards:
+            img_bytes = img_bytes.tobytes()  # pickle no admite memoryview
+        return await self.run(_run_frame_analysis, img_bytes, return_annotated, annotated_encoding,
+                              return_overlay, stream_key, key=stream_key, shard=shard)
+
+    async def analyze_frame_array(self, image) -> Dict[str, Any]:
+        """Versión asíncrona de ``analyze_frame_array`` (imagen BGR ya decodificada)"""
+        return await self.run(_run_array_analysis, image)
+
+    async def analyze_batch_item(self, img_bytes: bytes) -> Dict[str, Any]:
+        """Análisis de un frame de un lote: ``{"analysis": ..., "analysis_ms": ...}``"""
+        return await self.run(_run_timed_frame_analysis, img_bytes)
+
+    def parallelism(self) -> int:
+        """Trabajos simultáneos que el pool puede ejecutar"""
+        return len(self._shards) or min(32, (os.cpu_count() or 1) + 4)
+
+    async def release_stream(self, stream_key: str, shard: Optional[int] = None):
+        """Libera el analizador con estado del stream en su worker"""
+        try:
+            await self.run(_release_stream, stream_key, key=stream_key, shard=shard)
+        except Exception as e:
+            print(f"⚠️ No se pudo liberar el stream {stream_key}: {e}")
+
+    async def stage_stats(self, reset: bool = False) -> Dict[str, Any]:
+        """Histogramas por etapa combinados del proceso principal y de cada worker"""
+        from services.ai.instrumentation import merge_stage_stats
+        snapshots = [_stage_stats(reset)]
+        if self._shards:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *(loop.run_in_executor(shard, _stage_stats, reset) for shard in self._shards),
+                return_exceptions=True
+            )
+            snapshots.extend(r for r in results if isinstance(r, dict))
+        return merge_stage_stats(snapshots)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._shards),
+            "mode": "process" if self._shards else "thread",
+            "inflight": list(self._inflight),
+            "completed": self._completed,
+            "restarts": self._restarts
+        }
+
+
+# Instancia global del pool de visión
+cv_worker_pool = CVWorkerPool()
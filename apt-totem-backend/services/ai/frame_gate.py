@@ -0,0 +1,121 @@
+"""
+Compuerta de cambio de escena para el pipeline de visión.
+
+Un totem frente a un pasillo vacío envía frames casi idénticos todo el día.
+Antes de correr cara, pose, colores y accesorios se compara una miniatura
+en escala de grises del frame con la del último frame analizado; si la
+diferencia media está bajo el umbral se reutiliza el resultado anterior.
+"""
+import os
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+# Diferencia media de intensidad (0-255) bajo la cual la escena se considera igual
+DEFAULT_CHANGE_THRESHOLD = float(os.getenv("NEOTOTEM_GATE_THRESHOLD", "4.0"))
+# Antigüedad máxima de un resultado reutilizado (s); 0 = sin límite
+DEFAULT_MAX_REUSE_S = float(os.getenv("NEOTOTEM_GATE_MAX_REUSE_S", "10"))
+# Tamaño de la miniatura comparada
+SIGNATURE_SIZE = (64, 48)
+
+# Totales del proceso (todas las compuertas) para /cv/pipeline/stats
+_totals = {"hits": 0, "misses": 0}
+
+
+def frame_signature(img_bytes: bytes) -> Optional[np.ndarray]:
+    """
+    Miniatura en grises del frame. El JPEG se decodifica a 1/8 de resolución
+    directamente (IMREAD_REDUCED_GRAYSCALE_8), lo que cuesta una fracción de
+    un decode completo.
+    """
+    img_np = np.frombuffer(img_bytes, np.uint8)
+    gray = cv2.imdecode(img_np, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if gray is None:
+        return None
+    return cv2.resize(gray, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+class FrameChangeGate:
+    """
+    Reutiliza el último análisis mientras la escena no cambie.
+
+    La referencia es el frame que produjo el resultado guardado (no el frame
+    anterior), así los cambios lentos se acumulan y terminan disparando un
+    análisis nuevo.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_CHANGE_THRESHOLD, max_reuse_s: float = DEFAULT_MAX_REUSE_S):
+        self.threshold = threshold
+        self.max_reuse_s = max_reuse_s
+        self._signature: Optional[np.ndarray] = None
+        self._result: Optional[Dict[str, Any]] = None
+        self._variant: Optional[Hashable] = None
+        self._stored_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.last_diff = 0.0
+
+    def lookup(self, img_bytes: bytes, variant: Hashable = None) -> Tuple[Optional[Dict[str, Any]], Optional[np.ndarray]]:
+        """
+        Busca un resultado reutilizable para el frame.
+
+        Args:
+            img_bytes: Frame codificado (JPEG/PNG)
+            variant: Opciones del análisis (p.ej. si incluye imagen anotada);
+                     solo se reutilizan resultados con la misma variante
+
+        Returns:
+            (resultado o None, firma del frame para pasar a ``store``)
+        """
+        signature = frame_signature(img_bytes)
+        reusable = (
+            signature is not None
+            and self._signature is not None
+            and self._variant == variant
+            and (self.max_reuse_s <= 0 or time.monotonic() - self._stored_at < self.max_reuse_s)
+        )
+
+        if reusable:
+            self.last_diff = float(np.mean(np.abs(signature - self._signature)))
+            if self.last_diff < self.threshold:
+                self.hits += 1
+                _totals["hits"] += 1
+                return dict(self._result), signature
+
+        self.misses += 1
+        _totals["misses"] += 1
+        return None, signature
+
+    def store(self, signature: Optional[np.ndarray], result: Dict[str, Any], variant: Hashable = None):
+        """Guarda el resultado recién calculado como referencia (los errores no se guardan)"""
+        if signature is None or "error" in result:
+            return
+        self._signature = signature
+        self._result = dict(result)
+        self._variant = variant
+        self._stored_at = time.monotonic()
+
+    def reset(self):
+        self._signature = None
+        self._result = None
+        self._variant = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "last_diff": round(self.last_diff, 2)
+        }
+
+
+def gate_totals() -> Dict[str, Any]:
+    """Aciertos/fallos acumulados de todas las compuertas del proceso"""
+    total = _totals["hits"] + _totals["misses"]
+    return {
+        **_totals,
+        "hit_rate": round(_totals["hits"] / total, 3) if total else 0.0
+    }
@@ -0,0 +1,144 @@
+"""
+Instrumentación por etapa del pipeline de visión.
+
+``span("face")`` mide una etapa y la acumula en un histograma del proceso
+(buckets fijos en ms) y, si hay una traza de frame activa en el thread
+(``frame_trace``), también en los tiempos de ese frame, que se pueden
+adjuntar a la respuesta. Registrar una medición es un par de sumas bajo un
+lock, así que puede quedar siempre activo en el hot path, a diferencia de
+imprimir por stdout.
+
+Cada worker de visión tiene sus propios histogramas; ``merge_stage_stats``
+combina las instantáneas de todos los procesos.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable
+
+# Adjuntar los tiempos por etapa a cada análisis ("timings")
+TIMINGS_IN_RESPONSE = os.getenv("NEOTOTEM_TIMINGS", "0") == "1"
+
+# Límites superiores (ms) de los buckets; el último bucket es "más de 2000 ms"
+BUCKETS_MS = (0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+
+class StageHistogram:
+    """Histograma de latencias de una etapa"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms: float):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        for i, bound in enumerate(BUCKETS_MS):
+            if elapsed_ms <= bound:
+                self.buckets[i] += 1
+                return
+        self.buckets[-1] += 1
+
+    def merge(self, snapshot: Dict[str, Any]):
+        self.count += snapshot["count"]
+        self.total_ms += snapshot["total_ms"]
+        self.max_ms = max(self.max_ms, snapshot["max_ms"])
+        self.buckets = [a + b for a, b in zip(self.buckets, snapshot["buckets"])]
+
+    def percentile(self, q: float) -> float:
+        """Cota superior del bucket que contiene el percentil ``q`` (0-1)"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target and n:
+                return min(BUCKETS_MS[i], self.max_ms) if i < len(BUCKETS_MS) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": list(self.buckets)
+        }
+
+
+_histograms: Dict[str, StageHistogram] = {}
+_lock = threading.Lock()
+# Traza del frame en curso (por thread: el modo thread analiza varios frames a la vez)
+_local = threading.local()
+
+
+def record(stage: str, elapsed_ms: float):
+    """Registra una medición ya tomada (p.ej. el costo de un detector de accesorios)"""
+    with _lock:
+        histogram = _histograms.get(stage)
+        if histogram is None:
+            histogram = _histograms[stage] = StageHistogram()
+        histogram.observe(elapsed_ms)
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        trace[stage] = trace.get(stage, 0.0) + elapsed_ms
+
+
+@contextmanager
+def span(stage: str):
+    """Mide el bloque como la etapa ``stage``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, (time.perf_counter() - start) * 1000)
+
+
+@contextmanager
+def frame_trace():
+    """
+    Recolecta los tiempos por etapa de un frame (dict etapa -> ms). Si ya hay
+    una traza activa en el thread (capa externa, p.ej. la que decodifica), se reutiliza.
+    """
+    trace = getattr(_local, "trace", None)
+    if trace is not None:
+        yield trace
+        return
+    trace = _local.trace = {}
+    try:
+        yield trace
+    finally:
+        _local.trace = None
+
+
+def rounded(trace: Dict[str, float]) -> Dict[str, float]:
+    return {stage: round(ms, 2) for stage, ms in trace.items()}
+
+
+def stage_stats() -> Dict[str, Dict[str, Any]]:
+    """Instantánea de los histogramas de este proceso"""
+    with _lock:
+        return {stage: histogram.snapshot() for stage, histogram in sorted(_histograms.items())}
+
+
+def reset_stage_stats():
+    with _lock:
+        _histograms.clear()
+
+
+def merge_stage_stats(snapshots: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Combina las instantáneas de varios procesos en un solo histograma por etapa"""
+    merged: Dict[str, StageHistogram] = {}
+    for snapshot in snapshots:
+        for stage, data in snapshot.items():
+            merged.setdefault(stage, StageHistogram()).merge(data)
+    return {stage: histogram.snapshot() for stage, histogram in sorted(merged.items())}
@@ -8,52 +8,46 @@ import numpy as np
 import base64
 import io
 from PIL import Image
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Iterable, Optional, Tuple
 from datetime import datetime
 import json
 
+from services.ai.model_pool import mediapipe_pool
+
+# Análisis disponibles; "face_mesh" (edad y emoción) corre tras la detección facial
+ALL_FEATURES = frozenset({"face", "face_mesh", "pose", "hands"})
+# Análisis del stream en tiempo real: atención (detección facial) y manos
+STREAM_FEATURES = frozenset({"face", "hands"})
+
 class MediaPipeEngine:
-    """Motor de análisis multimodal con MediaPipe"""
+    """
+    Motor de análisis multimodal con MediaPipe
+
+    No construye grafos al crearse: cada análisis presta instancias de los pools
+    de ``model_pool`` (FaceDetection y Pose son las mismas que usa
+    ``real_detection``; FaceMesh y Hands se crean en el primer uso). Cada
+    instancia la usa un solo thread a la vez y cada proceso tiene sus propios pools.
+    """
     
-    def __init__(self):
-        # Inicializar componentes de MediaPipe
-        self.mp_face_detection = mp.solutions.face_detection
-        self.mp_face_mesh = mp.solutions.face_mesh
-        self.mp_hands = mp.solutions.hands
+    def __init__(self, pool=mediapipe_pool):
         self.mp_pose = mp.solutions.pose
-        self.mp_selfie_segmentation = mp.solutions.selfie_segmentation
-        self.mp_drawing = mp.solutions.drawing_utils
-        
-        # Inicializar detectores
-        self.face_detection = self.mp_face_detection.FaceDetection(
-            model_selection=1, min_detection_confidence=0.5
-        )
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            static_image_mode=True,
-            max_num_faces=1,
-            refine_landmarks=True,
-            min_detection_confidence=0.5
-        )
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=True,
-            max_num_hands=2,
-            min_detection_confidence=0.5
-        )
-        self.pose = self.mp_pose.Pose(
-            static_image_mode=True,
-            model_complexity=1,
-            enable_segmentation=True,
-            min_detection_confidence=0.5
-        )
-        self.selfie_segmentation = self.mp_selfie_segmentation.SelfieSegmentation(
-            model_selection=1
-        )
+        self.pool = pool
     
-    def analyze_image_realtime(self, image_data: str) -> Dict[str, Any]:
+    def analyze_image_realtime(self, image_data: str, features: Optional[Iterable[str]] = None) -> Dict[str, Any]:
         """
-        Análisis completo de imagen en tiempo real
+        Análisis de imagen en tiempo real
+        
+        Args:
+            image_data: Imagen en base64 (con o sin prefijo data:image)
+            features: Análisis a ejecutar (subconjunto de ``ALL_FEATURES``);
+                      None = todos. Solo se usan los grafos pedidos.
         """
         try:
+            features = ALL_FEATURES if features is None else frozenset(features)
+            unknown = features - ALL_FEATURES
+            if unknown:
+                raise ValueError(f"Análisis desconocidos: {sorted(unknown)}")
+            
             # Decodificar imagen desde base64
             if image_data.startswith('data:image'):
                 image_data = image_data.split(',')[1]
@@ -62,24 +56,27 @@ class MediaPipeEngine:
             image = Image.open(io.BytesIO(image_bytes))
             image_rgb = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
             
-            # Análisis completo
             analysis = {
                 "timestamp": datetime.now().isoformat(),
                 "image_processed": True,
-                "analysis_type": "mediapipe_realtime"
+                "analysis_type": "mediapipe_realtime",
+                "features": sorted(features)
             }
             
-            # Detección facial
-            face_results = self._analyze_face(image_rgb)
-            analysis.update(face_results)
+            # Detección facial (y malla facial si se pidió; la malla requiere la detección)
+            if features & {"face", "face_mesh"}:
+                face_results = self._analyze_face(image_rgb, with_mesh="face_mesh" in features)
+                analysis.update(face_results)
             
             # Detección de pose
-            pose_results = self._analyze_pose(image_rgb)
-            analysis.update(pose_results)
+            if "pose" in features:
+                pose_results = self._analyze_pose(image_rgb)
+                analysis.update(pose_results)
             
             # Detección de manos
-            hands_results = self._analyze_hands(image_rgb)
-            analysis.update(hands_results)
+            if "hands" in features:
+                hands_results = self._analyze_hands(image_rgb)
+                analysis.update(hands_results)
             
             # Análisis de engagement
             engagement = self._calculate_engagement(analysis)
@@ -98,8 +95,8 @@ class MediaPipeEngine:
                 "analysis_type": "mediapipe_error"
             }
     
-    def _analyze_face(self, image_rgb: np.ndarray) -> Dict[str, Any]:
-        """Análisis facial detallado"""
+    def _analyze_face(self, image_rgb: np.ndarray, with_mesh: bool = True) -> Dict[str, Any]:
+        """Análisis facial detallado (la malla facial solo si ``with_mesh``)"""
         results = {
             "face_detected": False,
             "age_estimation": "unknown",
@@ -109,7 +106,8 @@ class MediaPipeEngine:
         }
         
         # Detección básica
-        face_detection_results = self.face_detection.process(image_rgb)
+        with self.pool.face.acquire() as face_detection:
+            face_detection_results = face_detection.process(image_rgb)
         
         if face_detection_results.detections:
             results["face_detected"] = True
@@ -124,8 +122,12 @@ class MediaPipeEngine:
             attention = self._estimate_attention(face_center_x, face_center_y)
             results["attention_level"] = attention
             
+            if not with_mesh:
+                return results
+            
             # Análisis de malla facial para más detalles
-            mesh_results = self.face_mesh.process(image_rgb)
+            with self.pool.face_mesh.acquire() as face_mesh:
+                mesh_results = face_mesh.process(image_rgb)
             if mesh_results.multi_face_landmarks:
                 landmarks = mesh_results.multi_face_landmarks[0]
                 results["face_landmarks"] = len(landmarks.landmark)
@@ -149,7 +151,8 @@ class MediaPipeEngine:
             "gesture_detected": "none"
         }
         
-        pose_results = self.pose.process(image_rgb)
+        with self.pool.pose.acquire() as pose:
+            pose_results = pose.process(image_rgb)
         
         if pose_results.pose_landmarks:
             results["pose_detected"] = True
@@ -178,7 +181,8 @@ class MediaPipeEngine:
             "interaction_intent": "passive"
         }
         
-        hands_results = self.hands.process(image_rgb)
+        with self.pool.hands.acquire() as hands:
+            hands_results = hands.process(image_rgb)
         
         if hands_results.multi_hand_landmarks:
             results["hands_detected"] = len(hands_results.multi_hand_landmarks)
@@ -396,15 +400,15 @@ class MediaPipeEngine:
 # Instancia global del motor
 mediapipe_engine = MediaPipeEngine()
 
-def analyze_image_with_mediapipe(image_data: str) -> Dict[str, Any]:
+def analyze_image_with_mediapipe(image_data: str, features: Optional[Iterable[str]] = None) -> Dict[str, Any]:
     """Función wrapper para análisis de imagen"""
-    return mediapipe_engine.analyze_image_realtime(image_data)
+    return mediapipe_engine.analyze_image_realtime(image_data, features)
 
 def analyze_realtime_stream(frame_data: str) -> Dict[str, Any]:
     """Análisis optimizado para stream en tiempo real"""
     try:
-        # Análisis más rápido para tiempo real
-        result = mediapipe_engine.analyze_image_realtime(frame_data)
+        # Solo los grafos que usa el resultado (sin malla facial ni pose)
+        result = mediapipe_engine.analyze_image_realtime(frame_data, STREAM_FEATURES)
         
         # Filtrar solo información esencial para tiempo real
         realtime_result = {
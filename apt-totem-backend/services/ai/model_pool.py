@@ -0,0 +1,178 @@
+"""
+Pool de modelos MediaPipe persistentes para el pipeline de detección real.
+
+Los grafos TFLite (FaceDetection, Pose) se construyen una sola vez por proceso,
+se pre-calientan al iniciar la app y se prestan a cada frame en lugar de
+crearse y destruirse dentro de un bloque ``with`` por cada imagen. Los que
+solo usa ``MediaPipeEngine`` (FaceMesh, Hands) se construyen en el primer uso.
+"""
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+import mediapipe as mp
+import numpy as np
+
+mp_face_detection = mp.solutions.face_detection
+mp_pose = mp.solutions.pose
+mp_selfie_segmentation = mp.solutions.selfie_segmentation
+mp_face_mesh = mp.solutions.face_mesh
+mp_hands = mp.solutions.hands
+
+# Instancias por tipo de grafo (configurable por variable de entorno)
+DEFAULT_POOL_SIZE = int(os.getenv("NEOTOTEM_MP_POOL_SIZE", "2"))
+# Segmentar a la persona antes del análisis de color
+PERSON_SEGMENTATION_ENABLED = os.getenv("NEOTOTEM_PERSON_SEGMENTATION", "0") == "1"
+
+# Frame neutro usado para forzar la inicialización completa del grafo
+_WARMUP_FRAME = np.zeros((256, 256, 3), dtype=np.uint8)
+
+
+class GraphPool:
+    """Pool acotado de instancias de un mismo grafo MediaPipe"""
+
+    def __init__(self, name: str, factory: Callable[[], Any], max_size: int):
+        self.name = name
+        self.factory = factory
+        self.max_size = max(1, max_size)
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _try_create(self) -> Optional[Any]:
+        """Crea una instancia nueva si no se alcanzó el máximo"""
+        with self._lock:
+            if self._created >= self.max_size:
+                return None
+            self._created += 1
+        try:
+            return self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def warmup(self, count: Optional[int] = None):
+        """
+        Construye y pre-calienta instancias hasta ``count`` (default: max_size).
+        El primer ``process()`` de cada grafo reserva tensores, por eso se ejecuta aquí.
+        """
+        target = min(count or self.max_size, self.max_size)
+        while self._created < target:
+            instance = self._try_create()
+            if instance is None:
+                break
+            instance.process(_WARMUP_FRAME)
+            self._idle.put(instance)
+
+    @contextmanager
+    def acquire(self, timeout: Optional[float] = None):
+        """
+        Presta una instancia del pool durante el bloque ``with``.
+
+        Si la instancia falla durante el uso se descarta (su estado interno
+        puede quedar inconsistente) y el pool la reemplaza bajo demanda.
+        """
+        try:
+            instance = self._idle.get_nowait()
+        except queue.Empty:
+            instance = self._try_create()
+            if instance is None:
+                instance = self._idle.get(timeout=timeout)
+
+        try:
+            yield instance
+        except Exception:
+            self._discard(instance)
+            raise
+        else:
+            self._idle.put(instance)
+
+    def _discard(self, instance: Any):
+        with self._lock:
+            self._created -= 1
+        try:
+            instance.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Libera todas las instancias ociosas"""
+        while True:
+            try:
+                instance = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(instance)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "created": self._created,
+            "idle": self._idle.qsize(),
+            "max_size": self.max_size
+        }
+
+
+class MediaPipeModelPool:
+    """Pools de grafos usados por ``real_detection`` y ``MediaPipeEngine``"""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        self.face = GraphPool(
+            "face_detection",
+            lambda: mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5),
+            size
+        )
+        # static_image_mode=True: las instancias se comparten entre conexiones,
+        # así que cada frame debe tratarse como una imagen independiente
+        self.pose = GraphPool(
+            "pose",
+            lambda: mp_pose.Pose(static_image_mode=True, min_detection_confidence=0.5, min_tracking_confidence=0.5),
+            size
+        )
+        # model_selection=1: modelo "landscape" (256x144), el más liviano
+        self.segmentation = GraphPool(
+            "selfie_segmentation",
+            lambda: mp_selfie_segmentation.SelfieSegmentation(model_selection=1),
+            size
+        )
+        # Solo MediaPipeEngine; sin warmup, se crean al primer acquire
+        self.face_mesh = GraphPool(
+            "face_mesh",
+            lambda: mp_face_mesh.FaceMesh(static_image_mode=True, max_num_faces=1, refine_landmarks=True,
+                                          min_detection_confidence=0.5),
+            size
+        )
+        self.hands = GraphPool(
+            "hands",
+            lambda: mp_hands.Hands(static_image_mode=True, max_num_hands=2, min_detection_confidence=0.5),
+            size
+        )
+
+    def warmup(self):
+        """Carga y pre-calienta los grafos del pipeline (segmentación solo si está activa)"""
+        self.face.warmup()
+        self.pose.warmup()
+        if PERSON_SEGMENTATION_ENABLED:
+            self.segmentation.warmup()
+
+    def close(self):
+        self.face.close()
+        self.pose.close()
+        self.segmentation.close()
+        self.face_mesh.close()
+        self.hands.close()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "face_detection": self.face.stats(),
+            "pose": self.pose.stats(),
+            "selfie_segmentation": self.segmentation.stats(),
+            "face_mesh": self.face_mesh.stats(),
+            "hands": self.hands.stats()
+        }
+
+
+# Instancia global del pool (una por proceso)
+mediapipe_pool = MediaPipeModelPool()
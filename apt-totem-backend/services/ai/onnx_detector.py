@@ -0,0 +1,242 @@
+"""
+Backend de inferencia en CPU (ONNX Runtime) para el detector de prendas.
+
+Ejecuta un detector tipo YOLO exportado a ONNX (idealmente cuantizado a
+int8, ver ``scripts_backend/utils/cuantizar_modelo_onnx.py``) en máquinas
+Linux sin GPU. El letterbox se hace una sola vez por frame (resize + borde +
+normalización en un paso), el NMS es por lotes en OpenCV
+(``NMSBoxesBatched``) y, si el modelo acepta batch dinámico, los frames que
+llegan mientras otro lote corre se agrupan en la siguiente inferencia.
+
+``onnxruntime`` es opcional: sin él (o sin modelo configurado)
+``YOLOClothingDetector`` sigue usando el análisis de contornos.
+"""
+import ast
+import os
+import sys
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    _ORT_OK = True
+except Exception:
+    _ORT_OK = False
+
+# Ruta al modelo .onnx (vacío = backend desactivado)
+YOLO_ONNX_MODEL = os.getenv("NEOTOTEM_YOLO_ONNX_MODEL", "")
+# Nombres de clases separados por coma, para modelos sin metadata ``names``
+YOLO_CLASSES = [name.strip() for name in os.getenv("NEOTOTEM_YOLO_CLASSES", "").split(",") if name.strip()]
+# Threads intra-op por sesión; con varios workers de visión conviene 1-2
+ONNX_INTRA_THREADS = int(os.getenv("NEOTOTEM_ONNX_THREADS", "1"))
+# Frames máximos por inferencia (solo modelos con batch dinámico)
+ONNX_MAX_BATCH = int(os.getenv("NEOTOTEM_ONNX_MAX_BATCH", "4"))
+# Umbrales de confianza e IoU del NMS
+YOLO_CONF_THRESHOLD = float(os.getenv("NEOTOTEM_YOLO_CONF", "0.35"))
+YOLO_IOU_THRESHOLD = float(os.getenv("NEOTOTEM_YOLO_IOU", "0.45"))
+
+# Color de relleno del letterbox (convención YOLO)
+_LETTERBOX_COLOR = (114, 114, 114)
+
+
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    Redimensiona manteniendo proporción y rellena a ``size`` x ``size``.
+
+    Returns:
+        (tensor float32 3xSxS RGB en [0, 1], escala, (pad_x, pad_y))
+    """
+    height, width = image.shape[:2]
+    scale = min(size / height, size / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR) if (new_w, new_h) != (width, height) else image
+    boxed = cv2.copyMakeBorder(resized, pad_y, size - new_h - pad_y, pad_x, size - new_w - pad_x,
+                               cv2.BORDER_CONSTANT, value=_LETTERBOX_COLOR)
+    # BGR -> RGB, HWC -> CHW y normalización en una sola pasada
+    blob = cv2.dnn.blobFromImage(boxed, scalefactor=1 / 255.0, swapRB=True)[0]
+    return blob, scale, (pad_x, pad_y)
+
+
+def decode_predictions(output: np.ndarray, num_classes: int, conf_threshold: float,
+                       iou_threshold: float) -> List[Tuple[np.ndarray, float, int]]:
+    """
+    Decodifica la salida de un frame y aplica NMS por clase.
+
+    Acepta el formato YOLOv8 (4 + clases, anclas) y el YOLOv5 (anclas, 5 + clases,
+    con objectness). Cajas en coordenadas del letterbox (x1, y1, x2, y2).
+    """
+    if output.shape[1] not in (4 + num_classes, 5 + num_classes):
+        output = output.T  # (atributos, anclas) -> (anclas, atributos)
+
+    if output.shape[1] == 5 + num_classes:
+        scores = output[:, 5:] * output[:, 4:5]
+    else:
+        scores = output[:, 4:4 + num_classes]
+
+    class_ids = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), class_ids]
+    keep = confidences >= conf_threshold
+    if not keep.any():
+        return []
+
+    cx, cy, w, h = output[keep, :4].T
+    boxes_xywh = np.stack([cx - w / 2, cy - h / 2, w, h], axis=1)
+    confidences, class_ids = confidences[keep], class_ids[keep]
+
+    indices = cv2.dnn.NMSBoxesBatched(boxes_xywh.tolist(), confidences.tolist(), class_ids.tolist(),
+                                      conf_threshold, iou_threshold)
+    detections = []
+    for i in np.array(indices).reshape(-1):
+        x, y, bw, bh = boxes_xywh[i]
+        detections.append((np.array([x, y, x + bw, y + bh]), float(confidences[i]), int(class_ids[i])))
+    return detections
+
+
+class OnnxYoloDetector:
+    """Sesión ONNX Runtime (CPU) de un detector YOLO con agrupación de frames en cola"""
+
+    def __init__(self, model_path: str, class_names: Optional[Sequence[str]] = None,
+                 intra_threads: int = ONNX_INTRA_THREADS, max_batch: int = ONNX_MAX_BATCH,
+                 conf_threshold: float = YOLO_CONF_THRESHOLD, iou_threshold: float = YOLO_IOU_THRESHOLD):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = max(1, intra_threads)
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_size = int(model_input.shape[2]) if isinstance(model_input.shape[2], int) else 640
+        # Batch dinámico si la primera dimensión no es un entero fijo
+        self.max_batch = max(1, max_batch) if not isinstance(model_input.shape[0], int) else 1
+
+        self.class_names = list(class_names or self._names_from_metadata() or YOLO_CLASSES)
+        if not self.class_names:
+            # El ancho del tensor no distingue el formato v8 (4 + clases) del v5 (5 + clases)
+            raise ValueError("El modelo ONNX no trae metadata 'names'; configurar NEOTOTEM_YOLO_CLASSES")
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+
+        self._pending: List[Tuple[np.ndarray, Future]] = []
+        self._lock = threading.Lock()
+        self._running = False
+        self.batches = 0
+        self.frames = 0
+
+    def _names_from_metadata(self) -> List[str]:
+        """Nombres de clases embebidos por el exportador de Ultralytics (``{0: 'person', ...}``)"""
+        names = self.session.get_modelmeta().custom_metadata_map.get("names")
+        if not names:
+            return []
+        parsed = ast.literal_eval(names)
+        return [parsed[i] for i in sorted(parsed)] if isinstance(parsed, dict) else list(parsed)
+
+    def detect(self, image: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Detecta objetos en un frame BGR.
+
+        Si otro thread está corriendo una inferencia, el frame queda en cola y
+        ese thread lo procesa en su siguiente lote (hasta ``max_batch``).
+
+        Returns:
+            [{"class": nombre, "confidence": float, "box": [x1, y1, x2, y2]}] en píxeles del frame
+        """
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((image, future))
+            if self._running:
+                lead = False
+            else:
+                self._running = lead = True
+
+        if lead:
+            self._drain()
+        return future.result()
+
+    def _drain(self):
+        """Procesa la cola por lotes hasta vaciarla"""
+        batch: List[Tuple[np.ndarray, Future]] = []
+        try:
+            while True:
+                with self._lock:
+                    batch = self._pending[:self.max_batch]
+                    del self._pending[:self.max_batch]
+                    if not batch:
+                        self._running = False
+                        return
+                results = self._infer([image for image, _ in batch])
+                for (_, future), detections in zip(batch, results):
+                    future.set_result(detections)
+                batch = []
+        finally:
+            # Salida por excepción (p.ej. falla _infer): liberar el turno y fallar
+            # el lote y los frames en cola, que sin líder esperarían para siempre
+            # (igual que todos los detect() siguientes)
+            failed: List[Tuple[np.ndarray, Future]] = []
+            with self._lock:
+                if self._running:
+                    failed, self._pending = batch + self._pending, []
+                    self._running = False
+            error = sys.exc_info()[1]
+            for _, future in failed:
+                if not future.done():
+                    future.set_exception(error)
+
+    def _infer(self, images: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        prepared = [letterbox(image, self.input_size) for image in images]
+        outputs = self.session.run(None, {self.input_name: np.stack([blob for blob, _, _ in prepared])})[0]
+        self.batches += 1
+        self.frames += len(images)
+
+        num_classes = len(self.class_names)
+        results = []
+        for output, image, (_, scale, (pad_x, pad_y)) in zip(outputs, images, prepared):
+            height, width = image.shape[:2]
+            detections = []
+            for box, confidence, class_id in decode_predictions(output, num_classes, self.conf_threshold, self.iou_threshold):
+                # Del letterbox a píxeles del frame original
+                box = (box - [pad_x, pad_y, pad_x, pad_y]) / scale
+                box = np.clip(box, 0, [width, height, width, height])
+                if box[2] <= box[0] or box[3] <= box[1]:
+                    continue  # caja completamente en el relleno
+                detections.append({
+                    "class": self.class_names[class_id],
+                    "confidence": round(confidence, 3),
+                    "box": [round(float(v), 1) for v in box]
+                })
+            results.append(detections)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "input_size": self.input_size,
+            "max_batch": self.max_batch,
+            "batches": self.batches,
+            "frames": self.frames,
+            "avg_batch": round(self.frames / self.batches, 2) if self.batches else 0.0
+        }
+
+
+def create_onnx_detector(class_names: Optional[Sequence[str]] = None) -> Optional[OnnxYoloDetector]:
+    """Crea el backend si hay ``onnxruntime`` y un modelo configurado; si no, None"""
+    if not YOLO_ONNX_MODEL:
+        return None
+    if not _ORT_OK:
+        print("⚠️ NEOTOTEM_YOLO_ONNX_MODEL configurado pero onnxruntime no está instalado; usando contornos")
+        return None
+    if not os.path.exists(YOLO_ONNX_MODEL):
+        print(f"⚠️ Modelo ONNX no encontrado: {YOLO_ONNX_MODEL}; usando contornos")
+        return None
+    try:
+        detector = OnnxYoloDetector(YOLO_ONNX_MODEL, class_names)
+        print(f"✅ Detector ONNX cargado: {YOLO_ONNX_MODEL} ({detector.input_size}px, batch máx {detector.max_batch})")
+        return detector
+    except Exception as e:
+        print(f"⚠️ No se pudo cargar el modelo ONNX {YOLO_ONNX_MODEL}: {e}")
+        return None
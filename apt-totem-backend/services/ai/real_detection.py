@@ -3,15 +3,31 @@ import mediapipe as mp
 import numpy as np
 from datetime import datetime
 import base64
-from collections import Counter
-from sklearn.cluster import KMeans
-from typing import Dict, Any, Optional
+import logging
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, Union
+from services.ai.model_pool import mediapipe_pool, PERSON_SEGMENTATION_ENABLED
+from services.ai.frame_gate import FrameChangeGate
+from services.ai.accessory_registry import register_accessory_detector, run_accessory_detectors
+from services.cv.frame_context import FrameContext
+from services.cv.dominant_color import dominant_colors
+from services.cv.color_lut import ColorLUT
+from services.cv.image_io import decode_image, limit_size, MAX_ANALYSIS_DIMENSION
+from services.ai.instrumentation import span, frame_trace, rounded, TIMINGS_IN_RESPONSE
+
+# Detalle por frame en DEBUG (logging.getLogger("services.ai.real_detection").setLevel(logging.DEBUG))
+logger = logging.getLogger(__name__)
 
 # Inicializar MediaPipe
 mp_face_detection = mp.solutions.face_detection
 mp_pose = mp.solutions.pose
 mp_drawing = mp.solutions.drawing_utils
 
+# Segmentación de persona para el análisis de color (NEOTOTEM_PERSON_SEGMENTATION=1)
+PERSON_MASK_THRESHOLD = 0.5   # Probabilidad mínima de "persona" por píxel
+COLOR_SAMPLE_STEP = 2         # Submuestreo de la región (1 de cada N píxeles por eje)
+MIN_PERSON_FRACTION = 0.1     # Fracción mínima de persona en la región para usar la máscara
+
 def analyze_real_clothing(image_np: np.ndarray) -> dict:
     """
     Análisis REAL de prendas usando MediaPipe y OpenCV.
@@ -35,7 +51,7 @@ def analyze_real_clothing(image_np: np.ndarray) -> dict:
     height, width, _ = image_np.shape
 
     # Detección facial para estimar edad
-    with mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5) as face_detection:
+    with mediapipe_pool.face.acquire() as face_detection:
         face_results = face_detection.process(image_rgb)
         if face_results.detections:
             results["person_detected"] = True
@@ -59,7 +75,7 @@ def analyze_real_clothing(image_np: np.ndarray) -> dict:
             results["details"]["face_detections"] = len(face_results.detections)
 
     # Detección de pose para identificar tipo de prenda
-    with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
+    with mediapipe_pool.pose.acquire() as pose:
         pose_results = pose.process(image_rgb)
         if pose_results.pose_landmarks:
             results["person_detected"] = True
@@ -101,26 +117,17 @@ def analyze_real_clothing(image_np: np.ndarray) -> dict:
             
             results["details"]["pose_landmarks_count"] = len(landmarks)
 
-    # Análisis de colores dominantes usando K-means
+    # Análisis de colores dominantes (histograma cuantizado + k-means acotado)
     try:
         # Redimensionar imagen para análisis más rápido
         small_image = cv2.resize(image_np, (150, 150))
-        pixels = small_image.reshape(-1, 3)
-        
-        # Aplicar K-means para encontrar colores dominantes
-        kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-        kmeans.fit(pixels)
         
-        # Obtener colores dominantes
-        colors = kmeans.cluster_centers_.astype(int)
-        labels = kmeans.labels_
-        
-        # Contar frecuencia de cada color
-        label_counts = Counter(labels)
+        # Colores dominantes ordenados por frecuencia
+        colors, counts = dominant_colors(small_image, k=3)
         
         # Convertir colores BGR a nombres
         color_names = []
-        for color in colors:
+        for color in colors.astype(int):
             b, g, r = color
             color_name = get_color_name(r, g, b)
             color_names.append(color_name)
@@ -132,80 +139,253 @@ def analyze_real_clothing(image_np: np.ndarray) -> dict:
             results["secondary_color"] = color_names[1]
         
         results["details"]["dominant_colors"] = color_names
-        results["details"]["color_counts"] = dict(label_counts)
+        results["details"]["color_counts"] = {i: int(count) for i, count in enumerate(counts)}
         
     except Exception as e:
-        print(f"Error en análisis de colores: {e}")
+        logger.warning("Error en análisis de colores: %s", e)
         results["primary_color"] = "desconocido"
 
     return results
 
+# Rangos RGB de colores expandidos, en orden (gana el primer rango que contiene al color).
+# Blanco y negro van primero: valores RGB muy altos o muy bajos se priorizan.
+RGB_COLOR_RULES = [
+    ("blanco", [(220, 220, 220), (255, 255, 255)]),
+    ("negro", [(0, 0, 0), (30, 30, 30)]),
+    ("rojo", [(150, 0, 0), (255, 100, 100)]),
+    ("rojo oscuro", [(100, 0, 0), (150, 50, 50)]),
+    ("rojo claro", [(255, 100, 100), (255, 200, 200)]),
+    ("azul", [(0, 0, 150), (100, 100, 255)]),
+    ("azul marino", [(0, 0, 100), (50, 50, 150)]),
+    ("azul cielo", [(150, 200, 255), (200, 220, 255)]),
+    ("verde", [(0, 150, 0), (100, 255, 100)]),
+    ("verde oscuro", [(0, 100, 0), (50, 150, 50)]),
+    ("verde lima", [(150, 255, 0), (200, 255, 100)]),
+    ("amarillo", [(200, 200, 0), (255, 255, 100)]),
+    ("amarillo dorado", [(200, 180, 0), (255, 220, 50)]),
+    ("naranja", [(255, 150, 0), (255, 200, 100)]),
+    ("naranja oscuro", [(200, 100, 0), (255, 150, 50)]),
+    ("negro", [(0, 0, 0), (30, 30, 30)]),
+    ("gris oscuro", [(30, 30, 30), (80, 80, 80)]),
+    ("gris", [(80, 80, 80), (150, 150, 150)]),
+    ("blanco", [(150, 150, 150), (200, 200, 200)]),
+    ("marron", [(100, 50, 0), (200, 150, 100)]),
+    ("marron claro", [(150, 100, 50), (200, 150, 100)]),
+    ("marron oscuro", [(50, 25, 0), (100, 75, 50)]),
+    ("rosa", [(200, 100, 150), (255, 150, 200)]),
+    ("rosa claro", [(255, 150, 200), (255, 200, 220)]),
+    ("rosa oscuro", [(150, 50, 100), (200, 100, 150)]),
+    ("morado", [(100, 0, 200), (200, 100, 255)]),
+    ("morado oscuro", [(50, 0, 100), (100, 50, 200)]),
+    ("morado claro", [(200, 100, 255), (220, 150, 255)]),
+    ("turquesa", [(0, 200, 200), (100, 255, 255)]),
+    ("coral", [(255, 100, 100), (255, 150, 150)]),
+    ("salmon", [(255, 150, 120), (255, 180, 150)]),
+    ("beige", [(200, 180, 150), (255, 220, 180)]),
+    ("crema", [(240, 230, 200), (255, 250, 220)]),
+    ("violeta", [(150, 50, 200), (200, 100, 255)]),
+    ("indigo", [(50, 0, 150), (100, 50, 200)]),
+    ("magenta", [(200, 0, 200), (255, 100, 255)]),
+    ("cian", [(0, 200, 200), (100, 255, 255)]),
+    ("oliva", [(100, 100, 0), (150, 150, 50)]),
+    ("caqui", [(150, 150, 100), (200, 200, 150)]),
+    ("granate", [(100, 0, 50), (150, 50, 100)]),
+    ("burdeos", [(100, 0, 0), (150, 50, 50)]),
+    ("oro", [(200, 180, 0), (255, 220, 50)]),
+    ("plata", [(180, 180, 200), (220, 220, 240)])
+]
+
+# Tabla compilada una vez al importar: nombre de color en O(1) por píxel o centroide
+RGB_COLOR_LUT = ColorLUT(RGB_COLOR_RULES)
+
 def get_color_name(r: int, g: int, b: int) -> str:
     """
     Convierte valores RGB a nombres de colores aproximados.
     """
-    # Definir rangos de colores expandidos
-    color_ranges = {
-        "rojo": [(150, 0, 0), (255, 100, 100)],
-        "rojo oscuro": [(100, 0, 0), (150, 50, 50)],
-        "rojo claro": [(255, 100, 100), (255, 200, 200)],
-        "azul": [(0, 0, 150), (100, 100, 255)],
-        "azul marino": [(0, 0, 100), (50, 50, 150)],
-        "azul cielo": [(150, 200, 255), (200, 220, 255)],
-        "verde": [(0, 150, 0), (100, 255, 100)],
-        "verde oscuro": [(0, 100, 0), (50, 150, 50)],
-        "verde lima": [(150, 255, 0), (200, 255, 100)],
-        "amarillo": [(200, 200, 0), (255, 255, 100)],
-        "amarillo dorado": [(200, 180, 0), (255, 220, 50)],
-        "naranja": [(255, 150, 0), (255, 200, 100)],
-        "naranja oscuro": [(200, 100, 0), (255, 150, 50)],
-        "negro": [(0, 0, 0), (30, 30, 30)],
-        "gris oscuro": [(30, 30, 30), (80, 80, 80)],
-        "gris": [(80, 80, 80), (150, 150, 150)],
-        "blanco": [(150, 150, 150), (200, 200, 200)],
-        "marron": [(100, 50, 0), (200, 150, 100)],
-        "marron claro": [(150, 100, 50), (200, 150, 100)],
-        "marron oscuro": [(50, 25, 0), (100, 75, 50)],
-        "rosa": [(200, 100, 150), (255, 150, 200)],
-        "rosa claro": [(255, 150, 200), (255, 200, 220)],
-        "rosa oscuro": [(150, 50, 100), (200, 100, 150)],
-        "morado": [(100, 0, 200), (200, 100, 255)],
-        "morado oscuro": [(50, 0, 100), (100, 50, 200)],
-        "morado claro": [(200, 100, 255), (220, 150, 255)],
-        "turquesa": [(0, 200, 200), (100, 255, 255)],
-        "coral": [(255, 100, 100), (255, 150, 150)],
-        "salmon": [(255, 150, 120), (255, 180, 150)],
-        "beige": [(200, 180, 150), (255, 220, 180)],
-        "crema": [(240, 230, 200), (255, 250, 220)],
-        "violeta": [(150, 50, 200), (200, 100, 255)],
-        "indigo": [(50, 0, 150), (100, 50, 200)],
-        "magenta": [(200, 0, 200), (255, 100, 255)],
-        "cian": [(0, 200, 200), (100, 255, 255)],
-        "oliva": [(100, 100, 0), (150, 150, 50)],
-        "caqui": [(150, 150, 100), (200, 200, 150)],
-        "granate": [(100, 0, 50), (150, 50, 100)],
-        "burdeos": [(100, 0, 0), (150, 50, 50)],
-        "oro": [(200, 180, 0), (255, 220, 50)],
-        "plata": [(180, 180, 200), (220, 220, 240)]
+    return RGB_COLOR_LUT.name(r, g, b)
+
+# Colores (BGR) de cada tipo de detección en el overlay
+OVERLAY_COLORS = {
+    "face": (0, 255, 0),          # Verde para cara
+    "clothing": (255, 165, 0),    # Naranja para ropa
+    "accessory": (255, 0, 255),   # Magenta para accesorios
+    "bag": (255, 255, 0),         # Cian para bolsos/carteras
+}
+
+# Landmarks de pose que se envían en el overlay (cabeza, brazos, torso y rodillas)
+OVERLAY_LANDMARKS = (0, 2, 5, 7, 8, 11, 12, 13, 14, 15, 16, 23, 24, 25, 26)
+
+
+def _bgr_to_hex(color) -> str:
+    b, g, r = color
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def _clamp_box(x1: float, y1: float, x2: float, y2: float) -> list:
+    """Recuadro normalizado [x1, y1, x2, y2] acotado a la imagen"""
+    return [round(max(0.0, x1), 4), round(max(0.0, y1), 4), round(min(1.0, x2), 4), round(min(1.0, y2), 4)]
+
+
+def build_overlay(analysis: dict, pose_landmarks=None, aspect: float = 1.0) -> dict:
+    """
+    Calcula las primitivas del overlay (recuadros, etiquetas, colores y
+    landmarks) en coordenadas normalizadas 0-1, sin tocar la imagen.
+    
+    Es la misma geometría que dibuja ``draw_detections_on_image``; los
+    clientes en modo overlay la dibujan sobre su propio video.
+    
+    Args:
+        analysis: Resultados del análisis
+        pose_landmarks: Landmarks de MediaPipe para posiciones dinámicas
+        aspect: Relación ancho/alto del frame (los tamaños se miden en horizontal)
+    
+    Returns:
+        {"person_detected": bool, "boxes": [...], "landmarks": [[idx, x, y], ...]}
+    """
+    overlay = {
+        "person_detected": bool(analysis.get('person_detected', False)),
+        "boxes": [],
+        "landmarks": []
     }
     
-    # Priorizar blanco si los valores RGB son altos
-    if r >= 220 and g >= 220 and b >= 220:
-        return "blanco"
+    if not overlay["person_detected"]:
+        return overlay
+    
+    lm = pose_landmarks.landmark if pose_landmarks else None
+    
+    # RECUADRO DE CARA/PERSONA DINÁMICO
+    if lm:
+        nose, left_eye, left_ear, right_ear = lm[0], lm[2], lm[7], lm[8]
+        
+        # Calcular bounding box de la cara (ancho relativo al ancho de imagen)
+        face_center_x = (left_ear.x + right_ear.x) / 2
+        face_center_y = (nose.y + left_eye.y) / 2
+        face_width = abs(left_ear.x - right_ear.x)
+        
+        # Recuadro de cara con margen
+        margin_face = face_width * 0.5
+        face_box = _clamp_box(face_center_x - face_width/2 - margin_face, face_center_y - face_width * aspect * 0.8,
+                              face_center_x + face_width/2 + margin_face, face_center_y + face_width * aspect * 0.6)
+        
+        overlay["landmarks"] = [
+            [i, round(lm[i].x, 4), round(lm[i].y, 4)] for i in OVERLAY_LANDMARKS
+        ]
+    else:
+        # Fallback a posición estática
+        face_box = [0.15, 0.05, 0.85, 0.5]
+    
+    confidence = analysis.get('detection_confidence', 0)
+    overlay["boxes"].append({
+        "kind": "face",
+        "box": face_box,
+        "color": _bgr_to_hex(OVERLAY_COLORS["face"]),
+        "title": "PERSONA DETECTADA",
+        "lines": [f"Edad: {analysis.get('age_range', 'N/A')}", f"Conf: {int(confidence * 100)}%"]
+    })
+    
+    # RECUADRO DE ROPA DINÁMICO (AMPLIADO para captar toda la vestimenta)
+    if lm:
+        # Torso COMPLETO + brazos + parte superior de piernas (hasta rodillas)
+        min_x = min(lm[11].x, lm[23].x, lm[13].x, lm[15].x)
+        max_x = max(lm[12].x, lm[24].x, lm[14].x, lm[16].x)
+        min_y = min(lm[11].y, lm[12].y)
+        max_y = max(lm[23].y, lm[24].y, lm[25].y, lm[26].y)
+        
+        # MÁRGENES GENEROSOS (25% horizontal, 8% arriba para el cuello, 15% abajo)
+        horizontal_margin = (max_x - min_x) * 0.25
+        clothing_box = _clamp_box(min_x - horizontal_margin, min_y - 0.08,
+                                  max_x + horizontal_margin, max_y + 0.15)
+    else:
+        # Fallback a posición estática AMPLIA
+        clothing_box = [0.05, 0.2, 0.95, 0.85]
     
-    # Priorizar negro si los valores RGB son muy bajos
-    if r <= 30 and g <= 30 and b <= 30:
-        return "negro"
+    overlay["boxes"].append({
+        "kind": "clothing",
+        "box": clothing_box,
+        "color": _bgr_to_hex(OVERLAY_COLORS["clothing"]),
+        "title": "VESTIMENTA",
+        "lines": [
+            f"Prenda: {analysis.get('clothing_item', 'desconocido')}",
+            f"Estilo: {analysis.get('clothing_style', 'casual')}",
+            f"Color: {analysis.get('primary_color', 'desconocido')}"
+        ]
+    })
     
-    for color_name, (min_rgb, max_rgb) in color_ranges.items():
-        if (min_rgb[0] <= r <= max_rgb[0] and 
-            min_rgb[1] <= g <= max_rgb[1] and 
-            min_rgb[2] <= b <= max_rgb[2]):
-            return color_name
+    # Recuadro de accesorios si se detectaron (DINÁMICO basado en landmarks)
+    head_accessory = analysis.get('head_accessory')
+    if head_accessory and head_accessory != 'desconocido':
+        if lm:
+            nose, left_eye, left_ear, right_ear = lm[0], lm[2], lm[7], lm[8]
+            center_x = (left_ear.x + right_ear.x) / 2
+            center_y = (nose.y + left_eye.y) / 2
+            head_width = abs(left_ear.x - right_ear.x)
+            
+            # Expandir el recuadro para cubrir accesorios (gorro/gafas)
+            margin = head_width * 0.4
+            accessory_box = _clamp_box(center_x - head_width/2 - margin, center_y - head_width * aspect * 0.7,
+                                       center_x + head_width/2 + margin, center_y + head_width * aspect * 0.3)
+        else:
+            accessory_box = [0.2, 0.02, 0.8, 0.35]
+        
+        overlay["boxes"].append({
+            "kind": "accessory",
+            "box": accessory_box,
+            "color": _bgr_to_hex(OVERLAY_COLORS["accessory"]),
+            "title": "ACCESORIOS DETECTADOS",
+            "lines": [f"{head_accessory}"]
+        })
     
-    return "desconocido"
+    # Recuadro de CARTERAS/BOLSOS si se detectaron (DINÁMICO)
+    bag_accessory = analysis.get('bag_accessory')
+    if bag_accessory:
+        if lm:
+            left_shoulder, right_shoulder = lm[11], lm[12]
+            left_hip, right_hip = lm[23], lm[24]
+            left_wrist, right_wrist = lm[15], lm[16]
+            shoulder_width = abs(left_shoulder.x - right_shoulder.x)
+            if bag_accessory == "mochila":
+                # Mochila: zona de la espalda/hombros (centrada)
+                center_x = (left_shoulder.x + right_shoulder.x) / 2
+                center_y = (left_shoulder.y + right_shoulder.y) / 2
+                bag_width = shoulder_width * 1.2
+                bag_height = bag_width * aspect * 1.1
+                bag_box = _clamp_box(center_x - bag_width/2, center_y - bag_height * 0.3,
+                                     center_x + bag_width/2, center_y + bag_height * 0.7)
+            elif bag_accessory == "bolso_cruzado":
+                # Bolso cruzado: lateral del torso, del lado más bajo
+                if left_wrist.y > right_wrist.y:
+                    center_x = left_hip.x
+                    center_y = (left_shoulder.y + left_hip.y) / 2
+                else:
+                    center_x = right_hip.x
+                    center_y = (right_shoulder.y + right_hip.y) / 2
+                bag_width = shoulder_width * 0.5
+                bag_height = bag_width * aspect * 1.3
+                bag_box = _clamp_box(center_x - bag_width/2, center_y - bag_height/2,
+                                     center_x + bag_width/2, center_y + bag_height/2)
+            else:  # cartera o default
+                # Cartera: zona baja lateral (cerca de la mano más baja)
+                wrist = left_wrist if left_wrist.y > right_wrist.y else right_wrist
+                bag_width = shoulder_width * 0.3
+                bag_height = bag_width * aspect * 0.8
+                bag_box = _clamp_box(wrist.x - bag_width/2, wrist.y - bag_height/2,
+                                     wrist.x + bag_width/2, wrist.y + bag_height/2)
+        else:
+            bag_box = [0.05, 0.4, 0.45, 0.75]
+        
+        overlay["boxes"].append({
+            "kind": "bag",
+            "box": bag_box,
+            "color": _bgr_to_hex(OVERLAY_COLORS["bag"]),
+            "title": "CARTERA/BOLSO",
+            "lines": [f"{bag_accessory}"]
+        })
+    
+    return overlay
+
 
-def draw_detections_on_image(image: np.ndarray, analysis: dict, pose_landmarks=None) -> np.ndarray:
+def draw_detections_on_image(image: np.ndarray, analysis: dict, pose_landmarks=None,
+                             overlay: Optional[dict] = None) -> np.ndarray:
     """
     Dibuja las detecciones sobre la imagen original usando posiciones DINÁMICAS.
     
@@ -213,268 +393,55 @@ def draw_detections_on_image(image: np.ndarray, analysis: dict, pose_landmarks=N
         image: Imagen original en formato numpy
         analysis: Resultados del análisis
         pose_landmarks: Landmarks de MediaPipe para posiciones dinámicas
+        overlay: Primitivas ya calculadas con ``build_overlay`` (opcional)
     
     Returns:
         Imagen anotada con las detecciones visuales
     """
+    height, width = image.shape[:2]
+    if overlay is None:
+        overlay = build_overlay(analysis, pose_landmarks, aspect=width / height)
+    
     annotated = image.copy()
-    height, width = annotated.shape[:2]
     
-    # Colores para diferentes tipos de detección
-    COLOR_FACE = (0, 255, 0)  # Verde para cara
-    COLOR_CLOTHING = (255, 165, 0)  # Naranja para ropa
-    COLOR_ACCESSORY = (255, 0, 255)  # Magenta para accesorios
     COLOR_TEXT_BG = (0, 0, 0)  # Fondo negro para texto
     COLOR_TEXT = (255, 255, 255)  # Texto blanco
     
-    # Dibujar si se detectó persona
-    if analysis.get('person_detected', False):
-        # RECUADRO DE CARA/PERSONA DINÁMICO
-        if pose_landmarks:
-            # Usar landmarks para posicionar dinámicamente
-            nose = pose_landmarks.landmark[0]
-            left_eye = pose_landmarks.landmark[2]
-            right_eye = pose_landmarks.landmark[5]
-            left_ear = pose_landmarks.landmark[7]
-            right_ear = pose_landmarks.landmark[8]
-            left_shoulder = pose_landmarks.landmark[11]
-            right_shoulder = pose_landmarks.landmark[12]
-            
-            # Calcular bounding box de la cara
-            face_center_x = int((left_ear.x + right_ear.x) / 2 * width)
-            face_center_y = int((nose.y + left_eye.y) / 2 * height)
-            face_width = abs(left_ear.x - right_ear.x) * width
-            
-            # Recuadro de cara con margen
-            margin_face = face_width * 0.5
-            face_x1 = max(0, int(face_center_x - face_width/2 - margin_face))
-            face_y1 = max(0, int(face_center_y - face_width * 0.8))
-            face_x2 = min(width, int(face_center_x + face_width/2 + margin_face))
-            face_y2 = min(height, int(face_center_y + face_width * 0.6))
-        else:
-            # Fallback a posición estática
-            face_x1 = int(width * 0.15)
-            face_y1 = int(height * 0.05)
-            face_x2 = int(width * 0.85)
-            face_y2 = int(height * 0.5)
-        
-        cv2.rectangle(annotated, (face_x1, face_y1), (face_x2, face_y2), COLOR_FACE, 3)
-        
-        # Etiqueta de edad EN POSICIÓN FIJA (esquina superior izquierda)
-        age_text = f"Edad: {analysis.get('age_range', 'N/A')}"
-        confidence = analysis.get('detection_confidence', 0)
-        conf_text = f"Conf: {int(confidence * 100)}%"
-        
-        # POSICIÓN FIJA en esquina superior izquierda para evitar superposición
-        person_label_x = 10
-        person_label_y = 10
-        person_label_width = 280
-        person_label_height = 70
-        
-        cv2.rectangle(annotated, (person_label_x, person_label_y), 
-                     (person_label_x + person_label_width, person_label_y + person_label_height), 
-                     COLOR_TEXT_BG, -1)
-        cv2.putText(annotated, "PERSONA DETECTADA", (person_label_x + 5, person_label_y + 25), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, COLOR_TEXT, 2)
-        cv2.putText(annotated, age_text, (person_label_x + 5, person_label_y + 45), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, COLOR_TEXT, 1)
-        cv2.putText(annotated, conf_text, (person_label_x + 5, person_label_y + 62), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, COLOR_TEXT, 1)
-        
-        # RECUADRO DE ROPA DINÁMICO (AMPLIADO para captar toda la vestimenta)
-        if pose_landmarks:
-            # Usar landmarks para el torso COMPLETO + brazos
-            left_shoulder = pose_landmarks.landmark[11]
-            right_shoulder = pose_landmarks.landmark[12]
-            left_hip = pose_landmarks.landmark[23]
-            right_hip = pose_landmarks.landmark[24]
-            left_elbow = pose_landmarks.landmark[13]
-            right_elbow = pose_landmarks.landmark[14]
-            left_wrist = pose_landmarks.landmark[15]
-            right_wrist = pose_landmarks.landmark[16]
-            left_knee = pose_landmarks.landmark[25]  # Rodilla izquierda (para pantalones)
-            right_knee = pose_landmarks.landmark[26]  # Rodilla derecha
-            
-            # Calcular bounding box AMPLIO que incluya:
-            # - Todo el torso (hombros a caderas)
-            # - Brazos completos (hasta muñecas)
-            # - Parte superior de piernas (hasta rodillas)
-            
-            # Encontrar los puntos extremos en X (más a izquierda y derecha)
-            min_x = min(left_shoulder.x, left_hip.x, left_elbow.x, left_wrist.x)
-            max_x = max(right_shoulder.x, right_hip.x, right_elbow.x, right_wrist.x)
-            
-            # Encontrar los puntos extremos en Y (más arriba y abajo)
-            min_y = min(left_shoulder.y, right_shoulder.y)
-            max_y = max(left_hip.y, right_hip.y, left_knee.y, right_knee.y)
-            
-            # Agregar MÁRGENES GENEROSOS (25% horizontal, 10% vertical)
-            horizontal_margin = (max_x - min_x) * 0.25
-            vertical_margin_top = 0.08  # 8% arriba (cuello)
-            vertical_margin_bottom = 0.15  # 15% abajo (más piernas)
-            
-            clothing_x1 = max(0, int((min_x - horizontal_margin) * width))
-            clothing_y1 = max(0, int((min_y - vertical_margin_top) * height))
-            clothing_x2 = min(width, int((max_x + horizontal_margin) * width))
-            clothing_y2 = min(height, int((max_y + vertical_margin_bottom) * height))
+    for item in overlay["boxes"]:
+        kind = item["kind"]
+        color = OVERLAY_COLORS[kind]
+        bx1, by1, bx2, by2 = item["box"]
+        x1, y1 = int(bx1 * width), int(by1 * height)
+        x2, y2 = int(bx2 * width), int(by2 * height)
+        
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, 4 if kind in ("accessory", "bag") else 3)
+        
+        if kind == "face":
+            # Etiqueta de persona EN POSICIÓN FIJA (esquina superior izquierda) para evitar superposición
+            cv2.rectangle(annotated, (10, 10), (290, 80), COLOR_TEXT_BG, -1)
+            cv2.putText(annotated, item["title"], (15, 35), cv2.FONT_HERSHEY_SIMPLEX, 0.7, COLOR_TEXT, 2)
+            for i, line in enumerate(item["lines"]):
+                cv2.putText(annotated, line, (15, 55 + i * 17), cv2.FONT_HERSHEY_SIMPLEX, 0.5, COLOR_TEXT, 1)
+        
+        elif kind == "clothing":
+            # Fondo para texto (ajustado a posición dinámica)
+            label_y = max(85, y1)
+            cv2.rectangle(annotated, (x1, label_y - 85), (x1 + 300, label_y), COLOR_TEXT_BG, -1)
+            cv2.putText(annotated, item["title"], (x1 + 5, label_y - 65), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_TEXT, 2)
+            for i, line in enumerate(item["lines"]):
+                cv2.putText(annotated, line, (x1 + 5, label_y - 45 + i * 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, COLOR_TEXT, 1)
+        
         else:
-            # Fallback a posición estática AMPLIA
-            clothing_x1 = int(width * 0.05)  # Más ancho
-            clothing_y1 = int(height * 0.2)   # Más arriba
-            clothing_x2 = int(width * 0.95)   # Más ancho
-            clothing_y2 = int(height * 0.85)  # Más abajo
-        
-        cv2.rectangle(annotated, (clothing_x1, clothing_y1), (clothing_x2, clothing_y2), COLOR_CLOTHING, 3)
-        
-        # Etiqueta de ropa
-        clothing_item = analysis.get('clothing_item', 'desconocido')
-        clothing_style = analysis.get('clothing_style', 'casual')
-        color_principal = analysis.get('primary_color', 'desconocido')
-        
-        # Fondo para texto (ajustado a posición dinámica)
-        label_y_cloth = max(85, clothing_y1)
-        cv2.rectangle(annotated, (clothing_x1, label_y_cloth - 85), (clothing_x1 + 300, label_y_cloth), COLOR_TEXT_BG, -1)
-        cv2.putText(annotated, "VESTIMENTA", (clothing_x1 + 5, label_y_cloth - 65), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_TEXT, 2)
-        cv2.putText(annotated, f"Prenda: {clothing_item}", (clothing_x1 + 5, label_y_cloth - 45), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, COLOR_TEXT, 1)
-        cv2.putText(annotated, f"Estilo: {clothing_style}", (clothing_x1 + 5, label_y_cloth - 25), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, COLOR_TEXT, 1)
-        cv2.putText(annotated, f"Color: {color_principal}", (clothing_x1 + 5, label_y_cloth - 5), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.5, COLOR_TEXT, 1)
-        
-        # Recuadro de accesorios si se detectaron (DINÁMICO basado en landmarks)
-        head_accessory = analysis.get('head_accessory')
-        if head_accessory and head_accessory != 'desconocido' and head_accessory is not None:
-            # Usar landmarks dinámicos si están disponibles
-            if pose_landmarks:
-                # Obtener posiciones de nariz, orejas y ojos (puntos de referencia para cabeza)
-                nose = pose_landmarks.landmark[0]  # Nariz
-                left_eye = pose_landmarks.landmark[2]  # Ojo izquierdo
-                right_eye = pose_landmarks.landmark[5]  # Ojo derecho
-                left_ear = pose_landmarks.landmark[7]  # Oreja izquierda
-                right_ear = pose_landmarks.landmark[8]  # Oreja derecha
-                
-                # Calcular centro de la cabeza
-                center_x = int((left_ear.x + right_ear.x) / 2 * width)
-                center_y = int((nose.y + left_eye.y) / 2 * height)
-                
-                # Calcular ancho de la cabeza basado en distancia entre orejas
-                head_width = abs(left_ear.x - right_ear.x) * width
-                
-                # Expandir el recuadro para cubrir accesorios (gorro/gafas)
-                margin = head_width * 0.4  # 40% de margen extra
-                acc_x1 = max(0, int(center_x - head_width/2 - margin))
-                acc_y1 = max(0, int(center_y - head_width * 0.7))  # Arriba de la cara
-                acc_x2 = min(width, int(center_x + head_width/2 + margin))
-                acc_y2 = min(height, int(center_y + head_width * 0.3))  # Hasta la barbilla
-            else:
-                # Fallback a posiciones estáticas si no hay landmarks
-                acc_x1 = int(width * 0.2)
-                acc_y1 = int(height * 0.02)
-                acc_x2 = int(width * 0.8)
-                acc_y2 = int(height * 0.35)
-            
-            cv2.rectangle(annotated, (acc_x1, acc_y1), (acc_x2, acc_y2), COLOR_ACCESSORY, 4)
-            
-            # Etiqueta de accesorios (más prominente)
-            label_height = 50
-            label_width = 350
-            label_x = max(0, min(acc_x1, width - label_width))  # No salirse de la imagen
-            label_y = max(label_height, acc_y1)  # No salirse por arriba
-            
-            cv2.rectangle(annotated, (label_x, label_y - label_height), (label_x + label_width, label_y), COLOR_TEXT_BG, -1)
-            cv2.putText(annotated, "ACCESORIOS DETECTADOS", (label_x + 5, label_y - 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, COLOR_ACCESSORY, 2)
-            cv2.putText(annotated, f"{head_accessory}", (label_x + 5, label_y - 8), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_TEXT, 2)
-        
-        # Recuadro de CARTERAS/BOLSOS si se detectaron (DINÁMICO)
-        bag_accessory = analysis.get('bag_accessory')
-        if bag_accessory and bag_accessory is not None:
-            # Color cian para bolsos/carteras
-            COLOR_BAG = (255, 255, 0)  # Cian
-            
-            if pose_landmarks:
-                # Usar landmarks para posición dinámica del bolso
-                left_shoulder = pose_landmarks.landmark[11]
-                right_shoulder = pose_landmarks.landmark[12]
-                left_hip = pose_landmarks.landmark[23]
-                right_hip = pose_landmarks.landmark[24]
-                left_wrist = pose_landmarks.landmark[15]  # Muñeca izquierda
-                right_wrist = pose_landmarks.landmark[16]  # Muñeca derecha
-                
-                # Determinar posición según tipo de bolso
-                if bag_accessory == "mochila":
-                    # Mochila: zona de la espalda/hombros (centrada)
-                    center_x = int((left_shoulder.x + right_shoulder.x) / 2 * width)
-                    center_y = int((left_shoulder.y + right_shoulder.y) / 2 * height)
-                    bag_width = abs(left_shoulder.x - right_shoulder.x) * width * 1.2
-                    bag_height = bag_width * 1.1
-                    
-                    bag_x1 = max(0, int(center_x - bag_width/2))
-                    bag_y1 = max(0, int(center_y - bag_height * 0.3))
-                    bag_x2 = min(width, int(center_x + bag_width/2))
-                    bag_y2 = min(height, int(center_y + bag_height * 0.7))
-                    
-                elif bag_accessory == "bolso_cruzado":
-                    # Bolso cruzado: lateral del torso
-                    # Detectar lado más bajo (donde está el bolso)
-                    if left_wrist.y > right_wrist.y:
-                        # Lado izquierdo
-                        center_x = int(left_hip.x * width)
-                        center_y = int((left_shoulder.y + left_hip.y) / 2 * height)
-                    else:
-                        # Lado derecho
-                        center_x = int(right_hip.x * width)
-                        center_y = int((right_shoulder.y + right_hip.y) / 2 * height)
-                    
-                    bag_width = abs(left_shoulder.x - right_shoulder.x) * width * 0.5
-                    bag_height = bag_width * 1.3
-                    
-                    bag_x1 = max(0, int(center_x - bag_width/2))
-                    bag_y1 = max(0, int(center_y - bag_height/2))
-                    bag_x2 = min(width, int(center_x + bag_width/2))
-                    bag_y2 = min(height, int(center_y + bag_height/2))
-                    
-                else:  # cartera o default
-                    # Cartera: zona baja lateral (cerca de cadera/mano)
-                    # Buscar la mano más baja
-                    if left_wrist.y > right_wrist.y:
-                        center_x = int(left_wrist.x * width)
-                        center_y = int(left_wrist.y * height)
-                    else:
-                        center_x = int(right_wrist.x * width)
-                        center_y = int(right_wrist.y * height)
-                    
-                    bag_width = abs(left_shoulder.x - right_shoulder.x) * width * 0.3
-                    bag_height = bag_width * 0.8
-                    
-                    bag_x1 = max(0, int(center_x - bag_width/2))
-                    bag_y1 = max(0, int(center_y - bag_height/2))
-                    bag_x2 = min(width, int(center_x + bag_width/2))
-                    bag_y2 = min(height, int(center_y + bag_height/2))
-            else:
-                # Fallback a posición estática
-                bag_x1 = int(width * 0.05)
-                bag_y1 = int(height * 0.4)
-                bag_x2 = int(width * 0.45)
-                bag_y2 = int(height * 0.75)
-            
-            cv2.rectangle(annotated, (bag_x1, bag_y1), (bag_x2, bag_y2), COLOR_BAG, 4)
-            
-            # Etiqueta de cartera/bolso (ajustada a posición dinámica)
+            # Etiqueta de accesorio/bolso (más prominente, sin salirse de la imagen)
             label_height = 50
-            label_width = 280
-            label_x = max(0, min(bag_x1, width - label_width))
-            label_y = max(label_height, bag_y1)
-            
+            label_width = 350 if kind == "accessory" else 280
+            label_x = max(0, min(x1, width - label_width))
+            label_y = max(label_height, y1)
             cv2.rectangle(annotated, (label_x, label_y - label_height), (label_x + label_width, label_y), COLOR_TEXT_BG, -1)
-            cv2.putText(annotated, "CARTERA/BOLSO", (label_x + 5, label_y - 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, COLOR_BAG, 2)
-            cv2.putText(annotated, f"{bag_accessory}", (label_x + 5, label_y - 8), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_TEXT, 2)
-    else:
+            cv2.putText(annotated, item["title"], (label_x + 5, label_y - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, color, 2)
+            cv2.putText(annotated, item["lines"][0], (label_x + 5, label_y - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.6, COLOR_TEXT, 2)
+    
+    if not overlay["person_detected"]:
         # No hay persona detectada
         text = "NO SE DETECTA PERSONA"
         cv2.rectangle(annotated, (10, 10), (400, 60), COLOR_TEXT_BG, -1)
@@ -493,7 +460,51 @@ def draw_detections_on_image(image: np.ndarray, analysis: dict, pose_landmarks=N
     
     return annotated
 
-def analyze_realtime_stream_real(image_data_base64: str, return_annotated: bool = False) -> dict:
+def _empty_stream_result() -> dict:
+    """Resultado cuando todavía no llega imagen de la cámara"""
+    return {
+        "person_detected": False,
+        "face_detected": False,
+        "pose_detected": False,
+        "age_range": "unknown",
+        "clothing_style": "unknown",
+        "primary_color": "unknown",
+        "secondary_color": None,
+        "clothing_item": "unknown",
+        "detection_confidence": 0.0,
+        "recommendations": {
+            "target_categories": [],
+            "color_preference": "unknown",
+            "style_suggestion": "unknown",
+            "age_appropriate": False,
+            "interaction_tips": ["Esperando imagen de cámara..."]
+        }
+    }
+
+def _error_stream_result(error: Exception) -> dict:
+    """Resultado cuando el análisis de un frame falla"""
+    return {
+        "person_detected": False,
+        "face_detected": False,
+        "pose_detected": False,
+        "error": str(error),
+        "age_range": "error",
+        "clothing_style": "error",
+        "primary_color": "error",
+        "secondary_color": None,
+        "clothing_item": "error",
+        "detection_confidence": 0.0,
+        "recommendations": {
+            "target_categories": [],
+            "color_preference": "error",
+            "style_suggestion": "error",
+            "age_appropriate": False,
+            "interaction_tips": [f"Error en análisis: {str(error)}"]
+        }
+    }
+
+def analyze_realtime_stream_real(image_data_base64: str, return_annotated: bool = False,
+                                 gate: Optional[FrameChangeGate] = None) -> dict:
     """
     Análisis REAL de imagen usando MediaPipe y OpenCV.
     Versión simplificada para evitar problemas de serialización JSON.
@@ -501,70 +512,138 @@ def analyze_realtime_stream_real(image_data_base64: str, return_annotated: bool
     Args:
         image_data_base64: Imagen en base64
         return_annotated: Si True, incluye la imagen anotada en base64
+        gate: Compuerta de cambio de escena del stream (reutiliza el último
+              resultado si el frame es casi idéntico)
     """
     if not image_data_base64:
-        return {
-            "person_detected": False,
-            "face_detected": False,
-            "pose_detected": False,
-            "age_range": "unknown",
-            "clothing_style": "unknown",
-            "primary_color": "unknown",
-            "secondary_color": None,
-            "clothing_item": "unknown",
-            "detection_confidence": 0.0,
-            "recommendations": {
-                "target_categories": [],
-                "color_preference": "unknown",
-                "style_suggestion": "unknown",
-                "age_appropriate": False,
-                "interaction_tips": ["Esperando imagen de cámara..."]
-            }
-        }
+        return _empty_stream_result()
     
     try:
         # Decodificar la imagen base64
         img_bytes = base64.b64decode(image_data_base64)
-        img_np = np.frombuffer(img_bytes, np.uint8)
-        image = cv2.imdecode(img_np, cv2.IMREAD_COLOR)
+    except Exception as e:
+        logger.warning("Error en análisis real: %s", e)
+        return _error_stream_result(e)
+    
+    return analyze_realtime_frame_bytes(img_bytes, return_annotated=return_annotated, gate=gate)
 
-        if image is None:
-            raise ValueError("No se pudo decodificar la imagen base64.")
+def analyze_realtime_frame_bytes(img_bytes: bytes, return_annotated: bool = False,
+                                 annotated_encoding: str = "base64", return_overlay: bool = False,
+                                 gate: Optional[FrameChangeGate] = None, stream_key: Optional[str] = None) -> dict:
+    """
+    Análisis REAL de un frame ya en bytes (JPEG/PNG), sin capa base64.
+    
+    Args:
+        img_bytes: Imagen codificada (JPEG/PNG)
+        return_annotated: Si True, incluye la imagen anotada
+        annotated_encoding: "base64" -> clave 'annotated_image' (str),
+                            "jpeg" -> clave 'annotated_jpeg' (bytes crudos)
+        return_overlay: Si True, incluye 'overlay' con las primitivas normalizadas
+                        (recuadros, etiquetas, landmarks) para dibujar en el cliente
+        gate: Compuerta de cambio de escena del stream (opcional)
+        stream_key: Clave del stream; si se entrega se usa su ``StreamAnalyzer``
+                    (pose con tracking entre frames y atributos suavizados)
+    """
+    if not img_bytes:
+        return _empty_stream_result()
+    
+    if gate is not None:
+        # Pre-etapa barata: si la escena no cambió, reutilizar el último análisis
+        variant = (return_annotated, annotated_encoding, return_overlay)
+        cached, signature = gate.lookup(img_bytes, variant)
+        if cached is not None:
+            return cached
+        analysis = analyze_realtime_frame_bytes(img_bytes, return_annotated=return_annotated,
+                                                annotated_encoding=annotated_encoding,
+                                                return_overlay=return_overlay, stream_key=stream_key)
+        gate.store(signature, analysis, variant)
+        return analysis
+    
+    with frame_trace():
+        try:
+            # Frames grandes se decodifican directo a escala reducida (según la cabecera JPEG)
+            with span("decode"):
+                image = decode_image(img_bytes, max_dimension=MAX_ANALYSIS_DIMENSION)
+            if image is None:
+                raise ValueError("No se pudo decodificar la imagen.")
+        except Exception as e:
+            logger.warning("Error en análisis real: %s", e)
+            return _error_stream_result(e)
         
+        return analyze_frame_array(image, return_annotated=return_annotated, annotated_encoding=annotated_encoding,
+                                   return_overlay=return_overlay, stream_key=stream_key)
+
+def analyze_frame_array(image: np.ndarray, return_annotated: bool = False,
+                        annotated_encoding: str = "base64", return_overlay: bool = False,
+                        stream_key: Optional[str] = None, return_timings: Optional[bool] = None) -> dict:
+    """
+    Análisis REAL de un frame ya decodificado (BGR). Punto de entrada común:
+    bytes y base64 son capas delgadas encima de esta función, y los endpoints
+    que combinan motores decodifican una vez y comparten el arreglo.
+    
+    Args: ver ``analyze_realtime_frame_bytes``
+        return_timings: Incluir 'timings' (ms por etapa de este frame);
+                        default: NEOTOTEM_TIMINGS
+    """
+    if return_timings is None:
+        return_timings = TIMINGS_IN_RESPONSE
+    
+    with frame_trace() as trace:
+        with span("frame"):
+            analysis = _analyze_frame_array(image, return_annotated, annotated_encoding, return_overlay, stream_key)
+        if return_timings:
+            analysis["timings"] = rounded(trace)
+    return analysis
+
+def _analyze_frame_array(image: np.ndarray, return_annotated: bool, annotated_encoding: str,
+                         return_overlay: bool, stream_key: Optional[str]) -> dict:
+    try:
         # OPTIMIZACIÓN: Redimensionar imagen si es muy grande (reducir carga de procesamiento)
         height, width = image.shape[:2]
-        max_dimension = 800  # Máximo 800px en cualquier dimensión
-        
-        if height > max_dimension or width > max_dimension:
-            # Calcular escala manteniendo aspect ratio
-            scale = max_dimension / max(height, width)
-            new_width = int(width * scale)
-            new_height = int(height * scale)
-            image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
-            print(f"⚡ Imagen redimensionada: {width}x{height} → {new_width}x{new_height} (optimización)")
+        with span("resize"):
+            image = limit_size(image)
+        if image.shape[:2] != (height, width):
+            new_height, new_width = image.shape[:2]
+            logger.debug("⚡ Imagen redimensionada: %sx%s → %sx%s (optimización)", width, height, new_width, new_height)
 
         # Análisis simplificado para evitar problemas de serialización
-        analysis = analyze_real_clothing_simple(image)
+        if stream_key:
+            from services.ai.stream_analyzer import get_stream_analyzer
+            analysis = get_stream_analyzer(stream_key).analyze(image)
+        else:
+            analysis = analyze_real_clothing_simple(image)
+        
+        overlay = None
+        if return_overlay or return_annotated:
+            # Geometría de las detecciones (landmarks para bounding boxes dinámicos)
+            height, width = image.shape[:2]
+            with span("overlay"):
+                overlay = build_overlay(analysis, analysis.get('_pose_landmarks'), aspect=width / height)
+        
+        if return_overlay:
+            analysis['overlay'] = overlay
         
         # Si se solicita, añadir imagen anotada
         if return_annotated:
-            # Pasar landmarks para bounding boxes dinámicos
-            pose_landmarks = analysis.get('_pose_landmarks')
-            annotated_image = draw_detections_on_image(image, analysis, pose_landmarks)
-            
-            # Redimensionar imagen anotada si es muy grande (optimización adicional)
-            h_ann, w_ann = annotated_image.shape[:2]
-            max_display = 640  # Máximo para visualización
-            if h_ann > max_display or w_ann > max_display:
-                scale = max_display / max(h_ann, w_ann)
-                new_w = int(w_ann * scale)
-                new_h = int(h_ann * scale)
-                annotated_image = cv2.resize(annotated_image, (new_w, new_h), interpolation=cv2.INTER_AREA)
+            with span("draw"):
+                annotated_image = draw_detections_on_image(image, analysis, overlay=overlay)
+                
+                # Redimensionar imagen anotada si es muy grande (optimización adicional)
+                h_ann, w_ann = annotated_image.shape[:2]
+                max_display = 640  # Máximo para visualización
+                if h_ann > max_display or w_ann > max_display:
+                    scale = max_display / max(h_ann, w_ann)
+                    new_w = int(w_ann * scale)
+                    new_h = int(h_ann * scale)
+                    annotated_image = cv2.resize(annotated_image, (new_w, new_h), interpolation=cv2.INTER_AREA)
             
             # Reducir calidad para optimizar transmisión (60% para balance)
-            _, buffer = cv2.imencode('.jpg', annotated_image, [cv2.IMWRITE_JPEG_QUALITY, 60])
-            annotated_base64 = base64.b64encode(buffer).decode('utf-8')
-            analysis['annotated_image'] = annotated_base64
+            with span("encode"):
+                _, buffer = cv2.imencode('.jpg', annotated_image, [cv2.IMWRITE_JPEG_QUALITY, 60])
+                if annotated_encoding == "jpeg":
+                    analysis['annotated_jpeg'] = buffer.tobytes()
+                else:
+                    analysis['annotated_image'] = base64.b64encode(buffer).decode('utf-8')
         
         # Limpiar landmarks internos antes de enviar (no serializable en JSON)
         if '_pose_landmarks' in analysis:
@@ -573,29 +652,66 @@ def analyze_realtime_stream_real(image_data_base64: str, return_annotated: bool
         return analysis
         
     except Exception as e:
-        print(f"Error en análisis real: {e}")
-        return {
-            "person_detected": False,
-            "face_detected": False,
-            "pose_detected": False,
-            "age_range": "error",
-            "clothing_style": "error",
-            "primary_color": "error",
-            "secondary_color": None,
-            "clothing_item": "error",
-            "detection_confidence": 0.0,
-            "recommendations": {
-                "target_categories": [],
-                "color_preference": "error",
-                "style_suggestion": "error",
-                "age_appropriate": False,
-                "interaction_tips": [f"Error en análisis: {str(e)}"]
-            }
-        }
+        logger.warning("Error en análisis real: %s", e)
+        return _error_stream_result(e)
+
+def _borrow_graph(pool, graph=None):
+    """Usa el grafo del llamador si se entrega; si no, presta uno del pool"""
+    return nullcontext(graph) if graph is not None else pool.acquire()
+
+def _person_mask(image_rgb: np.ndarray, segmentation_graph=None) -> Optional[np.ndarray]:
+    """Máscara uint8 de la persona (255) según SelfieSegmentation, o None si no hay resultado"""
+    try:
+        with _borrow_graph(mediapipe_pool.segmentation, segmentation_graph) as segmentation, span("segmentation"):
+            segmentation_results = segmentation.process(image_rgb)
+    except Exception as e:
+        logger.warning("Error en segmentación de persona: %s", e)
+        return None
+    if segmentation_results.segmentation_mask is None:
+        return None
+    return (segmentation_results.segmentation_mask > PERSON_MASK_THRESHOLD).astype(np.uint8) * 255
+
+def _masked_region_color(region_rgb: np.ndarray, region_mask: np.ndarray):
+    """
+    Color dominante de los píxeles de persona de una región, submuestreados.
+
+    Returns:
+        (nombre, (r, g, b), distribución) o None si la persona cubre muy poco de la región
+    """
+    pixels = region_rgb[::COLOR_SAMPLE_STEP, ::COLOR_SAMPLE_STEP]
+    mask = region_mask[::COLOR_SAMPLE_STEP, ::COLOR_SAMPLE_STEP]
+    if mask.size == 0 or np.count_nonzero(mask) < max(50, mask.size * MIN_PERSON_FRACTION):
+        return None
+    centers, _ = dominant_colors(pixels, k=3, mask=mask)
+    r, g, b = centers[0].astype(int)
+    return get_color_name(r, g, b), (int(r), int(g), int(b)), RGB_COLOR_LUT.histogram(pixels, mask=mask, top=3)
 
-def analyze_real_clothing_simple(image_np: np.ndarray) -> dict:
+def _lower_body_color(image_rgb: np.ndarray, person_mask: np.ndarray, landmarks) -> Optional[str]:
+    """Color de las piernas (caderas a rodillas) con la máscara de persona"""
+    left_hip, right_hip, left_knee, right_knee = landmarks[23], landmarks[24], landmarks[25], landmarks[26]
+    if min(left_knee.visibility, right_knee.visibility) < 0.5:
+        return None
+    height, width = image_rgb.shape[:2]
+    margin = abs(left_hip.x - right_hip.x) * 0.25
+    x1 = max(0, int((min(left_hip.x, right_hip.x) - margin) * width))
+    x2 = min(width, int((max(left_hip.x, right_hip.x) + margin) * width))
+    y1 = max(0, int((left_hip.y + right_hip.y) / 2 * height))
+    y2 = min(height, int((left_knee.y + right_knee.y) / 2 * height))
+    if x2 <= x1 or y2 <= y1:
+        return None
+    masked = _masked_region_color(image_rgb[y1:y2, x1:x2], person_mask[y1:y2, x1:x2])
+    return masked[0] if masked else None
+
+def analyze_real_clothing_simple(image_np: np.ndarray, face_graph=None, pose_graph=None,
+                                 face_override: Optional[dict] = None) -> dict:
     """
     Análisis simplificado de prendas que evita problemas de serialización JSON.
+    
+    Args:
+        image_np: Imagen BGR
+        face_graph: FaceDetection propio del llamador (default: pool compartido)
+        pose_graph: Pose propio del llamador, p.ej. en modo video (default: pool compartido)
+        face_override: Campos faciales ya conocidos; si se entrega no se corre FaceDetection
     """
     results = {
         "timestamp": datetime.now().isoformat(),
@@ -619,33 +735,40 @@ def analyze_real_clothing_simple(image_np: np.ndarray) -> dict:
     }
 
     try:
-        # Convertir la imagen a RGB para MediaPipe
-        image_rgb = cv2.cvtColor(image_np, cv2.COLOR_BGR2RGB)
+        # Planos del frame (RGB, gris, ...) calculados una sola vez para todos los detectores
+        ctx = FrameContext(image_np)
+        image_rgb = ctx.rgb  # RGB para MediaPipe
         height, width, _ = image_np.shape
 
         # Detección facial simplificada
-        with mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5) as face_detection:
-            face_results = face_detection.process(image_rgb)
-            if face_results.detections:
-                results["person_detected"] = True
-                results["face_detected"] = True
-                results["detection_confidence"] = float(face_results.detections[0].score[0])
+        if face_override is not None:
+            # Resultado facial reciente del stream (la detección se omite en este frame)
+            results.update(face_override)
+        else:
+            with _borrow_graph(mediapipe_pool.face, face_graph) as face_detection:
+                with span("face"):
+                    face_results = face_detection.process(image_rgb)
+                if face_results.detections:
+                    results["person_detected"] = True
+                    results["face_detected"] = True
+                    results["detection_confidence"] = float(face_results.detections[0].score[0])
                 
-                # Estimación básica de edad
-                bbox = face_results.detections[0].location_data.relative_bounding_box
-                face_width = bbox.width
-                face_height = bbox.height
+                    # Estimación básica de edad
+                    bbox = face_results.detections[0].location_data.relative_bounding_box
+                    face_width = bbox.width
+                    face_height = bbox.height
                 
-                if face_width > 0.15 and face_height > 0.15:
-                    results["age_range"] = "36-45"
-                elif face_width > 0.12 and face_height > 0.12:
-                    results["age_range"] = "26-35"
-                else:
-                    results["age_range"] = "18-25"
+                    if face_width > 0.15 and face_height > 0.15:
+                        results["age_range"] = "36-45"
+                    elif face_width > 0.12 and face_height > 0.12:
+                        results["age_range"] = "26-35"
+                    else:
+                        results["age_range"] = "18-25"
 
         # Detección de pose simplificada
-        with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
-            pose_results = pose.process(image_rgb)
+        with _borrow_graph(mediapipe_pool.pose, pose_graph) as pose:
+            with span("pose"):
+                pose_results = pose.process(image_rgb)
             if pose_results.pose_landmarks:
                 results["person_detected"] = True
                 results["pose_detected"] = True
@@ -665,11 +788,8 @@ def analyze_real_clothing_simple(image_np: np.ndarray) -> dict:
                 torso_height = abs((left_shoulder.y + right_shoulder.y) / 2 - (left_hip.y + right_hip.y) / 2)
                 arm_coverage = abs(left_elbow.y - left_shoulder.y)
                 
-                # Debug: imprimir métricas calculadas
-                print(f"🔍 DEBUG - Métricas de detección:")
-                print(f"  Distancia hombros: {shoulder_distance:.3f}")
-                print(f"  Altura torso: {torso_height:.3f}")
-                print(f"  Cobertura brazos: {arm_coverage:.3f}")
+                logger.debug("🔍 Métricas de detección: hombros=%.3f, torso=%.3f, brazos=%.3f",
+                             shoulder_distance, torso_height, arm_coverage)
                 
                 # Extraer región del torso para análisis de color/textura
                 torso_x1 = int(min(left_shoulder.x, right_shoulder.x) * width)
@@ -697,7 +817,7 @@ def analyze_real_clothing_simple(image_np: np.ndarray) -> dict:
                         avg_color = np.mean(torso_region_temp, axis=(0, 1))
                         r, g, b = avg_color.astype(int)
                         temp_color = get_color_name(r, g, b)
-                        print(f"  🎨 Color temporal del torso: {temp_color} (RGB: {r},{g},{b})")
+                        logger.debug("  🎨 Color temporal del torso: %s (RGB: %s,%s,%s)", temp_color, r, g, b)
                     except:
                         temp_color = "unknown"
                 
@@ -736,289 +856,340 @@ def analyze_real_clothing_simple(image_np: np.ndarray) -> dict:
                 results["clothing_style"] = style_detected
                 
                 # Debug: imprimir detección final
-                print(f"  ✅ DETECTADO: {clothing_detected} {style_detected} ({temp_color})")
-                print(f"  Criterios chaqueta: S={shoulder_distance > 0.35} ({shoulder_distance:.3f}>0.35), T={torso_height > 0.50} ({torso_height:.3f}>0.50), A={arm_coverage > 0.30} ({arm_coverage:.3f}>0.30)")
-                print(f"  Criterios sudadera: S={shoulder_distance > 0.25} ({shoulder_distance:.3f}>0.25), A={arm_coverage > 0.20} ({arm_coverage:.3f}>0.20)")
-                print(f"  Criterios manga larga: A={arm_coverage > 0.19} ({arm_coverage:.3f}>0.19)")
+                logger.debug("  ✅ DETECTADO: %s %s (%s)", clothing_detected, style_detected, temp_color)
+                logger.debug("  Criterios chaqueta: S=%s (%.3f>0.35), T=%s (%.3f>0.50), A=%s (%.3f>0.30)", shoulder_distance > 0.35, shoulder_distance, torso_height > 0.50, torso_height, arm_coverage > 0.30, arm_coverage)
+                logger.debug("  Criterios sudadera: S=%s (%.3f>0.25), A=%s (%.3f>0.20)", shoulder_distance > 0.25, shoulder_distance, arm_coverage > 0.20, arm_coverage)
+                logger.debug("  Criterios manga larga: A=%s (%.3f>0.19)", arm_coverage > 0.19, arm_coverage)
 
-        # Detección MEJORADA de accesorios de cabeza
-        # Ahora detecta múltiples accesorios simultáneamente
-        try:
-            accessories_detected = _detect_head_accessories_improved(image_rgb, results.get("face_detected", False))
-            if accessories_detected:
-                results["head_accessory"] = accessories_detected
-                results["accessory_confidence"] = 1.0  # 100% confianza cuando se detecta
-                print(f"🎩 Accesorios de cabeza: {accessories_detected} (confianza: 100%)")
-            else:
-                results["head_accessory"] = None
-                results["accessory_confidence"] = 0.0
-        except Exception as e:
-            print(f"Error detectando accesorios de cabeza: {e}")
-            results["head_accessory"] = None
-            results["accessory_confidence"] = 0.0
-        
-        # Detección de RELOJES (muñecas)
-        try:
-            watch_detected = _detect_watches(image_rgb, results.get("pose_detected", False))
-            if watch_detected:
-                results["watch_detected"] = watch_detected
-                results["watch_confidence"] = 0.9  # 90% confianza cuando se detecta
-                print(f"⌚ Reloj detectado: {watch_detected} (confianza: 90%)")
-            else:
-                results["watch_detected"] = None
-                results["watch_confidence"] = 0.0
-        except Exception as e:
-            print(f"Error detectando relojes: {e}")
-            results["watch_detected"] = None
-            results["watch_confidence"] = 0.0
-        
-        # Detección de CARTERAS/BOLSOS (región media-baja del cuerpo)
-        try:
-            bag_detected = _detect_bags_and_purses(image_rgb, results.get("pose_detected", False))
-            if bag_detected:
-                results["bag_accessory"] = bag_detected
-                print(f"👜 Cartera/Bolso detectado: {bag_detected}")
-            else:
-                results["bag_accessory"] = None
-        except Exception as e:
-            print(f"Error detectando carteras/bolsos: {e}")
-            results["bag_accessory"] = None
+        # Accesorios: cascada de detectores registrados (cabeza, bolso, reloj) sobre
+        # regiones guiadas por los landmarks, con salida temprana y presupuesto de tiempo
+        with span("accessories"):
+            accessories = run_accessory_detectors(
+                ctx,
+                results.get("_pose_landmarks"),
+                face_detected=results.get("face_detected", False),
+                pose_detected=results.get("pose_detected", False)
+            )
+        found = accessories["found"]
+
+        results["head_accessory"] = found.get("head")
+        results["accessory_confidence"] = 1.0 if found.get("head") else 0.0  # 100% confianza cuando se detecta
+        if found.get("head"):
+            logger.debug("🎩 Accesorios de cabeza: %s (confianza: 100%%)", found['head'])
+
+        results["watch_detected"] = found.get("watch")
+        results["watch_confidence"] = 0.9 if found.get("watch") else 0.0  # 90% confianza cuando se detecta
+        if found.get("watch"):
+            logger.debug("⌚ Reloj detectado: %s (confianza: 90%%)", found['watch'])
+
+        results["bag_accessory"] = found.get("bag")
+        if found.get("bag"):
+            logger.debug("👜 Cartera/Bolso detectado: %s", found['bag'])
+
+        results["accessories_skipped"] = accessories["skipped"]
+        results["accessories_ms"] = accessories["elapsed_ms"]
+        if accessories["skipped"]:
+            logger.debug("⏱️ Detectores omitidos por presupuesto: %s", ', '.join(accessories['skipped']))
 
         # Análisis de colores MEJORADO - enfocado en el TORSO
-        try:
-            # Si detectamos pose, usamos el color ya calculado en temp_color
-            if results.get("pose_detected", False):
-                # Ya calculamos el color del torso más arriba (temp_color)
-                # Simplemente usar ese valor directamente
-                if '_pose_landmarks' in results and results['_pose_landmarks']:
-                    # Pose detectada, extraer región del torso nuevamente
-                    landmarks = results['_pose_landmarks'].landmark
-                    left_shoulder = landmarks[11]
-                    right_shoulder = landmarks[12]
-                    left_hip = landmarks[23]
-                    right_hip = landmarks[24]
+        with span("color"):
+            try:
+                # Si detectamos pose, usamos el color ya calculado en temp_color
+                if results.get("pose_detected", False):
+                    # Ya calculamos el color del torso más arriba (temp_color)
+                    # Simplemente usar ese valor directamente
+                    if '_pose_landmarks' in results and results['_pose_landmarks']:
+                        # Pose detectada, extraer región del torso nuevamente
+                        landmarks = results['_pose_landmarks'].landmark
+                        left_shoulder = landmarks[11]
+                        right_shoulder = landmarks[12]
+                        left_hip = landmarks[23]
+                        right_hip = landmarks[24]
                     
-                    torso_x1_final = int(min(left_shoulder.x, right_shoulder.x) * width)
-                    torso_y1_final = int(min(left_shoulder.y, right_shoulder.y) * height)
-                    torso_x2_final = int(max(left_shoulder.x, right_shoulder.x) * width)
-                    torso_y2_final = int((left_hip.y + right_hip.y) / 2 * height)
+                        torso_x1_final = int(min(left_shoulder.x, right_shoulder.x) * width)
+                        torso_y1_final = int(min(left_shoulder.y, right_shoulder.y) * height)
+                        torso_x2_final = int(max(left_shoulder.x, right_shoulder.x) * width)
+                        torso_y2_final = int((left_hip.y + right_hip.y) / 2 * height)
                     
-                    # Asegurar coordenadas válidas
-                    torso_x1_final = max(0, torso_x1_final)
-                    torso_y1_final = max(0, torso_y1_final)
-                    torso_x2_final = min(width, torso_x2_final)
-                    torso_y2_final = min(height, torso_y2_final)
+                        # Asegurar coordenadas válidas
+                        torso_x1_final = max(0, torso_x1_final)
+                        torso_y1_final = max(0, torso_y1_final)
+                        torso_x2_final = min(width, torso_x2_final)
+                        torso_y2_final = min(height, torso_y2_final)
                     
-                    # Extraer región del torso
-                    torso_region = image_rgb[torso_y1_final:torso_y2_final, torso_x1_final:torso_x2_final]
+                        # Extraer región del torso
+                        torso_region = image_rgb[torso_y1_final:torso_y2_final, torso_x1_final:torso_x2_final]
                     
-                    if torso_region.size > 0:
-                        # Análisis de color del torso
-                        avg_color = np.mean(torso_region, axis=(0, 1))
-                        r, g, b = avg_color.astype(int)
+                        # Máscara de persona (opcional): solo píxeles de la persona, no la pared de fondo
+                        person_mask = _person_mask(image_rgb) if PERSON_SEGMENTATION_ENABLED else None
+                        masked = None
+                        if person_mask is not None and torso_region.size > 0:
+                            masked = _masked_region_color(
+                                torso_region,
+                                person_mask[torso_y1_final:torso_y2_final, torso_x1_final:torso_x2_final]
+                            )
+
+                        if masked:
+                            # Color dominante de los píxeles de persona del torso
+                            detected_color, (r, g, b), distribution = masked
+                            results["primary_color"] = detected_color
+                            results["color_source"] = "person_mask"
+                            logger.debug("🎨 Color final del torso (máscara de persona): %s (RGB: %s,%s,%s)", detected_color, r, g, b)
+
+                            lower = _lower_body_color(image_rgb, person_mask, landmarks)
+                            if lower:
+                                results["lower_color"] = lower
+                                logger.debug("🎨 Color de piernas: %s", lower)
+                        elif torso_region.size > 0:
+                            # Análisis de color del torso
+                            avg_color = np.mean(torso_region, axis=(0, 1))
+                            r, g, b = avg_color.astype(int)
+                            detected_color = get_color_name(r, g, b)
+                            results["primary_color"] = detected_color
+                            results["color_source"] = "torso_box"
+                            logger.debug("🎨 Color final del torso: %s (RGB: %s,%s,%s)", detected_color, r, g, b)
+
+                            # Distribución por píxel del torso (tabla de colores vectorizada)
+                            distribution = RGB_COLOR_LUT.histogram(torso_region, top=3)
+
+                        if torso_region.size > 0:
+                            results["color_distribution"] = distribution
+                            secondary = [name for name, share in distribution.items()
+                                         if name not in (detected_color, "desconocido") and share >= 0.2]
+                            if secondary:
+                                results["secondary_color"] = secondary[0]
+                            logger.debug("🎨 Distribución del torso: %s", distribution)
+                        else:
+                            logger.debug("⚠️ Región del torso vacía")
+                            results["primary_color"] = "desconocido"
+                    else:
+                        # Fallback: usar imagen completa
+                        small_image = ctx.resized((100, 100))
+                        avg_color = np.mean(small_image, axis=(0, 1))
+                        b, g, r = avg_color.astype(int)
                         detected_color = get_color_name(r, g, b)
                         results["primary_color"] = detected_color
-                        print(f"🎨 Color final del torso: {detected_color} (RGB: {r},{g},{b})")
-                    else:
-                        print(f"⚠️ Región del torso vacía")
-                        results["primary_color"] = "desconocido"
+                        logger.debug("🎨 Color (imagen completa): %s (RGB: %s,%s,%s)", detected_color, r, g, b)
                 else:
-                    # Fallback: usar imagen completa
-                    small_image = cv2.resize(image_np, (100, 100))
+                    # Si no hay pose, usar imagen completa
+                    small_image = ctx.resized((100, 100))
                     avg_color = np.mean(small_image, axis=(0, 1))
                     b, g, r = avg_color.astype(int)
                     detected_color = get_color_name(r, g, b)
                     results["primary_color"] = detected_color
-                    print(f"🎨 Color (imagen completa): {detected_color} (RGB: {r},{g},{b})")
-            else:
-                # Si no hay pose, usar imagen completa
-                small_image = cv2.resize(image_np, (100, 100))
-                avg_color = np.mean(small_image, axis=(0, 1))
-                b, g, r = avg_color.astype(int)
-                detected_color = get_color_name(r, g, b)
-                results["primary_color"] = detected_color
-                print(f"🎨 Color (sin pose): {detected_color} (RGB: {r},{g},{b})")
+                    logger.debug("🎨 Color (sin pose): %s (RGB: %s,%s,%s)", detected_color, r, g, b)
             
-        except Exception as e:
-            print(f"Error en análisis de colores: {e}")
-            import traceback
-            traceback.print_exc()
-            results["primary_color"] = "desconocido"
+            except Exception as e:
+                logger.warning("Error en análisis de colores: %s", e, exc_info=True)
+                results["primary_color"] = "desconocido"
 
         return results
         
     except Exception as e:
-        print(f"Error en análisis simplificado: {e}")
+        logger.warning("Error en análisis simplificado: %s", e)
         return results
 
-def _detect_head_accessories_improved(image_rgb: np.ndarray, face_detected: bool) -> Optional[str]:
+def _detect_glasses(image_rgb: Union[np.ndarray, FrameContext]) -> Optional[str]:
     """
-    Detecta accesorios (gorros, gafas) usando análisis visual ULTRA CONSERVADOR.
-    VERSIÓN ULTRA ESTRICTA: Solo detecta cuando hay evidencia MUY clara para evitar falsos positivos.
+    Detecta GAFAS en la franja de los ojos (25%-45% de altura) con criterios ULTRA ESTRICTOS.
+    Acepta la imagen RGB o un ``FrameContext`` (p.ej. la región de la persona).
     """
     try:
-        # Si no hay cara detectada, no buscar accesorios
-        if not face_detected:
-            print(f"  ℹ️ No hay cara detectada, omitiendo detección de accesorios")
-            return None
-            
-        height, width = image_rgb.shape[:2]
+        ctx = FrameContext.wrap(image_rgb)
+        height, width = ctx.shape
         accessories = []
         
-        print(f"  🔍 Iniciando detección ULTRA CONSERVADORA de accesorios...")
+        logger.debug("  🔍 Buscando gafas con criterios ULTRA ESTRICTOS...")
         
-        # PRIORIDAD 1: DETECCIÓN DE GAFAS (región de los ojos) - ULTRA ESTRICTA
-        glasses_detected = False
-        if face_detected:
-            print(f"  🔍 Buscando gafas con criterios ULTRA ESTRICTOS...")
-            
-            # Región específica para ojos (más pequeña para evitar falsos positivos)
-            eye_region = image_rgb[int(height * 0.25):int(height * 0.45), int(width * 0.25):int(width * 0.75)]
-            gray_eyes = cv2.cvtColor(eye_region, cv2.COLOR_RGB2GRAY)
-            
-            # Mejorar contraste
-            gray_eyes = cv2.equalizeHist(gray_eyes)
-            
-            # Blur más fuerte para reducir ruido
-            gray_eyes = cv2.GaussianBlur(gray_eyes, (5, 5), 0)
-            
-            # Detectar bordes con umbrales MUY ESTRICTOS
-            edges = cv2.Canny(gray_eyes, 100, 200)  # Umbrales altos para reducir ruido
+        # Región específica para ojos (más pequeña para evitar falsos positivos)
+        gray_eyes = ctx.gray[int(height * 0.25):int(height * 0.45), int(width * 0.25):int(width * 0.75)]
+        
+        # Mejorar contraste (sobre el recorte, no sobre el frame completo)
+        gray_eyes = cv2.equalizeHist(gray_eyes)
+        
+        # Blur más fuerte para reducir ruido
+        gray_eyes = cv2.GaussianBlur(gray_eyes, (5, 5), 0)
+        
+        # Detectar bordes con umbrales MUY ESTRICTOS
+        edges = cv2.Canny(gray_eyes, 100, 200)  # Umbrales altos para reducir ruido
+        
+        # Buscar líneas con parámetros ULTRA ESTRICTOS
+        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=50, minLineLength=30, maxLineGap=5)
+        
+        if lines is not None and len(lines) >= 5:  # Mínimo 5 líneas (muy estricto)
+            # Analizar líneas horizontales (marcos de gafas)
+            horizontal_lines = 0
+            vertical_lines = 0
+            line_positions = []
+            line_lengths = []
             
-            # Buscar líneas con parámetros ULTRA ESTRICTOS
-            lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=50, minLineLength=30, maxLineGap=5)
+            for line in lines:
+                x1, y1, x2, y2 = line[0]
+                angle = abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
+                line_length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
+                
+                # Líneas horizontales (±15°) - muy estricto
+                if angle < 15 or angle > 165:
+                    horizontal_lines += 1
+                    line_positions.append((y1 + y2) / 2)
+                    line_lengths.append(line_length)
+                # Líneas verticales (±15°) - patillas de gafas
+                elif 75 < angle < 105:
+                    vertical_lines += 1
             
-            if lines is not None and len(lines) >= 5:  # Mínimo 5 líneas (muy estricto)
-                # Analizar líneas horizontales (marcos de gafas)
-                horizontal_lines = 0
-                vertical_lines = 0
-                line_positions = []
-                line_lengths = []
+            # Criterios ULTRA ESTRICTOS para detectar gafas
+            if len(line_positions) >= 3:  # Al menos 3 líneas horizontales
+                line_positions.sort()
+                max_separation = line_positions[-1] - line_positions[0]
+                avg_length = np.mean(line_lengths) if line_lengths else 0
                 
-                for line in lines:
-                    x1, y1, x2, y2 = line[0]
-                    angle = abs(np.arctan2(y2 - y1, x2 - x1) * 180 / np.pi)
-                    line_length = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-                    
-                    # Líneas horizontales (±15°) - muy estricto
-                    if angle < 15 or angle > 165:
-                        horizontal_lines += 1
-                        line_positions.append((y1 + y2) / 2)
-                        line_lengths.append(line_length)
-                    # Líneas verticales (±15°) - patillas de gafas
-                    elif 75 < angle < 105:
-                        vertical_lines += 1
+                # Detectar gafas con criterios ULTRA ESTRICTOS
+                has_good_distribution = max_separation > gray_eyes.shape[0] * 0.3  # 30% de altura
+                has_long_lines = avg_length > 25  # Líneas de al menos 25px
+                has_enough_horizontal = horizontal_lines >= 3  # Mínimo 3 horizontales
                 
-                # Criterios ULTRA ESTRICTOS para detectar gafas
-                if len(line_positions) >= 3:  # Al menos 3 líneas horizontales
-                    line_positions.sort()
-                    max_separation = line_positions[-1] - line_positions[0]
-                    avg_length = np.mean(line_lengths) if line_lengths else 0
-                    
-                    # Detectar gafas con criterios ULTRA ESTRICTOS
-                    has_good_distribution = max_separation > eye_region.shape[0] * 0.3  # 30% de altura
-                    has_long_lines = avg_length > 25  # Líneas de al menos 25px
-                    has_enough_horizontal = horizontal_lines >= 3  # Mínimo 3 horizontales
-                    
-                    # Detección ULTRA ESTRICTA de gafas
-                    if (has_enough_horizontal and 
-                        has_good_distribution and 
-                        has_long_lines and
-                        len(lines) >= 5):  # Mínimo 5 líneas totales
-                        glasses_detected = True
-                        accessories.append("gafas")
-                        print(f"  👓 Gafas detectadas (h:{horizontal_lines}, v:{vertical_lines}, sep:{max_separation:.1f}px, long:{avg_length:.1f}px)")
-                    else:
-                        print(f"  👤 NO gafas (h:{horizontal_lines}/{3}, dist:{has_good_distribution}, long:{has_long_lines}, longitud:{avg_length:.1f}px, total:{len(lines)}/{5})")
+                # Detección ULTRA ESTRICTA de gafas
+                if (has_enough_horizontal and 
+                    has_good_distribution and 
+                    has_long_lines and
+                    len(lines) >= 5):  # Mínimo 5 líneas totales
+                    accessories.append("gafas")
+                    logger.debug("  👓 Gafas detectadas (h:%s, v:%s, sep:%.1fpx, long:%.1fpx)", horizontal_lines, vertical_lines, max_separation, avg_length)
                 else:
-                    print(f"  👤 NO gafas (líneas horizontales insuficientes: {len(line_positions)}/{3})")
+                    logger.debug("  👤 NO gafas (h:%s/3, dist:%s, long:%s, longitud:%.1fpx, total:%s/5)", horizontal_lines, has_good_distribution, has_long_lines, avg_length, len(lines))
             else:
-                print(f"  👤 NO gafas (líneas insuficientes: {len(lines) if lines is not None else 0}, mínimo: 5)")
+                logger.debug("  👤 NO gafas (líneas horizontales insuficientes: %s/3)", len(line_positions))
+        else:
+            logger.debug("  👤 NO gafas (líneas insuficientes: %s, mínimo: 5)", len(lines) if lines is not None else 0)
         
-        # PRIORIDAD 2: DETECCIÓN DE GORRO/GORRA (solo si NO hay gafas)
-        # Criterios EXTREMADAMENTE ESTRICTOS para evitar falsos positivos
-        if not glasses_detected:
-            print(f"  🔍 Buscando gorros/gorras con criterios EXTREMADAMENTE ESTRICTOS...")
-            
-            # Región MUY pequeña y específica para gorros (solo parte superior)
-            head_top_region = image_rgb[0:int(height * 0.2), int(width * 0.25):int(width * 0.75)]
-            
-            # Convertir a escala de grises
-            gray_top = cv2.cvtColor(head_top_region, cv2.COLOR_RGB2GRAY)
-            
-            # Threshold adaptativo EXTREMADAMENTE ESTRICTO
-            thresh = cv2.adaptiveThreshold(gray_top, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                          cv2.THRESH_BINARY_INV, 9, 1)
-            
-            # Morfología MUY agresiva para eliminar ruido
-            kernel = np.ones((7, 7), np.uint8)
-            thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-            thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-            
-            # Encontrar contornos
-            contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return accessories[0] if accessories else None
+        
+    except Exception as e:
+        logger.warning("Error detectando gafas: %s", e)
+        return None
+
+def _detect_hat(image_rgb: Union[np.ndarray, FrameContext]) -> Optional[str]:
+    """
+    Detecta GORRO/GORRA en la parte superior (0%-20% de altura) con criterios EXTREMADAMENTE ESTRICTOS.
+    Acepta la imagen RGB o un ``FrameContext`` (p.ej. la región de la persona).
+    """
+    try:
+        ctx = FrameContext.wrap(image_rgb)
+        height, width = ctx.shape
+        accessories = []
+        
+        logger.debug("  🔍 Buscando gorros/gorras con criterios EXTREMADAMENTE ESTRICTOS...")
+        
+        # Región MUY pequeña y específica para gorros (solo parte superior)
+        # (recorte del plano gris compartido)
+        gray_top = ctx.gray[0:int(height * 0.2), int(width * 0.25):int(width * 0.75)]
+        
+        # Threshold adaptativo EXTREMADAMENTE ESTRICTO
+        thresh = cv2.adaptiveThreshold(gray_top, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+                                      cv2.THRESH_BINARY_INV, 9, 1)
+        
+        # Morfología MUY agresiva para eliminar ruido
+        kernel = np.ones((7, 7), np.uint8)
+        thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
+        thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+        
+        # Encontrar contornos
+        contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        
+        # Umbral EXTREMADAMENTE ESTRICTO para gorros
+        large_contours = [c for c in contours if cv2.contourArea(c) > 5000]  # Extremadamente estricto
+        
+        if len(large_contours) > 0:
+            # Analizar el contorno más grande
+            largest_contour = max(large_contours, key=cv2.contourArea)
+            area = cv2.contourArea(largest_contour)
+            x, y, w, h = cv2.boundingRect(largest_contour)
+            aspect_ratio = w / h if h > 0 else 0
+            extent = area / (w * h) if (w * h) > 0 else 0
             
-            # Umbral EXTREMADAMENTE ESTRICTO para gorros
-            large_contours = [c for c in contours if cv2.contourArea(c) > 5000]  # Extremadamente estricto
+            # Calcular posición relativa (gorros están en la parte superior)
+            relative_y = y / gray_top.shape[0]
             
-            if len(large_contours) > 0:
-                # Analizar el contorno más grande
-                largest_contour = max(large_contours, key=cv2.contourArea)
-                area = cv2.contourArea(largest_contour)
-                x, y, w, h = cv2.boundingRect(largest_contour)
-                aspect_ratio = w / h if h > 0 else 0
-                extent = area / (w * h) if (w * h) > 0 else 0
-                
-                # Calcular posición relativa (gorros están en la parte superior)
-                relative_y = y / head_top_region.shape[0]
+            # CRITERIOS EXTREMADAMENTE ESTRICTOS para gorro/gorra
+            # Solo detectar si hay evidencia MUY MUY clara
+            if (area > 6000 and                    # Área extremadamente grande
+                extent > 0.8 and                   # Forma muy compacta
+                relative_y < 0.3 and                # Muy arriba en la imagen
+                aspect_ratio > 0.9 and aspect_ratio < 1.8):  # Forma muy específica
                 
-                # CRITERIOS EXTREMADAMENTE ESTRICTOS para gorro/gorra
-                # Solo detectar si hay evidencia MUY MUY clara
-                if (area > 6000 and                    # Área extremadamente grande
-                    extent > 0.8 and                   # Forma muy compacta
-                    relative_y < 0.3 and                # Muy arriba en la imagen
-                    aspect_ratio > 0.9 and aspect_ratio < 1.8):  # Forma muy específica
-                    
-                    # Gorra: ancha y en la parte superior
-                    if aspect_ratio > 1.4 and w > head_top_region.shape[1] * 0.5:
-                        accessories.append("gorra")
-                        print(f"  🧢 Gorra detectada (área: {area:.0f}, ratio: {aspect_ratio:.2f}, y: {relative_y:.2f})")
-                    # Gorro: más circular/cuadrado
-                    elif 0.9 < aspect_ratio < 1.4 and w > head_top_region.shape[1] * 0.4:
-                        accessories.append("gorro")
-                        print(f"  🧣 Gorro detectado (área: {area:.0f}, ratio: {aspect_ratio:.2f}, y: {relative_y:.2f})")
-                    else:
-                        print(f"  ⚠️ Objeto detectado pero forma incorrecta (ratio: {aspect_ratio:.2f}, w: {w}, y: {relative_y:.2f})")
+                # Gorra: ancha y en la parte superior
+                if aspect_ratio > 1.4 and w > gray_top.shape[1] * 0.5:
+                    accessories.append("gorra")
+                    logger.debug("  🧢 Gorra detectada (área: %.0f, ratio: %.2f, y: %.2f)", area, aspect_ratio, relative_y)
+                # Gorro: más circular/cuadrado
+                elif 0.9 < aspect_ratio < 1.4 and w > gray_top.shape[1] * 0.4:
+                    accessories.append("gorro")
+                    logger.debug("  🧣 Gorro detectado (área: %.0f, ratio: %.2f, y: %.2f)", area, aspect_ratio, relative_y)
                 else:
-                    print(f"  ℹ️ Contorno no cumple criterios extremadamente estrictos (área: {area:.0f}, extent: {extent:.2f}, y: {relative_y:.2f})")
+                    logger.debug("  ⚠️ Objeto detectado pero forma incorrecta (ratio: %.2f, w: %s, y: %.2f)", aspect_ratio, w, relative_y)
             else:
-                print(f"  ✅ No se detectaron contornos grandes en región superior")
+                logger.debug("  ℹ️ Contorno no cumple criterios extremadamente estrictos (área: %.0f, extent: %.2f, y: %.2f)", area, extent, relative_y)
+        else:
+            logger.debug("  ✅ No se detectaron contornos grandes en región superior")
+        
+        return accessories[0] if accessories else None
+        
+    except Exception as e:
+        logger.warning("Error detectando gorros: %s", e)
+        return None
+
+def _detect_head_accessories_improved(image_rgb: Union[np.ndarray, FrameContext], face_detected: bool) -> Optional[str]:
+    """
+    Detecta accesorios (gorros, gafas) usando análisis visual ULTRA CONSERVADOR.
+    VERSIÓN ULTRA ESTRICTA: Solo detecta cuando hay evidencia MUY clara para evitar falsos positivos.
+    Acepta la imagen RGB o el ``FrameContext`` del frame.
+    """
+    try:
+        # Si no hay cara detectada, no buscar accesorios
+        if not face_detected:
+            logger.debug("  ℹ️ No hay cara detectada, omitiendo detección de accesorios")
+            return None
+            
+        ctx = FrameContext.wrap(image_rgb)
+        accessories = []
+        
+        logger.debug("  🔍 Iniciando detección ULTRA CONSERVADORA de accesorios...")
+        
+        # PRIORIDAD 1: DETECCIÓN DE GAFAS (región de los ojos) - ULTRA ESTRICTA
+        glasses = _detect_glasses(ctx)
+        if glasses:
+            accessories.append(glasses)
+            logger.debug("  ℹ️ Gafas detectadas, omitiendo búsqueda de gorros")
         else:
-            print(f"  ℹ️ Gafas detectadas, omitiendo búsqueda de gorros")
+            # PRIORIDAD 2: DETECCIÓN DE GORRO/GORRA (solo si NO hay gafas)
+            # Criterios EXTREMADAMENTE ESTRICTOS para evitar falsos positivos
+            hat = _detect_hat(ctx)
+            if hat:
+                accessories.append(hat)
         
         # Retornar accesorios detectados
         if len(accessories) > 0:
-            print(f"  ✅ Accesorios detectados: {', '.join(accessories)}")
+            logger.debug("  ✅ Accesorios detectados: %s", ', '.join(accessories))
             return ", ".join(accessories)
         else:
-            print(f"  ✅ NO se detectaron accesorios de cabeza (modo ultra conservador)")
+            logger.debug("  ✅ NO se detectaron accesorios de cabeza (modo ultra conservador)")
             return None
         
     except Exception as e:
-        print(f"Error detectando accesorios: {e}")
+        logger.warning("Error detectando accesorios: %s", e)
         return None
 
-def _detect_backpack_straps(image_rgb: np.ndarray) -> bool:
+def _detect_backpack_straps(image_rgb: Union[np.ndarray, FrameContext]) -> bool:
     """
     Detecta TIRAS DE MOCHILA: dos tiras verticales/diagonales oscuras sobre los hombros.
     Esta es la señal MÁS CLARA de que hay una mochila.
     """
     try:
-        height, width = image_rgb.shape[:2]
+        ctx = FrameContext.wrap(image_rgb)
+        height, width = ctx.shape
         
         # Región de hombros/pecho (15%-50% altura)
-        shoulder_region = image_rgb[int(height * 0.15):int(height * 0.50), :]
-        gray_shoulder = cv2.cvtColor(shoulder_region, cv2.COLOR_RGB2GRAY)
+        gray_shoulder = ctx.gray[int(height * 0.15):int(height * 0.50), :]
         
         # Threshold adaptativo para detectar objetos oscuros (tiras)
         thresh = cv2.adaptiveThreshold(gray_shoulder, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
@@ -1044,7 +1215,7 @@ def _detect_backpack_straps(image_rgb: np.ndarray) -> bool:
             # Calcular características
             aspect_ratio = h / w if w > 0 else 0  # Alto/ancho (tiras son verticales)
             center_x = x + w/2
-            relative_x = center_x / shoulder_region.shape[1]
+            relative_x = center_x / gray_shoulder.shape[1]
             
             # Criterios para TIRA DE MOCHILA:
             # 1. Alargada verticalmente (h > w)
@@ -1052,7 +1223,7 @@ def _detect_backpack_straps(image_rgb: np.ndarray) -> bool:
             # 3. No demasiado ancha (< 15% del ancho de imagen)
             # 4. Posición lateral o central (no extremos)
             if (aspect_ratio > 2.0 and
-                w < shoulder_region.shape[1] * 0.15 and
+                w < gray_shoulder.shape[1] * 0.15 and
                 0.15 < relative_x < 0.85):
                 
                 # Verificar que es OSCURO (mochila típicamente negra)
@@ -1088,45 +1259,31 @@ def _detect_backpack_straps(image_rgb: np.ndarray) -> bool:
                 
                 # Si hay buena separación (tiras en lados opuestos)
                 if x_separation > 0.3:  # Al menos 30% de ancho de separación
-                    print(f"  🎒 TIRAS DE MOCHILA detectadas: izq={left['x']:.2f}, der={right['x']:.2f}, sep={x_separation:.2f}")
+                    logger.debug("  🎒 TIRAS DE MOCHILA detectadas: izq=%.2f, der=%.2f, sep=%.2f", left['x'], right['x'], x_separation)
                     return True
         
         return False
         
     except Exception as e:
-        print(f"Error detectando tiras de mochila: {e}")
+        logger.warning("Error detectando tiras de mochila: %s", e)
         return False
 
-def _detect_bags_and_purses(image_rgb: np.ndarray, pose_detected: bool) -> Optional[str]:
+def _detect_bag_contours(image_rgb: Union[np.ndarray, FrameContext]) -> Optional[str]:
     """
-    Detecta carteras, bolsos y mochilas usando análisis ULTRA CONSERVADOR.
-    VERSIÓN ULTRA ESTRICTA: Solo detecta cuando hay evidencia MUY clara para evitar falsos positivos.
+    Detecta mochila, bolso cruzado o cartera por contornos grandes en el torso (30%-70% de altura).
+    Acepta la imagen RGB o un ``FrameContext`` (p.ej. la región de la persona).
     """
     try:
-        # Si no hay persona detectada, no buscar bolsos
-        if not pose_detected:
-            print(f"  ℹ️ No hay pose detectada, omitiendo detección de bolsos")
-            return None
-        
-        print(f"  🔍 Iniciando detección ULTRA CONSERVADORA de bolsos/mochilas...")
-        
-        # PRIORIDAD 1: Detectar TIRAS DE MOCHILA (método más confiable)
-        print(f"  🔍 Buscando tiras de mochila...")
-        if _detect_backpack_straps(image_rgb):
-            print(f"  ✅ Tiras de mochila detectadas")
-            return "mochila"
-        else:
-            print(f"  ℹ️ No se detectaron tiras de mochila")
-            
-        height, width = image_rgb.shape[:2]
+        ctx = FrameContext.wrap(image_rgb)
+        height, width = ctx.shape
         bags_detected = []
         
         # Región MÁS PEQUEÑA del cuerpo para evitar falsos positivos
         # Solo analizar región central del torso (30%-70% altura)
-        body_region = image_rgb[int(height * 0.3):int(height * 0.7), :]
+        body_region = ctx.rgb[int(height * 0.3):int(height * 0.7), :]
         
-        # Convertir a escala de grises
-        gray_body = cv2.cvtColor(body_region, cv2.COLOR_RGB2GRAY)
+        # Escala de grises (recorte del plano compartido)
+        gray_body = ctx.gray[int(height * 0.3):int(height * 0.7), :]
         
         # Threshold adaptativo MÁS ESTRICTO
         thresh = cv2.adaptiveThreshold(gray_body, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
@@ -1144,7 +1301,7 @@ def _detect_bags_and_purses(image_rgb: np.ndarray, pose_detected: bool) -> Optio
         # Solo objetos MUY grandes para evitar falsos positivos
         large_contours = [c for c in contours if cv2.contourArea(c) > 8000]  # Muy estricto
         
-        print(f"  📊 Contornos grandes encontrados: {len(large_contours)}")
+        logger.debug("  📊 Contornos grandes encontrados: %s", len(large_contours))
         
         # PRIMERA PASADA: Buscar MOCHILA con criterios ULTRA ESTRICTOS
         mochila_detected = False
@@ -1178,18 +1335,18 @@ def _detect_bags_and_purses(image_rgb: np.ndarray, pose_detected: bool) -> Optio
                     if region_std > 30 and is_dark:
                         mochila_detected = True
                         bags_detected.append("mochila")
-                        print(f"  🎒 Mochila detectada (área: {area:.0f}, ratio: {aspect_ratio:.2f}, y: {relative_y:.2f}, std: {region_std:.1f}, mean: {region_mean:.1f})")
+                        logger.debug("  🎒 Mochila detectada (área: %.0f, ratio: %.2f, y: %.2f, std: %.1f, mean: %.1f)", area, aspect_ratio, relative_y, region_std, region_mean)
                         break  # STOP: Mochila encontrada
                     else:
-                        print(f"  ⚠️ Candidato a mochila rechazado: std={region_std:.1f} (min:30), mean={region_mean:.1f} (max:100)")
+                        logger.debug("  ⚠️ Candidato a mochila rechazado: std=%.1f (min:30), mean=%.1f (max:100)", region_std, region_mean)
                 else:
-                    print(f"  ⚠️ Candidato a mochila rechazado: región vacía")
+                    logger.debug("  ⚠️ Candidato a mochila rechazado: región vacía")
             else:
-                print(f"  ℹ️ Contorno no cumple criterios ultra estrictos (área: {area:.0f}, ratio: {aspect_ratio:.2f}, y: {relative_y:.2f})")
+                logger.debug("  ℹ️ Contorno no cumple criterios ultra estrictos (área: %.0f, ratio: %.2f, y: %.2f)", area, aspect_ratio, relative_y)
         
         # SEGUNDA PASADA: Si NO hay mochila, buscar otros tipos con criterios ULTRA ESTRICTOS
         if not mochila_detected:
-            print(f"  🔍 Buscando otros tipos de bolsos con criterios ultra estrictos...")
+            logger.debug("  🔍 Buscando otros tipos de bolsos con criterios ultra estrictos...")
             
             # Usar contornos más grandes para otros tipos también
             very_large_contours = [c for c in contours if cv2.contourArea(c) > 12000]  # Aún más estricto
@@ -1223,12 +1380,12 @@ def _detect_bags_and_purses(image_rgb: np.ndarray, pose_detected: bool) -> Optio
                         # SOLO detectar si es MUY OSCURO Y tiene MUY ALTO CONTRASTE
                         if is_dark and has_contrast:
                             bags_detected.append("bolso_cruzado")
-                            print(f"  👜 Bolso cruzado detectado (área: {area:.0f}, pos: {relative_x:.2f}, ratio: {aspect_ratio:.2f}, std: {region_std:.1f}, mean: {region_mean:.1f})")
+                            logger.debug("  👜 Bolso cruzado detectado (área: %.0f, pos: %.2f, ratio: %.2f, std: %.1f, mean: %.1f)", area, relative_x, aspect_ratio, region_std, region_mean)
                             break  # Solo un bolso
                         else:
-                            print(f"  ⚠️ Candidato a bolso descartado: dark={is_dark} (mean:{region_mean:.1f}/80), contrast={has_contrast} (std:{region_std:.1f}/40)")
+                            logger.debug("  ⚠️ Candidato a bolso descartado: dark=%s (mean:%.1f/80), contrast=%s (std:%.1f/40)", is_dark, region_mean, has_contrast, region_std)
                     else:
-                        print(f"  ⚠️ Candidato a bolso descartado: región vacía")
+                        logger.debug("  ⚠️ Candidato a bolso descartado: región vacía")
                 
                 # CARTERA ULTRA ESTRICTA: Solo si hay evidencia MUY clara
                 elif (area > 8000 and area < 15000 and    # Rango específico
@@ -1244,32 +1401,60 @@ def _detect_bags_and_purses(image_rgb: np.ndarray, pose_detected: bool) -> Optio
                         
                         if is_dark:
                             bags_detected.append("cartera")
-                            print(f"  👛 Cartera detectada (área: {area:.0f}, pos: {relative_x:.2f}, y: {relative_y:.2f}, mean: {region_mean:.1f})")
+                            logger.debug("  👛 Cartera detectada (área: %.0f, pos: %.2f, y: %.2f, mean: %.1f)", area, relative_x, relative_y, region_mean)
                             break  # Solo una cartera
                         else:
-                            print(f"  ⚠️ Candidato a cartera descartado: mean={region_mean:.1f} (max:90)")
+                            logger.debug("  ⚠️ Candidato a cartera descartado: mean=%.1f (max:90)", region_mean)
                     else:
-                        print(f"  ⚠️ Candidato a cartera descartado: región vacía")
+                        logger.debug("  ⚠️ Candidato a cartera descartado: región vacía")
         
         # Eliminar duplicados pero mantener el orden
         if bags_detected:
             # Priorizar tipo más específico detectado
             if "mochila" in bags_detected:
-                print(f"  ✅ Resultado final: mochila")
+                logger.debug("  ✅ Resultado final: mochila")
                 return "mochila"
             elif "bolso_cruzado" in bags_detected:
-                print(f"  ✅ Resultado final: bolso_cruzado")
+                logger.debug("  ✅ Resultado final: bolso_cruzado")
                 return "bolso_cruzado"
             elif "cartera" in bags_detected:
-                print(f"  ✅ Resultado final: cartera")
+                logger.debug("  ✅ Resultado final: cartera")
                 return "cartera"
         
         # Debug: indicar que no se detectó nada
-        print(f"  ✅ NO se detectaron bolsos/carteras (modo ultra conservador)")
+        logger.debug("  ✅ NO se detectaron bolsos/carteras (modo ultra conservador)")
+        return None
+        
+    except Exception as e:
+        logger.warning("Error detectando carteras/bolsos: %s", e)
         return None
+
+def _detect_bags_and_purses(image_rgb: Union[np.ndarray, FrameContext], pose_detected: bool) -> Optional[str]:
+    """
+    Detecta carteras, bolsos y mochilas usando análisis ULTRA CONSERVADOR.
+    VERSIÓN ULTRA ESTRICTA: Solo detecta cuando hay evidencia MUY clara para evitar falsos positivos.
+    """
+    try:
+        # Si no hay persona detectada, no buscar bolsos
+        if not pose_detected:
+            logger.debug("  ℹ️ No hay pose detectada, omitiendo detección de bolsos")
+            return None
+        
+        logger.debug("  🔍 Iniciando detección ULTRA CONSERVADORA de bolsos/mochilas...")
+        ctx = FrameContext.wrap(image_rgb)
+        
+        # PRIORIDAD 1: Detectar TIRAS DE MOCHILA (método más confiable)
+        logger.debug("  🔍 Buscando tiras de mochila...")
+        if _detect_backpack_straps(ctx):
+            logger.debug("  ✅ Tiras de mochila detectadas")
+            return "mochila"
+        else:
+            logger.debug("  ℹ️ No se detectaron tiras de mochila")
+            
+        return _detect_bag_contours(ctx)
         
     except Exception as e:
-        print(f"Error detectando carteras/bolsos: {e}")
+        logger.warning("Error detectando carteras/bolsos: %s", e)
         return None
 
 def _detect_head_accessories_smart(image_rgb: np.ndarray) -> Optional[str]:
@@ -1320,7 +1505,7 @@ def generate_real_recommendations(analysis: dict) -> dict:
         "interaction_tips": interaction_tips
     }
 
-def _detect_watches(image_rgb: np.ndarray, pose_detected: bool) -> Optional[str]:
+def _detect_watches(image_rgb: Union[np.ndarray, FrameContext], pose_detected: bool) -> Optional[str]:
     """
     Detecta relojes en las muñecas usando análisis visual estricto.
     VERSIÓN MUY CONSERVADORA: Solo detecta cuando hay evidencia clara de reloj.
@@ -1330,11 +1515,12 @@ def _detect_watches(image_rgb: np.ndarray, pose_detected: bool) -> Optional[str]
         if not pose_detected:
             return None
             
-        height, width = image_rgb.shape[:2]
+        ctx = FrameContext.wrap(image_rgb)
+        height, width = ctx.shape
         
-        # Regiones de muñecas (aproximadamente 60-80% de altura, 20-40% y 60-80% de ancho)
-        left_wrist_region = image_rgb[int(height * 0.6):int(height * 0.8), int(width * 0.2):int(width * 0.4)]
-        right_wrist_region = image_rgb[int(height * 0.6):int(height * 0.8), int(width * 0.6):int(width * 0.8)]
+        # Regiones de muñecas (aproximadamente 60-80% de altura, 20-40% y 60-80% de ancho), en gris
+        left_wrist_region = ctx.gray[int(height * 0.6):int(height * 0.8), int(width * 0.2):int(width * 0.4)]
+        right_wrist_region = ctx.gray[int(height * 0.6):int(height * 0.8), int(width * 0.6):int(width * 0.8)]
         
         watches_detected = []
         
@@ -1351,24 +1537,24 @@ def _detect_watches(image_rgb: np.ndarray, pose_detected: bool) -> Optional[str]
         if watches_detected:
             return ", ".join(watches_detected)
         else:
-            print(f"  ✅ NO se detectaron relojes en las muñecas")
+            logger.debug("  ✅ NO se detectaron relojes en las muñecas")
             return None
             
     except Exception as e:
-        print(f"Error detectando relojes: {e}")
+        logger.warning("Error detectando relojes: %s", e)
         return None
 
 def _analyze_wrist_region(wrist_region: np.ndarray, side: str) -> Optional[str]:
     """
-    Analiza una región de muñeca para detectar relojes.
+    Analiza una región de muñeca (RGB o ya en gris) para detectar relojes.
     CRITERIOS MUY ESTRICTOS para evitar falsos positivos.
     """
     try:
         if wrist_region.size == 0:
             return None
             
-        # Convertir a escala de grises
-        gray_wrist = cv2.cvtColor(wrist_region, cv2.COLOR_RGB2GRAY)
+        # Convertir a escala de grises (si no viene del plano gris compartido)
+        gray_wrist = cv2.cvtColor(wrist_region, cv2.COLOR_RGB2GRAY) if wrist_region.ndim == 3 else wrist_region
         
         # Aplicar blur para reducir ruido
         gray_wrist = cv2.GaussianBlur(gray_wrist, (5, 5), 0)
@@ -1426,15 +1612,98 @@ def _analyze_wrist_region(wrist_region: np.ndarray, side: str) -> Optional[str]:
             max_distance = min(wrist_region.shape[0], wrist_region.shape[1]) // 3
             
             if distance_from_center < max_distance:
-                print(f"  ⌚ Reloj detectado en muñeca {side} (área: {best_watch['area']:.0f}, circularidad: {best_watch['circularity']:.2f})")
+                logger.debug("  ⌚ Reloj detectado en muñeca %s (área: %.0f, circularidad: %.2f)", side, best_watch['area'], best_watch['circularity'])
                 return f"reloj_{side}"
             else:
-                print(f"  ⚠️ Objeto detectado pero no en posición de reloj (distancia: {distance_from_center:.1f})")
+                logger.debug("  ⚠️ Objeto detectado pero no en posición de reloj (distancia: %.1f)", distance_from_center)
         else:
-            print(f"  ✅ No se detectaron objetos con forma de reloj en muñeca {side}")
+            logger.debug("  ✅ No se detectaron objetos con forma de reloj en muñeca %s", side)
             
         return None
         
     except Exception as e:
-        print(f"Error analizando muñeca {side}: {e}")
+        logger.warning("Error analizando muñeca %s: %s", side, e)
+        return None
+
+
+# ============================================================
+# Cascada de accesorios: regiones guiadas por landmarks
+# ============================================================
+
+def _portrait_roi(pose_landmarks, height: int, width: int) -> Optional[tuple]:
+    """
+    Región de la persona encuadrada como un primer plano: ojos al ~30% y
+    hombros al ~50% de la altura, con la proporción del frame. Los detectores
+    de accesorios se calibraron con la persona cerca de la cámara, así que sus
+    fracciones de altura y umbrales en píxeles siguen valiendo sobre esta región.
+    """
+    if pose_landmarks is None:
         return None
+    landmarks = pose_landmarks.landmark
+    eye_y = (landmarks[2].y + landmarks[5].y) / 2 * height
+    shoulder_y = (landmarks[11].y + landmarks[12].y) / 2 * height
+    center_x = (landmarks[11].x + landmarks[12].x) / 2 * width
+    if shoulder_y <= eye_y:
+        return None
+
+    roi_h = (shoulder_y - eye_y) / 0.2
+    roi_w = roi_h * width / height
+    x1 = max(0, int(center_x - roi_w / 2))
+    y1 = max(0, int(eye_y - roi_h * 0.3))
+    x2 = min(width, int(center_x + roi_w / 2))
+    y2 = min(height, int(y1 + roi_h))
+    if x2 - x1 < 32 or y2 - y1 < 32:
+        return None
+    return x1, y1, x2, y2
+
+def _wrist_rois(pose_landmarks, height: int, width: int) -> list:
+    """
+    Regiones cuadradas centradas en las muñecas visibles (landmarks 15 y 16),
+    nombradas por su lado en la imagen como en la detección por regiones fijas.
+    """
+    landmarks = pose_landmarks.landmark
+    shoulder_px = abs(landmarks[11].x - landmarks[12].x) * width
+    half = max(int(shoulder_px * 0.25), 16)
+
+    wrists = [landmarks[i] for i in (15, 16) if landmarks[i].visibility > 0.5]
+    rois = []
+    for wrist in sorted(wrists, key=lambda lm: lm.x):
+        cx, cy = int(wrist.x * width), int(wrist.y * height)
+        x1, y1 = max(0, cx - half), max(0, cy - half)
+        x2, y2 = min(width, cx + half), min(height, cy + half)
+        if x2 - x1 > 0 and y2 - y1 > 0:
+            side = "izquierda" if wrist.x < 0.5 else "derecha"
+            rois.append((side, (x1, y1, x2, y2)))
+    return rois
+
+def _person_ctx(ctx: FrameContext, pose_landmarks) -> FrameContext:
+    """Sub-contexto de la persona (o el frame completo si no hay landmarks útiles)"""
+    roi = _portrait_roi(pose_landmarks, *ctx.shape)
+    return ctx.crop(*roi) if roi else ctx
+
+@register_accessory_detector("glasses", group="head", priority=10, requires="face")
+def _cascade_glasses(ctx: FrameContext, pose_landmarks) -> Optional[str]:
+    return _detect_glasses(_person_ctx(ctx, pose_landmarks))
+
+@register_accessory_detector("hat", group="head", priority=20, requires="face")
+def _cascade_hat(ctx: FrameContext, pose_landmarks) -> Optional[str]:
+    return _detect_hat(_person_ctx(ctx, pose_landmarks))
+
+@register_accessory_detector("backpack_straps", group="bag", priority=30)
+def _cascade_backpack_straps(ctx: FrameContext, pose_landmarks) -> Optional[str]:
+    return "mochila" if _detect_backpack_straps(_person_ctx(ctx, pose_landmarks)) else None
+
+@register_accessory_detector("bag_contours", group="bag", priority=40)
+def _cascade_bag_contours(ctx: FrameContext, pose_landmarks) -> Optional[str]:
+    return _detect_bag_contours(_person_ctx(ctx, pose_landmarks))
+
+@register_accessory_detector("watches", group="watch", priority=50)
+def _cascade_watches(ctx: FrameContext, pose_landmarks) -> Optional[str]:
+    if pose_landmarks is None:
+        return _detect_watches(ctx, True)
+    watches = []
+    for side, roi in _wrist_rois(pose_landmarks, *ctx.shape):
+        watch = _analyze_wrist_region(ctx.crop(*roi).gray, side)
+        if watch:
+            watches.append(watch)
+    return ", ".join(watches) if watches else None
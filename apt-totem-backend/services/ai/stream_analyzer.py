@@ -0,0 +1,165 @@
+"""
+Análisis con estado por stream de cámara.
+
+Con grafos compartidos en modo imagen estática, cada frame es una detección
+en frío. Un ``StreamAnalyzer`` es dueño de su propio ``Pose`` en modo video
+(static_image_mode=False), que sigue a la persona entre frames y solo vuelve
+a correr el detector completo cuando pierde el tracking. La cara se detecta
+cada N frames mientras el tracking se mantiene, y los atributos (edad,
+prenda, colores, accesorios) se suavizan por votación en una ventana para
+que no parpadeen.
+
+Los analizadores viven en el proceso que analiza (un worker de
+``cv_worker_pool``); las conexiones se enrutan siempre al mismo worker.
+"""
+import os
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Dict, Optional
+
+import mediapipe as mp
+import numpy as np
+
+from services.ai.real_detection import analyze_real_clothing_simple
+
+mp_face_detection = mp.solutions.face_detection
+mp_pose = mp.solutions.pose
+
+# Activar el análisis con tracking para /ws
+STREAM_TRACKING_ENABLED = os.getenv("NEOTOTEM_STREAM_TRACKING", "1") == "1"
+# Frames entre detecciones faciales mientras la pose sigue trackeada
+DEFAULT_FACE_INTERVAL = int(os.getenv("NEOTOTEM_FACE_INTERVAL", "5"))
+# Frames usados para suavizar atributos
+DEFAULT_SMOOTHING_WINDOW = int(os.getenv("NEOTOTEM_SMOOTHING_WINDOW", "5"))
+# Segundos sin frames tras los cuales se libera un analizador
+STREAM_IDLE_TIMEOUT_S = float(os.getenv("NEOTOTEM_STREAM_IDLE_S", "120"))
+
+# Campos que produce la detección facial (se reutilizan entre detecciones)
+FACE_FIELDS = ("face_detected", "detection_confidence", "age_range")
+
+# Atributos suavizados por votación
+SMOOTHED_ATTRIBUTES = (
+    "age_range", "clothing_item", "clothing_style", "primary_color", "secondary_color",
+    "head_accessory", "bag_accessory", "watch_detected"
+)
+
+
+class StreamAnalyzer:
+    """Analizador con tracking y suavizado para un stream de cámara"""
+
+    def __init__(self, face_interval: int = DEFAULT_FACE_INTERVAL, window: int = DEFAULT_SMOOTHING_WINDOW):
+        self.face_interval = max(1, face_interval)
+        self._pose = mp_pose.Pose(static_image_mode=False, min_detection_confidence=0.5, min_tracking_confidence=0.5)
+        self._face = mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5)
+        self._history: "deque[Dict[str, Any]]" = deque(maxlen=max(1, window))
+        self._face_fields: Optional[Dict[str, Any]] = None
+        self._frames_since_face = 0
+        self._tracking = False
+        self._lock = threading.Lock()  # Un frame a la vez; close() espera al frame en curso
+        self.last_used = time.monotonic()
+        self.frames = 0
+        self.face_runs = 0
+        self.tracking_lost = 0
+
+    def analyze(self, image_np: np.ndarray) -> dict:
+        """Analiza un frame BGR del stream"""
+        with self._lock:
+            return self._analyze(image_np)
+
+    def _analyze(self, image_np: np.ndarray) -> dict:
+        self.last_used = time.monotonic()
+        self.frames += 1
+
+        run_face = (
+            not self._tracking
+            or self._face_fields is None
+            or self._frames_since_face >= self.face_interval
+        )
+        results = analyze_real_clothing_simple(
+            image_np,
+            face_graph=self._face,
+            pose_graph=self._pose,
+            face_override=None if run_face else self._face_fields
+        )
+
+        if run_face:
+            self.face_runs += 1
+            self._frames_since_face = 0
+            self._face_fields = {key: results[key] for key in FACE_FIELDS}
+        else:
+            self._frames_since_face += 1
+
+        if self._tracking and not results["pose_detected"]:
+            self.tracking_lost += 1
+        self._tracking = results["pose_detected"]
+
+        self._smooth(results)
+        results["tracking"] = {
+            "active": self._tracking,
+            "face_reused": not run_face,
+            "window": len(self._history)
+        }
+        return results
+
+    def _smooth(self, results: dict):
+        """Reemplaza cada atributo por el más votado de la ventana (empate: el más reciente)"""
+        if not results["person_detected"]:
+            # Sin persona: la próxima que aparezca empieza con la ventana vacía
+            self._history.clear()
+            return
+
+        self._history.append({key: results.get(key) for key in SMOOTHED_ATTRIBUTES})
+        for key in SMOOTHED_ATTRIBUTES:
+            if key not in results:
+                continue
+            values = [frame[key] for frame in self._history]
+            counts = Counter(values)
+            best = max(counts.values())
+            # Recorrer desde el más reciente para desempatar
+            results[key] = next(value for value in reversed(values) if counts[value] == best)
+
+    def close(self):
+        with self._lock:
+            self._pose.close()
+            self._face.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "face_runs": self.face_runs,
+            "tracking": self._tracking,
+            "tracking_lost": self.tracking_lost
+        }
+
+
+# Analizadores del proceso por clave de stream
+_analyzers: Dict[str, StreamAnalyzer] = {}
+_analyzers_lock = threading.Lock()
+
+
+def get_stream_analyzer(key: str) -> StreamAnalyzer:
+    """Retorna (o crea) el analizador del stream, liberando los inactivos"""
+    now = time.monotonic()
+    with _analyzers_lock:
+        for idle_key in [k for k, a in _analyzers.items() if now - a.last_used > STREAM_IDLE_TIMEOUT_S]:
+            _analyzers.pop(idle_key).close()
+        analyzer = _analyzers.get(key)
+        if analyzer is None:
+            analyzer = _analyzers[key] = StreamAnalyzer()
+        return analyzer
+
+
+def release_stream_analyzer(key: str) -> bool:
+    """Libera el analizador del stream (p.ej. al desconectarse la cámara)"""
+    with _analyzers_lock:
+        analyzer = _analyzers.pop(key, None)
+    if analyzer is None:
+        return False
+    analyzer.close()
+    return True
+
+
+def stream_analyzer_stats() -> Dict[str, Any]:
+    with _analyzers_lock:
+        return {key: analyzer.stats() for key, analyzer in _analyzers.items()}
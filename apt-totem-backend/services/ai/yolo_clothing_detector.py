@@ -10,6 +10,60 @@ from typing import Dict, List, Any, Optional
 import requests
 import json
 
+from services.cv.dominant_color import dominant_colors
+from services.cv.color_lut import ColorLUT
+from services.cv.image_io import decode_image
+from services.ai.onnx_detector import create_onnx_detector
+
+# Rangos RGB de colores expandidos (gana el primer rango que contiene al color)
+YOLO_COLOR_RULES = [
+    ("rojo", [(200, 0, 0), (255, 100, 100)]),
+    ("rojo oscuro", [(100, 0, 0), (200, 50, 50)]),
+    ("rojo claro", [(255, 100, 100), (255, 200, 200)]),
+    ("azul", [(0, 0, 200), (100, 100, 255)]),
+    ("azul marino", [(0, 0, 100), (50, 50, 200)]),
+    ("azul cielo", [(150, 200, 255), (200, 220, 255)]),
+    ("verde", [(0, 200, 0), (100, 255, 100)]),
+    ("verde oscuro", [(0, 100, 0), (50, 200, 50)]),
+    ("verde lima", [(150, 255, 0), (200, 255, 100)]),
+    ("amarillo", [(200, 200, 0), (255, 255, 100)]),
+    ("amarillo dorado", [(200, 180, 0), (255, 220, 50)]),
+    ("naranja", [(255, 150, 0), (255, 200, 100)]),
+    ("naranja oscuro", [(200, 100, 0), (255, 150, 50)]),
+    ("negro", [(0, 0, 0), (50, 50, 50)]),
+    ("blanco", [(200, 200, 200), (255, 255, 255)]),
+    ("gris", [(100, 100, 100), (200, 200, 200)]),
+    ("gris oscuro", [(50, 50, 50), (100, 100, 100)]),
+    ("gris claro", [(200, 200, 200), (230, 230, 230)]),
+    ("marrón", [(100, 50, 0), (200, 150, 100)]),
+    ("marrón claro", [(150, 100, 50), (200, 150, 100)]),
+    ("marrón oscuro", [(50, 25, 0), (100, 75, 50)]),
+    ("rosa", [(200, 100, 150), (255, 150, 200)]),
+    ("rosa claro", [(255, 150, 200), (255, 200, 220)]),
+    ("rosa oscuro", [(150, 50, 100), (200, 100, 150)]),
+    ("morado", [(100, 0, 200), (200, 100, 255)]),
+    ("morado oscuro", [(50, 0, 100), (100, 50, 200)]),
+    ("morado claro", [(200, 100, 255), (220, 150, 255)]),
+    ("turquesa", [(0, 200, 200), (100, 255, 255)]),
+    ("coral", [(255, 100, 100), (255, 150, 150)]),
+    ("salmon", [(255, 150, 120), (255, 180, 150)]),
+    ("beige", [(200, 180, 150), (255, 220, 180)]),
+    ("crema", [(240, 230, 200), (255, 250, 220)]),
+    ("violeta", [(150, 50, 200), (200, 100, 255)]),
+    ("índigo", [(50, 0, 150), (100, 50, 200)]),
+    ("magenta", [(200, 0, 200), (255, 100, 255)]),
+    ("cian", [(0, 200, 200), (100, 255, 255)]),
+    ("oliva", [(100, 100, 0), (150, 150, 50)]),
+    ("caqui", [(150, 150, 100), (200, 200, 150)]),
+    ("granate", [(100, 0, 50), (150, 50, 100)]),
+    ("burdeos", [(100, 0, 0), (150, 50, 50)]),
+    ("oro", [(200, 180, 0), (255, 220, 50)]),
+    ("plata", [(180, 180, 200), (220, 220, 240)])
+]
+
+# Tabla compilada una vez al importar
+YOLO_COLOR_LUT = ColorLUT(YOLO_COLOR_RULES)
+
 class YOLOClothingDetector:
     """Detector de prendas usando YOLO y modelos especializados"""
     
@@ -51,6 +105,9 @@ class YOLOClothingDetector:
             'earrings': 'aretes',
             'ring': 'anillo'
         }
+        
+        # Backend ONNX Runtime opcional (NEOTOTEM_YOLO_ONNX_MODEL); None = contornos
+        self.backend = create_onnx_detector()
     
     def detect_clothing_yolo(self, image_np: np.ndarray) -> Dict[str, Any]:
         """
@@ -67,11 +124,12 @@ class YOLOClothingDetector:
         }
         
         try:
-            # Simulación de detección YOLO (en producción usarías un modelo real)
-            # Aquí implementarías la lógica real de YOLO
-            
-            # Por ahora, usar análisis de contornos para detectar formas de ropa
-            clothing_detected = self._analyze_clothing_shapes(image_np)
+            if self.backend is not None:
+                results["detection_method"] = "yolo_onnx"
+                clothing_detected = self._detect_with_backend(image_np)
+            else:
+                # Sin modelo configurado: análisis de contornos para detectar formas de ropa
+                clothing_detected = self._analyze_clothing_shapes(image_np)
             
             if clothing_detected:
                 results["person_detected"] = True
@@ -89,6 +147,36 @@ class YOLOClothingDetector:
                 "detection_method": "yolo_error"
             }
     
+    def _detect_with_backend(self, image_np: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Detección con el modelo ONNX; las clases se traducen con ``clothing_mapping``
+        """
+        detections = self.backend.detect(image_np)
+        
+        clothing_items = []
+        for detection in detections:
+            item = self.clothing_mapping.get(detection["class"], detection["class"])
+            if item == "persona":
+                continue
+            x1, y1, x2, y2 = detection["box"]
+            clothing_items.append({
+                "item": item,
+                "area": (x2 - x1) * (y2 - y1),
+                "confidence": detection["confidence"],
+                "box": detection["box"]
+            })
+        
+        if not clothing_items:
+            return None
+        
+        primary_item = max(clothing_items, key=lambda x: x["area"])
+        return {
+            "items": [item["item"] for item in clothing_items],
+            "primary": primary_item["item"],
+            "style": self._determine_style(clothing_items),
+            "confidence": primary_item["confidence"]
+        }
+    
     def _analyze_clothing_shapes(self, image_np: np.ndarray) -> Optional[Dict[str, Any]]:
         """
         Análisis de formas para detectar prendas básicas
@@ -245,27 +333,11 @@ class YOLOClothingDetector:
             # Convertir a RGB
             rgb_image = cv2.cvtColor(small_image, cv2.COLOR_BGR2RGB)
             
-            # Reshape para clustering
-            pixels = rgb_image.reshape(-1, 3)
-            
-            # K-means clustering para encontrar colores dominantes
-            from sklearn.cluster import KMeans
-            
-            kmeans = KMeans(n_clusters=3, random_state=42, n_init=10)
-            kmeans.fit(pixels)
-            
-            # Obtener colores dominantes
-            colors = kmeans.cluster_centers_.astype(int)
-            labels = kmeans.labels_
+            # Colores dominantes ordenados por frecuencia
+            colors, color_counts = dominant_colors(rgb_image, k=3)
             
-            # Contar frecuencia de cada color
-            color_counts = np.bincount(labels)
-            
-            # Ordenar por frecuencia
-            sorted_indices = np.argsort(color_counts)[::-1]
-            
-            primary_color = colors[sorted_indices[0]]
-            secondary_color = colors[sorted_indices[1]] if len(sorted_indices) > 1 else None
+            primary_color = colors[0].astype(int)
+            secondary_color = colors[1].astype(int) if len(colors) > 1 else None
             
             # Convertir RGB a nombres de colores
             primary_name = self._rgb_to_color_name(primary_color)
@@ -274,7 +346,7 @@ class YOLOClothingDetector:
             return {
                 "primary_color": primary_name,
                 "secondary_color": secondary_name,
-                "confidence": color_counts[sorted_indices[0]] / len(labels)
+                "confidence": float(color_counts[0] / color_counts.sum())
             }
             
         except Exception as e:
@@ -293,78 +365,36 @@ class YOLOClothingDetector:
             return "desconocido"
         
         r, g, b = rgb_color
-        
-        # Definir rangos de colores expandidos
-        color_ranges = {
-            "rojo": [(200, 0, 0), (255, 100, 100)],
-            "rojo oscuro": [(100, 0, 0), (200, 50, 50)],
-            "rojo claro": [(255, 100, 100), (255, 200, 200)],
-            "azul": [(0, 0, 200), (100, 100, 255)],
-            "azul marino": [(0, 0, 100), (50, 50, 200)],
-            "azul cielo": [(150, 200, 255), (200, 220, 255)],
-            "verde": [(0, 200, 0), (100, 255, 100)],
-            "verde oscuro": [(0, 100, 0), (50, 200, 50)],
-            "verde lima": [(150, 255, 0), (200, 255, 100)],
-            "amarillo": [(200, 200, 0), (255, 255, 100)],
-            "amarillo dorado": [(200, 180, 0), (255, 220, 50)],
-            "naranja": [(255, 150, 0), (255, 200, 100)],
-            "naranja oscuro": [(200, 100, 0), (255, 150, 50)],
-            "negro": [(0, 0, 0), (50, 50, 50)],
-            "blanco": [(200, 200, 200), (255, 255, 255)],
-            "gris": [(100, 100, 100), (200, 200, 200)],
-            "gris oscuro": [(50, 50, 50), (100, 100, 100)],
-            "gris claro": [(200, 200, 200), (230, 230, 230)],
-            "marrón": [(100, 50, 0), (200, 150, 100)],
-            "marrón claro": [(150, 100, 50), (200, 150, 100)],
-            "marrón oscuro": [(50, 25, 0), (100, 75, 50)],
-            "rosa": [(200, 100, 150), (255, 150, 200)],
-            "rosa claro": [(255, 150, 200), (255, 200, 220)],
-            "rosa oscuro": [(150, 50, 100), (200, 100, 150)],
-            "morado": [(100, 0, 200), (200, 100, 255)],
-            "morado oscuro": [(50, 0, 100), (100, 50, 200)],
-            "morado claro": [(200, 100, 255), (220, 150, 255)],
-            "turquesa": [(0, 200, 200), (100, 255, 255)],
-            "coral": [(255, 100, 100), (255, 150, 150)],
-            "salmon": [(255, 150, 120), (255, 180, 150)],
-            "beige": [(200, 180, 150), (255, 220, 180)],
-            "crema": [(240, 230, 200), (255, 250, 220)],
-            "violeta": [(150, 50, 200), (200, 100, 255)],
-            "índigo": [(50, 0, 150), (100, 50, 200)],
-            "magenta": [(200, 0, 200), (255, 100, 255)],
-            "cian": [(0, 200, 200), (100, 255, 255)],
-            "oliva": [(100, 100, 0), (150, 150, 50)],
-            "caqui": [(150, 150, 100), (200, 200, 150)],
-            "granate": [(100, 0, 50), (150, 50, 100)],
-            "burdeos": [(100, 0, 0), (150, 50, 50)],
-            "oro": [(200, 180, 0), (255, 220, 50)],
-            "plata": [(180, 180, 200), (220, 220, 240)]
-        }
-        
-        # Encontrar el color más cercano
-        for color_name, (min_rgb, max_rgb) in color_ranges.items():
-            if (min_rgb[0] <= r <= max_rgb[0] and 
-                min_rgb[1] <= g <= max_rgb[1] and 
-                min_rgb[2] <= b <= max_rgb[2]):
-                return color_name
-        
-        return "desconocido"
+        return YOLO_COLOR_LUT.name(r, g, b)
 
 # Instancia global del detector
 yolo_clothing_detector = YOLOClothingDetector()
 
 def analyze_clothing_with_yolo(image_data_base64: str) -> Dict[str, Any]:
     """
-    Función wrapper para análisis de prendas con YOLO
+    Función wrapper para análisis de prendas con YOLO (imagen en base64)
     """
     try:
         # Decodificar imagen
-        img_bytes = base64.b64decode(image_data_base64)
-        img_np = np.frombuffer(img_bytes, np.uint8)
-        image = cv2.imdecode(img_np, cv2.IMREAD_COLOR)
+        image = decode_image(base64.b64decode(image_data_base64))
         
         if image is None:
             raise ValueError("No se pudo decodificar la imagen")
         
+    except Exception as e:
+        return {
+            "error": str(e),
+            "timestamp": datetime.now().isoformat(),
+            "analysis_type": "yolo_error"
+        }
+    
+    return analyze_clothing_with_yolo_array(image)
+
+def analyze_clothing_with_yolo_array(image: np.ndarray) -> Dict[str, Any]:
+    """
+    Análisis de prendas con YOLO sobre un frame ya decodificado (BGR)
+    """
+    try:
         # Realizar análisis combinado
         result = yolo_clothing_detector.analyze_with_color_detection(image)
         
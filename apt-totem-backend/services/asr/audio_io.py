@@ -0,0 +1,83 @@
+"""
+Decodificación de audio en memoria para el ASR (bytes -> float32 mono a 16 kHz).
+
+WAV PCM se lee con ``wave`` + NumPy sin pasar por FFmpeg; WebM/Opus/OGG/MP3
+se decodifican con PyAV (dependencia de faster-whisper) desde un ``BytesIO``.
+Nada se escribe a disco.
+"""
+import io
+import wave
+from typing import Optional, Union
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Ancho de muestra (bytes) -> dtype de NumPy en WAV PCM
+_WAV_DTYPES = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+
+def pcm16_to_float(pcm: Buffer) -> np.ndarray:
+    """PCM 16-bit little endian -> float32 en [-1, 1]"""
+    return np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def resample(audio: np.ndarray, sample_rate: int, target: int = SAMPLE_RATE) -> np.ndarray:
+    """Remuestreo lineal (suficiente para voz a 8/44.1/48 kHz)"""
+    if sample_rate == target or audio.size == 0:
+        return audio
+    count = int(round(audio.size * target / sample_rate))
+    positions = np.arange(count) * (sample_rate / target)
+    return np.interp(positions, np.arange(audio.size), audio).astype(np.float32)
+
+
+def decode_wav(data: Buffer) -> Optional[np.ndarray]:
+    """
+    WAV PCM (8/16/32 bits, mono o estéreo) -> float32 mono a 16 kHz.
+    Retorna None si no es un WAV PCM (p.ej. WAV float o comprimido).
+    """
+    if len(data) < 12 or bytes(data[:4]) != b"RIFF" or bytes(data[8:12]) != b"WAVE":
+        return None
+    try:
+        with wave.open(io.BytesIO(data)) as wav:
+            width, channels, rate = wav.getsampwidth(), wav.getnchannels(), wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    dtype = _WAV_DTYPES.get(width)
+    if dtype is None:
+        return None
+
+    samples = np.frombuffer(frames, dtype=dtype).astype(np.float32)
+    if width == 1:
+        samples = (samples - 128.0) / 128.0
+    else:
+        samples /= float(2 ** (8 * width - 1))
+    if channels > 1:
+        samples = samples[:len(samples) - len(samples) % channels].reshape(-1, channels).mean(axis=1)
+    return resample(samples, rate)
+
+
+def decode_audio(data: Buffer, audio_format: Optional[str] = None, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodifica audio en memoria a float32 mono a 16 kHz.
+
+    Args:
+        data: Contenido del archivo (WAV, WebM, Opus, OGG, MP3...) o PCM crudo
+        audio_format: ``"pcm"`` para PCM 16-bit mono sin cabecera
+        sample_rate: Frecuencia del PCM crudo
+    """
+    if audio_format == "pcm":
+        return resample(pcm16_to_float(data), sample_rate)
+
+    audio = decode_wav(data)
+    if audio is not None:
+        return audio
+
+    from faster_whisper.audio import decode_audio as av_decode
+    try:
+        return av_decode(io.BytesIO(data), sampling_rate=SAMPLE_RATE)
+    except Exception as e:
+        raise ValueError(f"No se pudo decodificar el audio: {e}") from e
@@ -1,15 +1,77 @@
 from faster_whisper import WhisperModel
 from pathlib import Path
+from typing import Optional, Union
+import numpy as np
+from services.asr.audio_io import decode_audio, SAMPLE_RATE
+from services.asr.vad import split_utterances, VAD_ENABLED
+
+# Ruta, contenido del archivo (WAV/WebM/Opus/MP3 o PCM) o float32 mono a 16 kHz
+AudioInput = Union[str, bytes, bytearray, memoryview, np.ndarray]
 
 class ASREngine:
-    def __init__(self, model_size: str = "small", device: str = "cpu", compute_type: str = "int8"):
+    def __init__(self, model_size: str = "small", device: str = "cpu", compute_type: str = "int8",
+                 cpu_threads: int = 0, num_workers: int = 1):
         # model_size: tiny, base, small, medium, large-v3
-        self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        # cpu_threads: threads por decodificación (0 = los de CTranslate2);
+        # num_workers: decodificaciones simultáneas que admite el modelo
+        self.model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                                  cpu_threads=cpu_threads, num_workers=num_workers)
+
+    def transcribe(self, audio: AudioInput, language: str = "es", audio_format: Optional[str] = None,
+                   sample_rate: int = SAMPLE_RATE) -> dict:
+        """
+        Transcribe audio en memoria (sin archivos temporales).
+        ``audio_format="pcm"`` indica PCM 16-bit mono crudo a ``sample_rate``.
+
+        Con el VAD activo solo llegan a Whisper los enunciados con voz (sin el
+        silencio de los extremos) y un clip sin voz no se decodifica.
+        """
+        if isinstance(audio, str):
+            audio = Path(audio).read_bytes()
+        if isinstance(audio, (bytes, bytearray, memoryview)):
+            audio = decode_audio(audio, audio_format=audio_format, sample_rate=sample_rate)
+        audio = audio.astype(np.float32, copy=False)
+        duration = audio.size / SAMPLE_RATE
+
+        if not VAD_ENABLED:
+            segments, info = self.model.transcribe(audio, language=language, vad_filter=True)
+            text = " ".join(seg.text for seg in segments).strip()
+            return {"text": text, "duration": info.duration}
+
+        texts = []
+        utterances = split_utterances(audio)
+        for utterance in utterances:
+            # El enunciado anterior da contexto al siguiente (mismo hablante, misma consulta)
+            segments, _ = self.model.transcribe(utterance, language=language, vad_filter=False,
+                                                initial_prompt=texts[-1] if texts else None)
+            text = " ".join(seg.text for seg in segments).strip()
+            if text:
+                texts.append(text)
+        return {
+            "text": " ".join(texts),
+            "duration": duration,
+            "speech_duration": sum(u.size for u in utterances) / SAMPLE_RATE
+        }
 
     def transcribe_file(self, audio_path: str, language: str = "es") -> dict:
         path = Path(audio_path)
         if not path.exists():
             raise FileNotFoundError(audio_path)
-        segments, info = self.model.transcribe(str(path), language=language, vad_filter=True)
+        return self.transcribe(str(path), language=language)
+
+    def transcribe_array(self, audio: np.ndarray, language: str = "es", beam_size: int = 5,
+                         initial_prompt: Optional[str] = None) -> dict:
+        """
+        Transcribe audio ya segmentado (float32 mono a 16 kHz), p.ej. un
+        enunciado del streaming: sin VAD ni timestamps, que ya vienen resueltos.
+        """
+        segments, info = self.model.transcribe(
+            audio,
+            language=language,
+            beam_size=beam_size,
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=False,
+            without_timestamps=True
+        )
         text = " ".join(seg.text for seg in segments).strip()
         return {"text": text, "duration": info.duration}
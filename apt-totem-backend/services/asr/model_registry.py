@@ -0,0 +1,171 @@
+"""
+Registro de modelos ASR (faster-whisper) cargados bajo demanda.
+
+Importar la API ya no carga Whisper: cada modelo (tamaño + compute type) se
+carga la primera vez que se pide, o en segundo plano después del arranque
+(``NEOTOTEM_ASR_PRELOAD``), y se pre-calienta con una decodificación de
+audio sintético para que la primera consulta real no pague la reserva de
+memoria de CTranslate2. Cada totem puede usar un modelo distinto
+(``NEOTOTEM_ASR_DEVICE_MODELS``) y cada request puede pedir uno explícito.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Modelo y compute type por defecto
+DEFAULT_MODEL = os.getenv("NEOTOTEM_ASR_MODEL", "small")
+DEFAULT_COMPUTE_TYPE = os.getenv("NEOTOTEM_ASR_COMPUTE_TYPE", "int8")
+# Dispositivo de inferencia (cpu / cuda)
+ASR_DEVICE = os.getenv("NEOTOTEM_ASR_DEVICE", "cpu")
+# Cargar el modelo por defecto en segundo plano al iniciar la app (0 = al primer uso)
+PRELOAD = os.getenv("NEOTOTEM_ASR_PRELOAD", "1") == "1"
+# Decodificaciones simultáneas (ver ``asr_scheduler``) y threads fijos de cada una,
+# para que varias consultas no se disputen los mismos núcleos
+DECODERS = max(1, int(os.getenv("NEOTOTEM_ASR_DECODERS", "1")))
+CPU_THREADS = int(os.getenv("NEOTOTEM_ASR_CPU_THREADS", str(max(1, (os.cpu_count() or 1) // DECODERS))))
+
+MODEL_SIZES = ("tiny", "base", "small", "medium", "large-v3")
+COMPUTE_TYPES = ("int8", "int8_float32", "int16", "float32", "float16", "int8_float16")
+
+# Audio de warm-up: 1 s de tono suave (el silencio puro corta el decoder antes de tiempo)
+_WARMUP_AUDIO = (0.05 * np.sin(2 * np.pi * 220 * np.arange(16000) / 16000)).astype(np.float32)
+
+ModelKey = Tuple[str, str]
+
+
+def _parse_device_models(spec: str) -> Dict[str, ModelKey]:
+    """``"entrada:tiny,caja:base/int8_float32"`` -> ``{"entrada": ("tiny", "int8"), ...}``"""
+    models = {}
+    for item in spec.split(","):
+        device_id, _, model = item.strip().partition(":")
+        size, _, compute_type = model.strip().partition("/")
+        if device_id and size:
+            models[device_id] = (size, compute_type or DEFAULT_COMPUTE_TYPE)
+    return models
+
+
+# Modelo de cada totem (device_id)
+DEVICE_MODELS = _parse_device_models(os.getenv("NEOTOTEM_ASR_DEVICE_MODELS", ""))
+
+
+class ASRModelRegistry:
+    """Motores ASR por (tamaño, compute type), cargados y pre-calentados una vez"""
+
+    def __init__(self, default: ModelKey = (DEFAULT_MODEL, DEFAULT_COMPUTE_TYPE),
+                 device_models: Optional[Dict[str, ModelKey]] = None, device: str = ASR_DEVICE):
+        self.default = default
+        self.device_models = DEVICE_MODELS if device_models is None else device_models
+        self.device = device
+        self._engines: Dict[ModelKey, Any] = {}
+        self._loading: Dict[ModelKey, threading.Event] = {}
+        self._errors: Dict[ModelKey, str] = {}
+        self._load_ms: Dict[ModelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, model: Optional[str] = None, compute_type: Optional[str] = None,
+                device_id: Optional[str] = None) -> ModelKey:
+        """Modelo a usar: el pedido, el del totem o el por defecto"""
+        size, default_compute = self.device_models.get(device_id, self.default)
+        key = (model or size, compute_type or default_compute)
+        if key[0] not in MODEL_SIZES:
+            raise ValueError(f"Modelo ASR no soportado: {key[0]} (opciones: {', '.join(MODEL_SIZES)})")
+        if key[1] not in COMPUTE_TYPES:
+            raise ValueError(f"Compute type no soportado: {key[1]}")
+        return key
+
+    def _create(self, key: ModelKey) -> Any:
+        from services.asr.engine import ASREngine
+        engine = ASREngine(key[0], device=self.device, compute_type=key[1],
+                           cpu_threads=CPU_THREADS, num_workers=DECODERS)
+        engine.transcribe_array(_WARMUP_AUDIO, beam_size=1)
+        return engine
+
+    def get(self, model: Optional[str] = None, compute_type: Optional[str] = None,
+            device_id: Optional[str] = None) -> Any:
+        """
+        Motor listo para usar (bloqueante: carga y pre-calienta si hace falta).
+        Llamadas simultáneas por el mismo modelo esperan a una sola carga.
+        """
+        key = self.resolve(model, compute_type, device_id)
+        while True:
+            with self._lock:
+                engine = self._engines.get(key)
+                if engine is not None:
+                    return engine
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    owner = True
+                else:
+                    owner = False
+            if not owner:
+                loading.wait()
+                with self._lock:
+                    if key in self._engines:
+                        continue
+                    raise RuntimeError(f"No se pudo cargar el modelo ASR {key[0]}: {self._errors.get(key)}")
+            break
+
+        start = time.perf_counter()
+        try:
+            engine = self._create(key)
+        except Exception as e:
+            with self._lock:
+                self._errors[key] = str(e)
+                del self._loading[key]
+            loading.set()
+            raise
+        with self._lock:
+            self._engines[key] = engine
+            self._errors.pop(key, None)
+            self._load_ms[key] = (time.perf_counter() - start) * 1000
+            del self._loading[key]
+        loading.set()
+        return engine
+
+    async def acquire(self, model: Optional[str] = None, compute_type: Optional[str] = None,
+                      device_id: Optional[str] = None) -> Any:
+        """Versión asíncrona de ``get`` (la carga corre en un thread)"""
+        key = self.resolve(model, compute_type, device_id)
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+        return await asyncio.to_thread(self.get, *key)
+
+    async def preload(self, model: Optional[str] = None, compute_type: Optional[str] = None):
+        """Carga un modelo en segundo plano; los errores quedan en ``status()``"""
+        try:
+            await self.acquire(model, compute_type)
+            print(f"✅ Modelo ASR listo: {self.status()['models']}")
+        except Exception as e:
+            print(f"⚠️ No se pudo pre-cargar el modelo ASR: {e}")
+
+    def is_ready(self, model: Optional[str] = None, compute_type: Optional[str] = None,
+                 device_id: Optional[str] = None) -> bool:
+        return self.resolve(model, compute_type, device_id) in self._engines
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            models = {}
+            for key in set(self._engines) | set(self._loading) | set(self._errors):
+                name = f"{key[0]}/{key[1]}"
+                if key in self._engines:
+                    models[name] = {"state": "ready", "load_ms": round(self._load_ms[key], 1)}
+                elif key in self._loading:
+                    models[name] = {"state": "loading"}
+                else:
+                    models[name] = {"state": "error", "error": self._errors[key]}
+            return {
+                "default": f"{self.default[0]}/{self.default[1]}",
+                "ready": self.default in self._engines,
+                "device": self.device,
+                "models": models
+            }
+
+
+# Instancia global del registro de modelos ASR
+asr_models = ASRModelRegistry()
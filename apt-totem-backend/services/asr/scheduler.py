@@ -0,0 +1,147 @@
+"""
+Planificador de inferencia ASR.
+
+Todas las transcripciones (``/asr/transcribe``, ``/asr/voice`` y los finales
+y parciales de ``/asr/stream``) pasan por una cola acotada que alimenta
+``NEOTOTEM_ASR_DECODERS`` decodificadores, cada uno en su propio thread y
+con ``NEOTOTEM_ASR_CPU_THREADS`` threads de CTranslate2. Varias consultas
+simultáneas ya no se reparten los mismos núcleos hasta ponerse lentas todas
+a la vez: esperan su turno con una latencia predecible.
+
+Con la cola profunda se degrada: las consultas sin modelo explícito pasan al
+modelo chico (``NEOTOTEM_ASR_DEGRADE_MODEL``) si está cargado, las parciales
+del streaming se omiten y, con la cola llena, se rechaza (``ASRBusyError``).
+
+faster-whisper 1.0.3 no tiene inferencia por lotes (``BatchedInferencePipeline``
+llegó en 1.1), así que los enunciados cortos no se agrupan en un batch: cada
+uno ocupa un decodificador.
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from services.asr.model_registry import asr_models, ASRModelRegistry, DECODERS
+
+# Consultas esperando decodificador a partir de las cuales se rechaza
+QUEUE_MAX = int(os.getenv("NEOTOTEM_ASR_QUEUE_MAX", "8"))
+# Consultas esperando a partir de las cuales se usa el modelo chico
+DEGRADE_DEPTH = int(os.getenv("NEOTOTEM_ASR_DEGRADE_DEPTH", "3"))
+# Modelo usado al degradar ("" = no degradar)
+DEGRADE_MODEL = os.getenv("NEOTOTEM_ASR_DEGRADE_MODEL", "tiny")
+# Factor de suavizado de la espera promedio
+_WAIT_ALPHA = 0.2
+
+T = TypeVar("T")
+
+
+class ASRBusyError(Exception):
+    """La cola ASR está llena (o una tarea opcional no tiene decodificador libre)"""
+
+
+class ASRScheduler:
+    """Cola acotada y decodificadores con threads fijos para el ASR"""
+
+    def __init__(self, decoders: int = DECODERS, queue_max: int = QUEUE_MAX,
+                 degrade_depth: int = DEGRADE_DEPTH, degrade_model: str = DEGRADE_MODEL,
+                 registry: Optional[ASRModelRegistry] = None):
+        self.decoders = max(1, decoders)
+        self.queue_max = queue_max
+        self.degrade_depth = degrade_depth
+        self.degrade_model = degrade_model
+        self.registry = registry or asr_models
+        self._executor = ThreadPoolExecutor(max_workers=self.decoders, thread_name_prefix="asr-decoder")
+        # Se crea dentro del loop en uso (en Python 3.9 el semáforo queda atado
+        # al loop activo al construirlo, y esta instancia se crea al importar)
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._degrade_preload: Optional[asyncio.Task] = None
+        self.waiting = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.skipped = 0
+        self.degraded = 0
+        self.wait_ms = 0.0
+
+    def _loop_slots(self) -> asyncio.Semaphore:
+        """Semáforo de decodificadores del loop en ejecución"""
+        loop = asyncio.get_running_loop()
+        if self._slots is None or self._slots_loop is not loop:
+            self._slots = asyncio.Semaphore(self.decoders)
+            self._slots_loop = loop
+        return self._slots
+
+    def _choose_model(self, model: Optional[str], compute_type: Optional[str], device_id: Optional[str]):
+        """Modelo de la consulta; con la cola profunda, el chico si ya está cargado"""
+        key = self.registry.resolve(model, compute_type, device_id)
+        if model is not None or not self.degrade_model or self.waiting < self.degrade_depth:
+            return key, False
+        small = self.registry.resolve(self.degrade_model, key[1])
+        if small == key:
+            return key, False
+        if self.registry.is_ready(*small):
+            return small, True
+        # Cargar el modelo chico para la próxima hora punta (no en medio de esta consulta)
+        if self._degrade_preload is None or self._degrade_preload.done():
+            self._degrade_preload = asyncio.create_task(self.registry.preload(*small))
+        return key, False
+
+    async def submit(self, work: Callable[[Any], T], model: Optional[str] = None,
+                     compute_type: Optional[str] = None, device_id: Optional[str] = None,
+                     best_effort: bool = False) -> T:
+        """
+        Ejecuta ``work(engine)`` (bloqueante) en un decodificador.
+
+        ``best_effort``: tareas prescindibles (parciales del streaming) que se
+        omiten con ``ASRBusyError`` si hay que esperar, para no demorar al resto.
+        """
+        if best_effort and (self.waiting or self.running >= self.decoders):
+            self.skipped += 1
+            raise ASRBusyError("ASR ocupado; se omite la tarea opcional")
+        if self.waiting >= self.queue_max:
+            self.rejected += 1
+            raise ASRBusyError(f"ASR saturado ({self.waiting} consultas en espera)")
+
+        key, degraded = self._choose_model(model, compute_type, device_id)
+        self.degraded += degraded
+
+        slots = self._loop_slots()
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.wait_ms += _WAIT_ALPHA * ((time.perf_counter() - queued_at) * 1000 - self.wait_ms)
+
+        self.running += 1
+        try:
+            engine = await self.registry.acquire(*key)
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, work, engine)
+            self.completed += 1
+            return result
+        finally:
+            self.running -= 1
+            slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "decoders": self.decoders,
+            "running": self.running,
+            "waiting": self.waiting,
+            "queue_max": self.queue_max,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "skipped_partials": self.skipped,
+            "degraded": self.degraded,
+            "wait_ms": round(self.wait_ms, 1)
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Instancia global del planificador ASR
+asr_scheduler = ASRScheduler()
@@ -0,0 +1,182 @@
+"""
+Reconocimiento de voz en streaming para ``/asr/stream``.
+
+El totem envía PCM 16-bit mono en trozos pequeños mientras el cliente habla.
+Un VAD por energía separa los enunciados: mientras dura la voz se decodifica
+periódicamente el audio acumulado (hipótesis ``partial``, beam 1) y cuando
+hay silencio suficiente (endpoint) se decodifica el enunciado completo
+(``final``). Los enunciados más largos que la ventana se cortan y se
+continúan en el siguiente, usando el texto anterior como contexto, así el
+costo de cada decodificación queda acotado.
+
+La decodificación es bloqueante; ``StreamingTranscriber`` solo arma los
+trabajos y el WebSocket los ejecuta en ``asr_scheduler``, de a uno, siempre con el
+audio más reciente (las parciales atrasadas se descartan solas).
+"""
+import os
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services.asr.audio_io import SAMPLE_RATE, pcm16_to_float, resample
+from services.asr.vad import EnergyVAD, FRAME_MS as _FRAME_MS
+
+# Intervalo (s) entre hipótesis parciales mientras se habla
+PARTIAL_INTERVAL_S = float(os.getenv("NEOTOTEM_ASR_PARTIAL_INTERVAL_S", "0.8"))
+# Silencio (ms) que cierra un enunciado
+ENDPOINT_MS = float(os.getenv("NEOTOTEM_ASR_ENDPOINT_MS", "700"))
+# Duración máxima (s) de la ventana decodificada; al superarla se emite un final y se continúa
+WINDOW_S = float(os.getenv("NEOTOTEM_ASR_WINDOW_S", "15"))
+
+# Frames de voz seguidos que abren un enunciado (evita disparos por clics)
+_ONSET_FRAMES = 3
+# Audio previo al inicio de la voz que se incluye en el enunciado
+_PREROLL_MS = 300
+# Silencio final (ms) que se conserva al cerrar un enunciado
+_TAIL_MS = 200
+# Audio mínimo (s) para pedir una parcial
+_MIN_PARTIAL_S = 0.5
+
+
+class StreamingTranscriber:
+    """
+    Estado de reconocimiento de una conexión.
+
+    ``push()`` es barato (solo VAD) y se llama en el event loop con cada trozo;
+    ``next_job()`` entrega el siguiente trabajo de decodificación (finales
+    primero) y ``run()`` lo ejecuta con el motor ASR (bloqueante): el de la
+    conexión (``engine``) o el que entregue el planificador en cada llamada.
+    """
+
+    def __init__(self, engine: Any = None, language: str = "es", sample_rate: int = SAMPLE_RATE):
+        self.engine = engine
+        self.language = language
+        self.sample_rate = sample_rate
+        self.vad = EnergyVAD()
+        self._frame = SAMPLE_RATE * _FRAME_MS // 1000
+        self._carry = b""
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._preroll: Deque[np.ndarray] = deque(maxlen=_PREROLL_MS // _FRAME_MS)
+        self._onset: List[np.ndarray] = []
+        self._speech: List[np.ndarray] = []
+        self._speech_samples = 0
+        self._silence_ms = 0.0
+        self._start_sample = 0
+        self._samples = 0
+        self._partial_at = 0
+        self._finals: Deque[Tuple[int, np.ndarray, float, float]] = deque()
+        self.utterance = 0
+        # Texto del último final: contexto para continuar un enunciado cortado
+        self.context = ""
+
+    @property
+    def in_speech(self) -> bool:
+        return bool(self._speech)
+
+    def push(self, pcm: bytes) -> List[Dict[str, Any]]:
+        """Agrega audio; retorna los eventos inmediatos (``speech_start``)"""
+        data = self._carry + pcm
+        usable = len(data) - len(data) % 2
+        self._carry = data[usable:]
+        audio = resample(pcm16_to_float(data[:usable]), self.sample_rate)
+        self._pending = np.concatenate((self._pending, audio)) if self._pending.size else audio
+
+        events = []
+        while self._pending.size >= self._frame:
+            frame, self._pending = self._pending[:self._frame], self._pending[self._frame:]
+            event = self._process_frame(frame)
+            if event:
+                events.append(event)
+        return events
+
+    def _process_frame(self, frame: np.ndarray) -> Optional[Dict[str, Any]]:
+        self._samples += frame.size
+        speech = self.vad.is_speech(frame)
+
+        if not self._speech:
+            if not speech:
+                self._onset.clear()
+                self._preroll.append(frame)
+                return None
+            self._onset.append(frame)
+            if len(self._onset) < _ONSET_FRAMES:
+                return None
+            # Inicio de enunciado: incluir el audio previo para no cortar la primera sílaba
+            self._speech = list(self._preroll) + self._onset
+            self._speech_samples = sum(f.size for f in self._speech)
+            self._start_sample = self._samples - self._speech_samples
+            self._preroll.clear()
+            self._onset = []
+            self._silence_ms = 0.0
+            self._partial_at = 0
+            self.utterance += 1
+            return {"type": "speech_start", "utterance": self.utterance,
+                    "t": round(self._start_sample / SAMPLE_RATE, 2)}
+
+        self._speech.append(frame)
+        self._speech_samples += frame.size
+        self._silence_ms = 0.0 if speech else self._silence_ms + _FRAME_MS
+        if self._silence_ms >= ENDPOINT_MS or self._speech_samples >= WINDOW_S * SAMPLE_RATE:
+            self._close_utterance()
+        return None
+
+    def _close_utterance(self):
+        # Descartar el silencio del endpoint (Whisper tiende a alucinar sobre silencio)
+        trailing = int(max(0.0, self._silence_ms - _TAIL_MS) // _FRAME_MS)
+        audio = np.concatenate(self._speech[:len(self._speech) - trailing])
+        start = self._start_sample / SAMPLE_RATE
+        self._finals.append((self.utterance, audio, start, start + audio.size / SAMPLE_RATE))
+        self._speech = []
+        self._speech_samples = 0
+        self._silence_ms = 0.0
+
+    def flush(self):
+        """Cierra el enunciado en curso (fin del audio del cliente)"""
+        if self._speech:
+            self._close_utterance()
+
+    def next_job(self) -> Optional[Tuple]:
+        """
+        Siguiente decodificación: ``("final", utterance, audio, start, end)`` o
+        ``("partial", utterance, audio)`` con el audio actual del enunciado.
+        """
+        if self._finals:
+            return ("final",) + self._finals.popleft()
+        if self._speech and self._speech_samples >= _MIN_PARTIAL_S * SAMPLE_RATE and \
+                self._speech_samples - self._partial_at >= PARTIAL_INTERVAL_S * SAMPLE_RATE:
+            self._partial_at = self._speech_samples
+            return ("partial", self.utterance, np.concatenate(self._speech))
+        return None
+
+    def run(self, job: Tuple, engine: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Ejecuta un trabajo de ``next_job`` (bloqueante) y retorna el evento a
+        enviar. ``engine`` reemplaza al motor de la conexión (p.ej. el que
+        asignó el planificador, quizás el degradado).
+        """
+        kind, utterance, audio = job[:3]
+        start = time.perf_counter()
+        final = kind == "final"
+        result = (engine or self.engine).transcribe_array(
+            audio,
+            language=self.language,
+            beam_size=5 if final else 1,
+            initial_prompt=self.context or None
+        )
+        text = result["text"]
+        event = {
+            "type": kind,
+            "utterance": utterance,
+            "text": text,
+            "decode_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+        if final:
+            if not text:
+                return None  # Ruido que pasó el VAD
+            event["start"], event["end"] = round(job[3], 2), round(job[4], 2)
+            self.context = text
+        else:
+            event["audio_s"] = round(audio.size / SAMPLE_RATE, 2)
+        return event
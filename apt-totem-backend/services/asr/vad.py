@@ -0,0 +1,100 @@
+"""
+Detección de voz (VAD) por energía para el ASR.
+
+``EnergyVAD`` clasifica frames de a uno (streaming). ``speech_segments`` y
+``split_utterances`` procesan una grabación completa de una vez: recortan el
+silencio y el ruido del local antes y después de la pregunta, separan los
+enunciados y descartan los clips sin voz antes de llegar a ``WhisperModel``,
+que decodifica solo el audio con voz.
+"""
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+from services.asr.audio_io import SAMPLE_RATE
+
+# Recortar silencio y segmentar antes de Whisper (0 = usar el VAD interno de faster-whisper)
+VAD_ENABLED = os.getenv("NEOTOTEM_ASR_VAD", "1") == "1"
+# Energía mínima (RMS, 0-1) para considerar voz
+VAD_MIN_RMS = float(os.getenv("NEOTOTEM_ASR_VAD_MIN_RMS", "0.01"))
+# Veces sobre el piso de ruido que debe estar un frame para ser voz
+VAD_RATIO = 3.0
+# Duración máxima de un enunciado (la ventana de Whisper)
+MAX_UTTERANCE_S = 30.0
+
+FRAME_MS = 30
+# Voz mínima que cuenta como enunciado (descarta clics y golpes)
+_MIN_SPEECH_MS = 250
+# Silencio que separa dos enunciados (pausas más cortas quedan dentro)
+_MIN_SILENCE_MS = 500
+# Margen agregado a cada lado del enunciado para no cortar sílabas
+_PAD_MS = 200
+
+
+class EnergyVAD:
+    """VAD por energía con piso de ruido adaptativo"""
+
+    def __init__(self, min_rms: float = VAD_MIN_RMS, ratio: float = VAD_RATIO):
+        self.min_rms = min_rms
+        self.ratio = ratio
+        self.noise_floor = min_rms / ratio
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(frame * frame))) if frame.size else 0.0
+        speech = rms > max(self.min_rms, self.noise_floor * self.ratio)
+        if not speech:
+            # El piso sigue al ruido ambiente solo en los frames sin voz
+            self.noise_floor += 0.05 * (rms - self.noise_floor)
+        return speech
+
+
+def frame_rms(audio: np.ndarray, frame: int) -> np.ndarray:
+    """Energía RMS de cada frame completo de ``frame`` muestras"""
+    count = audio.size // frame
+    frames = audio[:count * frame].reshape(count, frame)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def speech_segments(audio: np.ndarray, min_rms: float = VAD_MIN_RMS,
+                    max_utterance_s: float = MAX_UTTERANCE_S) -> List[Tuple[int, int]]:
+    """
+    Enunciados de una grabación (float32 a 16 kHz) como rangos (inicio, fin) en muestras.
+
+    El piso de ruido es el percentil 10 de la energía de la grabación; la voz
+    tiene que superarlo ``VAD_RATIO`` veces. Un ruido estacionario (sin la
+    variación de energía de la voz) no produce enunciados.
+    """
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    rms = frame_rms(audio, frame)
+    if rms.size == 0:
+        return []
+    threshold = max(min_rms, float(np.percentile(rms, 10)) * VAD_RATIO)
+    speech = (rms > threshold).astype(np.int8)
+
+    # Tramos de frames con voz: [inicio, fin)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], speech, [0]))))
+    runs: List[List[int]] = []
+    for start, end in zip(edges[::2], edges[1::2]):
+        if runs and (start - runs[-1][1]) * FRAME_MS < _MIN_SILENCE_MS:
+            runs[-1][1] = end
+        else:
+            runs.append([start, end])
+
+    pad = _PAD_MS // FRAME_MS
+    max_samples = int(max_utterance_s * SAMPLE_RATE)
+    segments = []
+    for start, end in runs:
+        if (end - start) * FRAME_MS < _MIN_SPEECH_MS:
+            continue
+        first = int(max(0, start - pad) * frame)
+        last = int(min(audio.size, (end + pad) * frame))
+        # Los enunciados más largos que la ventana de Whisper se cortan en partes
+        for offset in range(first, last, max_samples):
+            segments.append((offset, min(last, offset + max_samples)))
+    return segments
+
+
+def split_utterances(audio: np.ndarray, **kwargs) -> List[np.ndarray]:
+    """Audio de cada enunciado (lista vacía si la grabación no tiene voz)"""
+    return [audio[start:end] for start, end in speech_segments(audio, **kwargs)]
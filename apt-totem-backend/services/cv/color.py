@@ -1,6 +1,7 @@
 import cv2 as cv
 import numpy as np
-from collections import Counter
+from .dominant_color import dominant_colors
+from .color_lut import ColorLUT
 
 # nombres de color expandidos en HSV (rangos aproximados)
 COLOR_MAP = {
@@ -46,29 +47,27 @@ def _dominant_color_hsv(bgr_img: np.ndarray, k: int = 3) -> np.ndarray:
     # downscale para velocidad
     img = cv.resize(bgr_img, (0,0), fx=0.5, fy=0.5, interpolation=cv.INTER_AREA)
     hsv = cv.cvtColor(img, cv.COLOR_BGR2HSV)
-    # kmeans sobre HSV
-    Z = hsv.reshape((-1,3)).astype(np.float32)
-    criteria = (cv.TERM_CRITERIA_EPS + cv.TERM_CRITERIA_MAX_ITER, 20, 1.0)
-    _, labels, centers = cv.kmeans(Z, k, None, criteria, 5, cv.KMEANS_PP_CENTERS)
-    counts = Counter(labels.flatten())
-    idx = counts.most_common(1)[0][0]
-    return centers[idx].astype(np.uint8)  # (H,S,V)
+    # clusters sobre HSV; el primero es el más frecuente
+    centers, _ = dominant_colors(hsv, k=k)
+    return centers[0].round().astype(np.uint8)  # (H,S,V)
 
 def _hsv_to_hex(hsv):
     hsv_1 = np.uint8([[hsv]])
     bgr = cv.cvtColor(hsv_1, cv.COLOR_HSV2BGR)[0,0].astype(int)
     return "#{:02x}{:02x}{:02x}".format(bgr[2], bgr[1], bgr[0])  # R,G,B
 
+# gris/blanco/negro (baja saturación) antes que los tonos
+NEUTRAL_RULES = [
+    ("negro", [(0, 0, 0), (255, 39, 49)]),
+    ("blanco", [(0, 0, 201), (255, 39, 255)]),
+    ("gris", [(0, 0, 50), (255, 39, 200)]),
+]
+
+# tabla HSV -> nombre compilada al importar
+HSV_COLOR_LUT = ColorLUT(NEUTRAL_RULES + list(COLOR_MAP.items()), aliases={"rojo2": "rojo"})
+
 def _map_color_name(hsv):
-    H,S,V = int(hsv[0]), int(hsv[1]), int(hsv[2])
-    # gris/blanco/negro
-    if S < 40:
-        return "negro" if V < 50 else ("blanco" if V > 200 else "gris")
-    for name, (low, high) in COLOR_MAP.items():
-        lH,lS,lV = low; hH,hS,hV = high
-        if lH <= H <= hH and lS <= S <= hS and lV <= V <= hV:
-            return "rojo" if name=="rojo2" else name
-    return "desconocido"
+    return HSV_COLOR_LUT.name(hsv[0], hsv[1], hsv[2])
 
 def dominant_color_name_and_hex(bgr_img: np.ndarray) -> dict:
     hsv = _dominant_color_hsv(bgr_img, k=3)
@@ -0,0 +1,76 @@
+import numpy as np
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+Rule = Tuple[str, Tuple[Sequence[int], Sequence[int]]]
+
+
+class ColorLUT:
+    """
+    Tabla 3D compilada desde reglas de caja ordenadas ``(nombre, (bajo, alto))``
+    (la primera regla que contiene al color gana, límites inclusivos), para
+    RGB, HSV o cualquier espacio de 3 canales uint8.
+
+    Cada canal se cuantiza en los intervalos que delimitan las propias reglas
+    (no en una grilla fija), así la tabla queda chica (~30 niveles por canal)
+    y da exactamente el mismo nombre que recorrer las reglas. Un lookup son
+    tres índices; ``label`` etiqueta imágenes o máscaras completas.
+    """
+
+    def __init__(self, rules: Iterable[Rule], default: str = "desconocido",
+                 aliases: Optional[Dict[str, str]] = None):
+        aliases = aliases or {}
+        rules = [(aliases.get(name, name), low, high) for name, (low, high) in rules]
+
+        self.names = [default]
+        for name, _, _ in rules:
+            if name not in self.names:
+                self.names.append(name)
+
+        # bordes de intervalo por canal: todos los valores de un intervalo caen en las mismas reglas
+        edges = []
+        for c in range(3):
+            cuts = {0}
+            for _, low, high in rules:
+                cuts.add(int(low[c]))
+                if high[c] < 255:
+                    cuts.add(int(high[c]) + 1)
+            edges.append(np.array(sorted(cuts)))
+        self._index = [(np.searchsorted(e, np.arange(256), side="right") - 1).astype(np.intp) for e in edges]
+
+        table = np.zeros([len(e) for e in edges], dtype=np.int16)
+        # de la última a la primera regla, así la primera queda escrita encima
+        for name, low, high in reversed(rules):
+            inside = [(e >= low[c]) & (e <= high[c]) for c, e in enumerate(edges)]
+            box = np.ix_(*inside)
+            table[box] = self.names.index(name)
+        self._table = table
+
+    def name(self, c0: int, c1: int, c2: int) -> str:
+        """Nombre de un color (píxel o centroide)"""
+        i0, i1, i2 = self._index
+        return self.names[self._table[i0[int(c0)], i1[int(c1)], i2[int(c2)]]]
+
+    def label(self, image: np.ndarray) -> np.ndarray:
+        """Índice de nombre (en ``names``) de cada píxel de una imagen uint8 (..., 3)"""
+        i0, i1, i2 = self._index
+        return self._table[i0[image[..., 0]], i1[image[..., 1]], i2[image[..., 2]]]
+
+    def histogram(self, image: np.ndarray, mask: Optional[np.ndarray] = None, top: int = 0) -> Dict[str, float]:
+        """
+        Fracción de píxeles por nombre de color (de mayor a menor).
+
+        Args:
+            mask: Solo cuenta los píxeles con máscara > 0
+            top: Si es > 0, solo los ``top`` nombres más frecuentes
+        """
+        labels = self.label(image)
+        if mask is not None:
+            labels = labels[mask > 0]
+        labels = labels.ravel()
+        if labels.size == 0:
+            return {}
+        counts = np.bincount(labels, minlength=len(self.names))
+        order = [i for i in np.argsort(counts, kind="stable")[::-1] if counts[i] > 0]
+        if top > 0:
+            order = order[:top]
+        return {self.names[i]: round(float(counts[i]) / labels.size, 3) for i in order}
@@ -0,0 +1,70 @@
+import numpy as np
+from typing import Optional, Tuple
+
+# niveles por canal del histograma cuantizado (16 -> 4096 celdas)
+DEFAULT_BINS = 16
+# iteraciones máximas del k-means sobre las celdas
+DEFAULT_MAX_ITER = 10
+
+
+def _color_histogram(pixels: np.ndarray, bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Celdas no vacías del histograma: (centroide real de cada celda, cantidad de píxeles)"""
+    shift = 8 - int(np.log2(bins))
+    q = (pixels >> shift).astype(np.int32)
+    idx = (q[:, 0] * bins + q[:, 1]) * bins + q[:, 2]
+    counts = np.bincount(idx, minlength=bins ** 3)
+    used = np.flatnonzero(counts)
+    sums = np.stack([np.bincount(idx, weights=pixels[:, c], minlength=bins ** 3)[used] for c in range(3)], axis=1)
+    return sums / counts[used, None], counts[used].astype(np.float64)
+
+
+def _init_centers(points: np.ndarray, weights: np.ndarray, k: int) -> np.ndarray:
+    """Semillas deterministas: la celda más poblada y luego la más pesada y lejana (k-means++ sin azar)"""
+    centers = [points[np.argmax(weights)]]
+    dist = np.sum((points - centers[0]) ** 2, axis=1)
+    for _ in range(1, k):
+        score = weights * dist
+        if score.max() <= 0:
+            break
+        centers.append(points[np.argmax(score)])
+        dist = np.minimum(dist, np.sum((points - centers[-1]) ** 2, axis=1))
+    return np.array(centers)
+
+
+def dominant_colors(image: np.ndarray, k: int = 3, mask: Optional[np.ndarray] = None,
+                    bins: int = DEFAULT_BINS, max_iter: int = DEFAULT_MAX_ITER) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Colores dominantes de una imagen (o lista Nx3 de píxeles) uint8 en cualquier
+    espacio de 3 canales (BGR, RGB, HSV); los centros quedan en el mismo espacio.
+
+    Los píxeles se cuentan en un histograma cuantizado y el k-means (ponderado)
+    corre sobre las celdas no vacías, no sobre los píxeles, con un máximo de
+    ``max_iter`` iteraciones: el costo casi no depende del tamaño de la región.
+
+    Returns:
+        (centros float (n, 3), píxeles por centro (n,)) ordenados de mayor a menor; n <= k
+    """
+    pixels = image.reshape(-1, 3) if mask is None else image[mask > 0]
+    if len(pixels) == 0:
+        return np.zeros((0, 3)), np.zeros(0, dtype=np.int64)
+
+    points, weights = _color_histogram(pixels, bins)
+    centers = _init_centers(points, weights, k)
+
+    for _ in range(max_iter):
+        labels = np.argmin(((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+        totals = np.bincount(labels, weights=weights, minlength=len(centers))
+        updated = centers.copy()
+        for c in range(3):
+            sums = np.bincount(labels, weights=weights * points[:, c], minlength=len(centers))
+            updated[totals > 0, c] = sums[totals > 0] / totals[totals > 0]
+        converged = np.allclose(updated, centers, atol=0.5)
+        centers = updated
+        if converged:
+            break
+
+    labels = np.argmin(((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+    counts = np.bincount(labels, weights=weights, minlength=len(centers)).round().astype(np.int64)
+    order = np.argsort(counts, kind="stable")[::-1]
+    order = order[counts[order] > 0]
+    return centers[order], counts[order]
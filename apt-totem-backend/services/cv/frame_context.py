@@ -0,0 +1,81 @@
+import cv2 as cv
+import numpy as np
+from typing import Dict, Optional, Tuple, Union
+
+# conversión a cada plano según el plano de origen disponible
+_CONVERSIONS = {
+    ("bgr", "rgb"): cv.COLOR_BGR2RGB,
+    ("rgb", "bgr"): cv.COLOR_RGB2BGR,
+    ("bgr", "gray"): cv.COLOR_BGR2GRAY,
+    ("rgb", "gray"): cv.COLOR_RGB2GRAY,
+}
+
+
+class FrameContext:
+    """
+    Planos de un frame calculados una sola vez y bajo demanda.
+
+    Los detectores leen recortes (vistas, sin copia) de ``rgb``/``gray``
+    en lugar de recortar y convertir cada uno por su cuenta. Las conversiones
+    de color son por píxel, así que recortar el plano completo da lo mismo
+    que convertir el recorte; operaciones dependientes de la región (p.ej.
+    ``equalizeHist``) se siguen aplicando sobre el recorte.
+    """
+
+    def __init__(self, image: np.ndarray, order: str = "bgr"):
+        self._planes: Dict[str, np.ndarray] = {order: image}
+        self._source = order
+        self._resized: Dict[Tuple[int, int], np.ndarray] = {}
+        self._parent: Optional["FrameContext"] = None
+        self._box = (0, 0, image.shape[1], image.shape[0])
+        self.height, self.width = image.shape[:2]
+
+    @classmethod
+    def wrap(cls, image: Union["FrameContext", np.ndarray], order: str = "rgb") -> "FrameContext":
+        """Acepta un contexto existente o un ndarray (``order`` indica sus canales)"""
+        return image if isinstance(image, cls) else cls(image, order)
+
+    def crop(self, x1: int, y1: int, x2: int, y2: int) -> "FrameContext":
+        """Sub-contexto de una región; sus planos son vistas de los del frame completo"""
+        child = FrameContext(self._planes[self._source][y1:y2, x1:x2], self._source)
+        child._parent = self
+        child._box = (x1, y1, x2, y2)
+        return child
+
+    @property
+    def box(self) -> Tuple[int, int, int, int]:
+        """Región (x1, y1, x2, y2) del contexto dentro del frame padre"""
+        return self._box
+
+    def _plane(self, name: str) -> np.ndarray:
+        plane = self._planes.get(name)
+        if plane is None and self._parent is not None:
+            x1, y1, x2, y2 = self._box
+            plane = self._planes[name] = self._parent._plane(name)[y1:y2, x1:x2]
+        if plane is None:
+            source = "bgr" if "bgr" in self._planes else self._source
+            plane = self._planes[name] = cv.cvtColor(self._planes[source], _CONVERSIONS[(source, name)])
+        return plane
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.height, self.width
+
+    @property
+    def bgr(self) -> np.ndarray:
+        return self._plane("bgr")
+
+    @property
+    def rgb(self) -> np.ndarray:
+        return self._plane("rgb")
+
+    @property
+    def gray(self) -> np.ndarray:
+        return self._plane("gray")
+
+    def resized(self, size: Tuple[int, int]) -> np.ndarray:
+        """Frame BGR redimensionado a ``size`` (w, h), cacheado por tamaño"""
+        small = self._resized.get(size)
+        if small is None:
+            small = self._resized[size] = cv.resize(self.bgr, size)
+        return small
@@ -0,0 +1,104 @@
+import struct
+import cv2 as cv
+import numpy as np
+from typing import Optional, Tuple, Union
+
+# lado máximo con el que trabajan los analizadores
+MAX_ANALYSIS_DIMENSION = 800
+
+# flags de decodificación reducida por factor (el JPEG se decodifica directo a 1/N)
+_REDUCED_COLOR_FLAGS = {
+    1: cv.IMREAD_COLOR,
+    2: cv.IMREAD_REDUCED_COLOR_2,
+    4: cv.IMREAD_REDUCED_COLOR_4,
+    8: cv.IMREAD_REDUCED_COLOR_8,
+}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# marcadores SOF de JPEG (todos los C0-CF salvo DHT, JPG y DAC)
+_JPEG_SOF = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def image_size(img_bytes: Buffer) -> Optional[Tuple[str, int, int]]:
+    """
+    Formato y tamaño (formato, ancho, alto) leídos de la cabecera, sin decodificar.
+
+    Recorre los segmentos del JPEG hasta el SOF, o lee el IHDR del PNG.
+    Retorna None si no reconoce el formato.
+    """
+    data = memoryview(img_bytes)
+    if len(data) >= 24 and data[:8] == _PNG_SIGNATURE:
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF:  # relleno
+            pos += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7:  # sin longitud
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):  # fin de imagen / inicio de scan sin SOF
+            return None
+        length = struct.unpack(">H", data[pos + 2:pos + 4])[0]
+        if marker in _JPEG_SOF:
+            if pos + 9 > len(data):
+                return None
+            height, width = struct.unpack(">HH", data[pos + 5:pos + 9])
+            return "jpeg", width, height
+        pos += 2 + length
+    return None
+
+
+def reduction_for(img_bytes: Buffer, max_dimension: int) -> int:
+    """
+    Mayor factor de decodificación reducida (2, 4 u 8) que deja la imagen aún
+    en ``max_dimension`` o más; así el resize posterior es más chico o se omite.
+    Solo para JPEG (el decodificador escala en el dominio DCT); PNG usa 1.
+    """
+    header = image_size(img_bytes)
+    if header is None or header[0] != "jpeg":
+        return 1
+    longest = max(header[1], header[2])
+    for reduce in (8, 4, 2):
+        if longest / reduce >= max_dimension:
+            return reduce
+    return 1
+
+
+def decode_image(img_bytes: Buffer, reduce: int = 1, max_dimension: Optional[int] = None) -> Optional[np.ndarray]:
+    """
+    Decodifica un JPEG/PNG a BGR sin copiar el buffer de entrada.
+
+    Args:
+        reduce: 1, 2, 4 u 8; con 2+ el decodificador entrega la imagen a 1/N
+                de resolución (mucho más barato que decodificar y reducir)
+        max_dimension: Tamaño objetivo del análisis; si se entrega, el factor
+                       se elige leyendo la cabecera (ver ``reduction_for``)
+
+    Returns:
+        Imagen BGR o None si los bytes no son una imagen válida
+    """
+    if not img_bytes:
+        return None
+    if max_dimension:
+        reduce = reduction_for(img_bytes, max_dimension)
+    buf = np.frombuffer(img_bytes, np.uint8)
+    return cv.imdecode(buf, _REDUCED_COLOR_FLAGS.get(reduce, cv.IMREAD_COLOR))
+
+
+def limit_size(image: np.ndarray, max_dimension: int = MAX_ANALYSIS_DIMENSION) -> np.ndarray:
+    """Reduce la imagen (INTER_AREA) si algún lado supera ``max_dimension``"""
+    height, width = image.shape[:2]
+    if max(height, width) <= max_dimension:
+        return image
+    scale = max_dimension / max(height, width)
+    return cv.resize(image, (int(width * scale), int(height * scale)), interpolation=cv.INTER_AREA)
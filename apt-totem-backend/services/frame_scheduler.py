@@ -0,0 +1,70 @@
+"""
+Planificador "latest-frame-wins" para streams de cámara por WebSocket.
+
+Cuando un totem envía frames más rápido de lo que el pipeline puede
+analizarlos, solo se conserva el frame pendiente más reciente y los
+anteriores se descartan, de modo que la latencia extremo a extremo queda
+acotada en lugar de crecer sin límite.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+
+class LatestFrameScheduler:
+    """Mantiene como máximo un frame pendiente por conexión"""
+
+    def __init__(self):
+        self._pending: Optional[Any] = None
+        self._pending_since = 0.0
+        self._event = asyncio.Event()
+        self._closed = False
+        self.received = 0
+        self.processed = 0
+        self.dropped = 0
+        self.last_wait_ms = 0.0
+
+    def submit(self, frame: Any):
+        """Encola un frame reemplazando (y descartando) el pendiente si lo hay"""
+        self.received += 1
+        if self._pending is not None:
+            self.dropped += 1
+        self._pending = frame
+        self._pending_since = time.monotonic()
+        self._event.set()
+
+    @property
+    def has_pending(self) -> bool:
+        return self._pending is not None
+
+    def take(self) -> Optional[Any]:
+        """Retira el frame pendiente sin esperar (None si no hay)"""
+        if self._pending is None:
+            return None
+        frame, self._pending = self._pending, None
+        self.last_wait_ms = (time.monotonic() - self._pending_since) * 1000
+        self.processed += 1
+        return frame
+
+    async def next(self) -> Optional[Any]:
+        """Espera el siguiente frame a procesar. Retorna None al cerrar."""
+        while self._pending is None:
+            if self._closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+
+        return self.take()
+
+    def close(self):
+        self._closed = True
+        self._pending = None
+        self._event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "queue_wait_ms": round(self.last_wait_ms, 1)
+        }
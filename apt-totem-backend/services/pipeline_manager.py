@@ -0,0 +1,320 @@
+"""
+Gestor de pipelines por cámara para servir varios totems desde un backend.
+
+Cada cámara (``camera_id``) tiene su propio planificador latest-frame-wins,
+su compuerta de cambio y su analizador con estado en los workers (clave
+``cam-<id>``), compartidos por todas las conexiones que envían esa cámara.
+Al registrarse, la cámara queda fija en el worker de visión con menos peso
+asignado (su analizador vive ahí). Los cupos de análisis se reparten entre
+las cámaras con frames pendientes por round-robin ponderado; cada cámara
+tiene a lo más un frame en curso y cada worker analiza a lo más un frame a
+la vez, así dos cámaras no se encolan en el mismo worker mientras otro está
+libre y una entrada con mucho tráfico solo descarta sus propios frames.
+
+Con cada resultado el servidor envía ``capture_hints`` (fps, resolución y
+calidad JPEG recomendados) calculados con la latencia y la espera medidas de
+la cámara, para que el totem ajuste su captura antes de que la cola crezca.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from services.frame_scheduler import LatestFrameScheduler
+from services.ai.frame_gate import FrameChangeGate
+from services.ai.stream_analyzer import STREAM_TRACKING_ENABLED
+from services.ai.cv_workers import cv_worker_pool
+from services.cv.image_io import MAX_ANALYSIS_DIMENSION
+
+
+def _parse_weights(spec: str) -> Dict[str, int]:
+    """``"entrada:3,caja:1"`` -> ``{"entrada": 3, "caja": 1}``"""
+    weights = {}
+    for item in spec.split(","):
+        camera_id, _, weight = item.strip().partition(":")
+        if camera_id and weight.strip().isdigit():
+            weights[camera_id] = max(1, int(weight))
+    return weights
+
+
+# Peso de cada cámara en el reparto de cupos (default 1)
+CAMERA_WEIGHTS = _parse_weights(os.getenv("NEOTOTEM_CAMERA_WEIGHTS", ""))
+# Análisis simultáneos entre todas las cámaras (0 = uno por worker de visión)
+PIPELINE_SLOTS = int(os.getenv("NEOTOTEM_PIPELINE_SLOTS", "0"))
+# Ventana (s) usada para calcular los fps de cada cámara
+STATS_WINDOW_S = float(os.getenv("NEOTOTEM_CAMERA_STATS_WINDOW_S", "10"))
+# Factor de suavizado de la latencia promedio
+_LATENCY_ALPHA = 0.2
+
+# Latencia extremo a extremo objetivo (llegada del frame -> respuesta)
+TARGET_LATENCY_MS = float(os.getenv("NEOTOTEM_TARGET_LATENCY_MS", "500"))
+# Rango de fps recomendados al totem
+CAPTURE_MAX_FPS = float(os.getenv("NEOTOTEM_CAPTURE_MAX_FPS", "15"))
+CAPTURE_MIN_FPS = float(os.getenv("NEOTOTEM_CAPTURE_MIN_FPS", "1"))
+# Niveles de captura (lado máximo, calidad JPEG); el nivel 0 ya es el tamaño de análisis,
+# enviar más resolución solo cuesta red y decodificación
+CAPTURE_LEVELS = [
+    (MAX_ANALYSIS_DIMENSION, 85),
+    (640, 75),
+    (480, 65),
+    (320, 55),
+]
+# Segundos mínimos entre cambios de nivel (histéresis)
+_LEVEL_COOLDOWN_S = 2.0
+# Margen sobre la capacidad medida al recomendar fps
+_FPS_HEADROOM = 0.9
+
+
+class CameraPipeline:
+    """Estado de una cámara: frame pendiente, compuerta, analizador y métricas"""
+
+    def __init__(self, camera_id: str, weight: int = 1, shard: Optional[int] = None):
+        self.camera_id = camera_id
+        self.weight = max(1, int(weight))
+        # Worker de visión asignado (None en modo thread)
+        self.shard = shard
+        # Analizador con tracking en los workers (vive en el shard de la cámara)
+        self.stream_key = f"cam-{camera_id}" if STREAM_TRACKING_ENABLED else None
+        self.scheduler = LatestFrameScheduler()
+        self.gate = FrameChangeGate()
+        self.connections = 0
+        self.busy = False
+        # Crédito del round-robin ponderado suave
+        self.credit = 0
+        self._completed = deque()
+        self.latency_ms = 0.0
+        self.last_latency_ms = 0.0
+        self.service_ms = 0.0
+        self.errors = 0
+        # Nivel de captura recomendado (índice en CAPTURE_LEVELS)
+        self.level = 0
+        self._level_changed_at = 0.0
+
+    def record(self, submitted_at: float, started_at: float, ok: bool = True):
+        """
+        Registra un frame terminado: latencia desde que llegó hasta que se
+        respondió y tiempo de servicio (sin la espera en cola)
+        """
+        now = time.monotonic()
+        latency = (now - submitted_at) * 1000
+        service = (now - started_at) * 1000
+        self.last_latency_ms = latency
+        if self._completed:
+            self.latency_ms += _LATENCY_ALPHA * (latency - self.latency_ms)
+            self.service_ms += _LATENCY_ALPHA * (service - self.service_ms)
+        else:
+            self.latency_ms, self.service_ms = latency, service
+        self._completed.append(now)
+        while self._completed and now - self._completed[0] > STATS_WINDOW_S:
+            self._completed.popleft()
+        if not ok:
+            self.errors += 1
+        self._update_level(now)
+
+    def _update_level(self, now: float):
+        """Baja la captura si la latencia supera el objetivo y la recupera con holgura"""
+        if now - self._level_changed_at < _LEVEL_COOLDOWN_S:
+            return
+        if self.latency_ms > TARGET_LATENCY_MS and self.level < len(CAPTURE_LEVELS) - 1:
+            self.level += 1
+        elif self.latency_ms < TARGET_LATENCY_MS * 0.5 and self.level > 0:
+            self.level -= 1
+        else:
+            return
+        self._level_changed_at = now
+
+    @property
+    def streaming(self) -> bool:
+        """True si la cámara envió frames dentro de la ventana de métricas"""
+        recent = bool(self._completed) and time.monotonic() - self._completed[-1] <= STATS_WINDOW_S
+        return self.busy or self.scheduler.has_pending or recent
+
+    def fps(self) -> float:
+        if len(self._completed) < 2:
+            return 0.0
+        span = self._completed[-1] - self._completed[0]
+        return (len(self._completed) - 1) / span if span > 0 else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "camera_id": self.camera_id,
+            "weight": self.weight,
+            "shard": self.shard,
+            "connections": self.connections,
+            **self.scheduler.stats(),
+            "fps": round(self.fps(), 2),
+            "latency_ms": round(self.latency_ms, 1),
+            "last_latency_ms": round(self.last_latency_ms, 1),
+            "service_ms": round(self.service_ms, 1),
+            "errors": self.errors,
+            "capture_level": self.level,
+            "gate": self.gate.stats()
+        }
+
+
+FrameHandler = Callable[[CameraPipeline, Any], Awaitable[None]]
+
+
+class PipelineManager:
+    """Registro de cámaras y reparto de los cupos de análisis entre ellas"""
+
+    def __init__(self, slots: int = PIPELINE_SLOTS, weights: Optional[Dict[str, int]] = None,
+                 shards: Optional[int] = None):
+        self.slots = slots
+        self.weights = CAMERA_WEIGHTS if weights is None else weights
+        # Workers de visión (None = los del pool global)
+        self.shards = shards
+        self._cameras: Dict[str, CameraPipeline] = {}
+        self._running = 0
+        self._busy_shards: Set[int] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    def shard_count(self) -> int:
+        return self.shards if self.shards is not None else cv_worker_pool.shard_count()
+
+    def capacity(self) -> int:
+        if self.slots > 0:
+            return self.slots
+        return self.shard_count() or cv_worker_pool.parallelism()
+
+    def _assign_shard(self) -> Optional[int]:
+        """Shard con menos peso de cámaras asignado (None en modo thread)"""
+        count = self.shard_count()
+        if count == 0:
+            return None
+        loads = [0] * count
+        for camera in self._cameras.values():
+            if camera.shard is not None and camera.shard < count:
+                loads[camera.shard] += camera.weight
+        return min(range(count), key=loads.__getitem__)
+
+    def attach(self, camera_id: str, weight: Optional[int] = None) -> CameraPipeline:
+        """Registra una conexión que envía frames de ``camera_id`` (crea el pipeline si no existe)"""
+        camera = self._cameras.get(camera_id)
+        if camera is None:
+            camera = CameraPipeline(camera_id, self.weights.get(camera_id, 1))
+            camera.shard = self._assign_shard()
+            self._cameras[camera_id] = camera
+        if weight is not None:
+            camera.weight = max(1, int(weight))
+        camera.connections += 1
+        return camera
+
+    def detach(self, camera_id: str) -> Optional[CameraPipeline]:
+        """
+        Quita una conexión de la cámara. Si era la última, descarta el frame
+        pendiente y retorna el pipeline eliminado (para liberar su analizador).
+        """
+        camera = self._cameras.get(camera_id)
+        if camera is None:
+            return None
+        camera.connections -= 1
+        if camera.connections > 0:
+            return None
+        camera.scheduler.close()
+        del self._cameras[camera_id]
+        return camera
+
+    def get(self, camera_id: str) -> Optional[CameraPipeline]:
+        return self._cameras.get(camera_id)
+
+    def submit(self, camera_id: str, handler: FrameHandler, message: Any):
+        """
+        Encola un frame de la cámara (reemplaza al pendiente, si lo hay) y lo
+        despacha apenas haya un cupo y sea su turno. ``handler(camera, message)``
+        analiza el frame y envía el resultado.
+        """
+        camera = self._cameras[camera_id]
+        camera.scheduler.submit((handler, message, time.monotonic()))
+        self._dispatch()
+
+    def _next_camera(self) -> Optional[CameraPipeline]:
+        """
+        Round-robin ponderado suave (como nginx) entre cámaras libres con frame
+        pendiente cuyo shard no está analizando otro frame
+        """
+        ready = [c for c in self._cameras.values()
+                 if not c.busy and c.scheduler.has_pending and c.shard not in self._busy_shards]
+        if not ready:
+            return None
+        total = sum(c.weight for c in ready)
+        for camera in ready:
+            camera.credit += camera.weight
+        chosen = max(ready, key=lambda c: c.credit)
+        chosen.credit -= total
+        return chosen
+
+    def _dispatch(self):
+        while self._running < self.capacity():
+            camera = self._next_camera()
+            if camera is None:
+                return
+            handler, message, submitted_at = camera.scheduler.take()
+            camera.busy = True
+            if camera.shard is not None:
+                self._busy_shards.add(camera.shard)
+            self._running += 1
+            task = asyncio.create_task(self._run(camera, handler, message, submitted_at, time.monotonic()))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, camera: CameraPipeline, handler: FrameHandler, message: Any,
+                   submitted_at: float, started_at: float):
+        ok = False
+        try:
+            await handler(camera, message)
+            ok = True
+        except Exception as e:
+            print(f"⚠️ Error procesando frame de la cámara {camera.camera_id}: {e}")
+        finally:
+            camera.record(submitted_at, started_at, ok)
+            camera.busy = False
+            self._busy_shards.discard(camera.shard)
+            self._running -= 1
+            self._dispatch()
+
+    def capture_hints(self, camera: CameraPipeline) -> Dict[str, Any]:
+        """
+        Captura recomendada al totem de ``camera``.
+
+        ``fps``: la parte de los cupos que le toca a la cámara (según su peso
+        entre las cámaras conectadas y entre las que comparten su shard, a lo
+        más un cupo por tener un frame en curso) dividida por su tiempo de
+        servicio medido. Enviar más rápido solo
+        genera frames descartados. ``max_dimension``/``jpeg_quality`` bajan de
+        nivel mientras la latencia supere ``NEOTOTEM_TARGET_LATENCY_MS``.
+        """
+        max_dimension, jpeg_quality = CAPTURE_LEVELS[camera.level]
+        hints = {
+            "fps": CAPTURE_MAX_FPS,
+            "max_dimension": max_dimension,
+            "jpeg_quality": jpeg_quality,
+            "level": camera.level,
+            "target_latency_ms": TARGET_LATENCY_MS,
+            # Cámaras con frame esperando cupo (carga del backend completo)
+            "queue_depth": sum(1 for c in self._cameras.values() if c.scheduler.has_pending and not c.busy)
+        }
+        if camera.service_ms > 0:
+            active = [c for c in self._cameras.values() if c is camera or c.streaming]
+            share = min(1.0, self.capacity() * camera.weight / sum(c.weight for c in active))
+            if camera.shard is not None:
+                # Con shards, la cámara compite solo con las de su worker
+                # (y con todas si NEOTOTEM_PIPELINE_SLOTS limita menos cupos)
+                shard_weight = sum(c.weight for c in active if c.shard == camera.shard)
+                shard_share = camera.weight / shard_weight
+                share = min(share, shard_share) if self.slots > 0 else shard_share
+            fps = _FPS_HEADROOM * share * 1000 / camera.service_ms
+            hints["fps"] = round(min(CAPTURE_MAX_FPS, max(CAPTURE_MIN_FPS, fps)), 1)
+        return hints
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "slots": self.capacity(),
+            "running": self._running,
+            "cameras": {camera_id: camera.stats() for camera_id, camera in self._cameras.items()}
+        }
+
+
+# Instancia global del gestor de cámaras
+pipeline_manager = PipelineManager()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la cascada de detectores de accesorios
+"""
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.accessory_registry import AccessoryDetector, run_accessory_detectors
+from services.ai.real_detection import _portrait_roi, _wrist_rois, analyze_real_clothing_simple
+from services.cv.frame_context import FrameContext
+
+
+def _detector(name, group, priority, result, calls, requires="pose", budget_ms=20.0, sleep_s=0.0):
+    def fn(ctx, pose_landmarks):
+        calls.append(name)
+        if sleep_s:
+            time.sleep(sleep_s)
+        return result
+    return AccessoryDetector(name, fn, group, priority, requires, budget_ms, probe_every=2)
+
+
+def test_priority_and_early_exit():
+    """Gafas encontradas: no se buscan gorros; sin cara no corren los detectores de cabeza"""
+    calls = []
+    detectors = [
+        _detector("glasses", "head", 10, "gafas", calls, requires="face"),
+        _detector("hat", "head", 20, "gorra", calls, requires="face"),
+        _detector("straps", "bag", 30, None, calls),
+        _detector("contours", "bag", 40, "cartera", calls),
+    ]
+
+    out = run_accessory_detectors(None, face_detected=True, pose_detected=True, detectors=detectors)
+    print(f"🎩 Cascada: {out}")
+    assert out["found"] == {"head": "gafas", "bag": "cartera"}
+    assert calls == ["glasses", "straps", "contours"]
+
+    calls.clear()
+    out = run_accessory_detectors(None, face_detected=False, pose_detected=True, detectors=detectors)
+    assert "head" not in out["found"]
+    assert calls == ["straps", "contours"]
+
+
+def test_budget_skips_slow_detector():
+    """Un detector sobre su presupuesto se omite y se vuelve a medir cada ``probe_every`` omisiones"""
+    calls = []
+    slow = _detector("slow", "watch", 50, None, calls, budget_ms=1.0, sleep_s=0.01)
+
+    for _ in range(4):
+        run_accessory_detectors(None, pose_detected=True, detectors=[slow])
+
+    print(f"⏱️ Detector lento: {slow.stats()}")
+    # 1ª corrida mide, 2 omisiones, 4ª vuelve a medir
+    assert calls == ["slow", "slow"]
+    assert slow.skipped == 2
+
+
+def test_landmark_rois():
+    """Las regiones guiadas por landmarks quedan dentro del frame"""
+    points = {2: (0.45, 0.30), 5: (0.55, 0.30), 11: (0.35, 0.50), 12: (0.65, 0.50),
+              15: (0.30, 0.80), 16: (0.70, 0.80)}
+    landmark = [SimpleNamespace(x=points.get(i, (0.5, 0.5))[0], y=points.get(i, (0.5, 0.5))[1], visibility=0.9)
+                for i in range(33)]
+    pose_landmarks = SimpleNamespace(landmark=landmark)
+
+    x1, y1, x2, y2 = _portrait_roi(pose_landmarks, 480, 640)
+    assert 0 <= x1 < x2 <= 640 and 0 <= y1 < y2 <= 480
+    rois = _wrist_rois(pose_landmarks, 480, 640)
+    assert [side for side, _ in rois] == ["izquierda", "derecha"]
+
+    ctx = FrameContext(np.zeros((480, 640, 3), dtype=np.uint8))
+    crop = ctx.crop(x1, y1, x2, y2)
+    assert crop.gray.shape == (y2 - y1, x2 - x1)
+
+
+def test_analysis_reports_cascade():
+    """El análisis completo reporta los accesorios y el tiempo de la cascada"""
+    results = analyze_real_clothing_simple(np.full((480, 640, 3), 120, dtype=np.uint8))
+    assert "accessories_ms" in results
+    assert results["head_accessory"] is None and results["bag_accessory"] is None
+
+
+if __name__ == "__main__":
+    print("🚀 Probando cascada de detectores de accesorios...")
+    test_priority_and_early_exit()
+    test_budget_skips_slow_detector()
+    test_landmark_rois()
+    test_analysis_reports_cascade()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la lectura de lotes de /cv/analyze-batch (zip/tar)
+"""
+import sys
+import os
+import io
+import tarfile
+import zipfile
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+
+from api.routers.cv import _archive_images, MAX_IMAGE_BYTES
+
+
+def test_zip_and_tar_members():
+    """Solo se extraen las imágenes del archivo, con su ruta como nombre"""
+    zip_buffer = io.BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w") as archive:
+        archive.writestr("frames/a.jpg", b"jpg-a")
+        archive.writestr("frames/b.PNG", b"png-b")
+        archive.writestr("notas.txt", b"no")
+    members = _archive_images("lote.zip", zip_buffer.getvalue())
+    print(f"📦 zip: {[name for name, _ in members]}")
+    assert members == [("lote.zip/frames/a.jpg", b"jpg-a"), ("lote.zip/frames/b.PNG", b"png-b")]
+
+    tar_buffer = io.BytesIO()
+    with tarfile.open(fileobj=tar_buffer, mode="w:gz") as archive:
+        info = tarfile.TarInfo("c.jpeg")
+        info.size = 5
+        archive.addfile(info, io.BytesIO(b"jpg-c"))
+    assert _archive_images("lote.tgz", tar_buffer.getvalue()) == [("lote.tgz/c.jpeg", b"jpg-c")]
+
+
+def test_not_an_archive():
+    """Bytes que no son zip ni tar retornan None"""
+    assert _archive_images("a.txt", b"hola mundo") is None
+
+
+def _rejected(filename: str, data: bytes, **limits) -> str:
+    try:
+        _archive_images(filename, data, **limits)
+    except HTTPException as e:
+        assert e.status_code == 413
+        return e.detail
+    raise AssertionError("El archivo debía rechazarse")
+
+
+def test_archive_limits():
+    """Los tamaños declarados se validan antes de descomprimir (zip bomb)"""
+    bomb = io.BytesIO()
+    with zipfile.ZipFile(bomb, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("bomba.jpg", b"\0" * (MAX_IMAGE_BYTES + 1))
+    print(f"💣 zip de {len(bomb.getvalue())} bytes: {_rejected('bomba.zip', bomb.getvalue())}")
+
+    many = io.BytesIO()
+    with zipfile.ZipFile(many, "w") as archive:
+        for i in range(5):
+            archive.writestr(f"{i}.jpg", b"x" * 100)
+    assert len(_archive_images("lote.zip", many.getvalue(), max_items=5)) == 5
+    assert "4 imágenes" in _rejected("lote.zip", many.getvalue(), max_items=4)
+    assert "Lote" in _rejected("lote.zip", many.getvalue(), max_bytes=450)
+
+    tar_buffer = io.BytesIO()
+    with tarfile.open(fileobj=tar_buffer, mode="w:gz") as archive:
+        info = tarfile.TarInfo("grande.jpg")
+        info.size = MAX_IMAGE_BYTES + 1
+        archive.addfile(info, io.BytesIO(b"\0" * info.size))
+    _rejected("lote.tgz", tar_buffer.getvalue())
+
+
+def test_corrupt_archive_members():
+    """Un miembro dañado responde 400 con su nombre (no un 500)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("ok.jpg", b"jpg-ok")
+        archive.writestr("roto.jpg", b"contenido de la imagen" * 50)
+    data = bytearray(buffer.getvalue())
+    # Dañar los datos comprimidos del segundo miembro (después de su encabezado local)
+    offset = data.index(b"roto.jpg") + len(b"roto.jpg") + 5
+    data[offset:offset + 20] = b"\xff" * 20
+
+    try:
+        _archive_images("lote.zip", bytes(data))
+        raise AssertionError("El miembro dañado debía rechazarse")
+    except HTTPException as e:
+        print(f"🧨 {e.status_code}: {e.detail}")
+        assert e.status_code == 400 and "lote.zip/roto.jpg" in e.detail
+
+
+if __name__ == "__main__":
+    print("🚀 Probando lectura de lotes...")
+    test_zip_and_tar_members()
+    test_not_an_archive()
+    test_archive_limits()
+    test_corrupt_archive_members()
+    print("✅ Pruebas completadas!")
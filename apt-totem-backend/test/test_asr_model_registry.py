@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el registro de modelos ASR (carga bajo demanda,
+modelo por totem y carga única con llamadas simultáneas)
+"""
+import sys
+import os
+import threading
+import time
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.asr.model_registry import ASRModelRegistry, _parse_device_models
+
+
+class CountingRegistry(ASRModelRegistry):
+    """Registro que crea motores falsos (sin Whisper) y cuenta las cargas"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.created = []
+
+    def _create(self, key):
+        time.sleep(0.05)
+        if key[0] == "medium":
+            raise RuntimeError("sin memoria")
+        self.created.append(key)
+        return {"model": key}
+
+
+def test_resolve():
+    """Request explícito > modelo del totem > default"""
+    registry = CountingRegistry(default=("small", "int8"),
+                                device_models=_parse_device_models("entrada:tiny, caja:base/int8_float32"))
+    assert registry.resolve() == ("small", "int8")
+    assert registry.resolve(device_id="entrada") == ("tiny", "int8")
+    assert registry.resolve(device_id="caja") == ("base", "int8_float32")
+    assert registry.resolve("base", device_id="entrada") == ("base", "int8")
+    try:
+        registry.resolve("enorme")
+    except ValueError as e:
+        print(f"❌ Error esperado: {e}")
+    else:
+        raise AssertionError("Se esperaba ValueError")
+
+
+def test_single_load_and_readiness():
+    """Llamadas simultáneas comparten una sola carga; ready solo después de cargar"""
+    registry = CountingRegistry(default=("tiny", "int8"), device_models={})
+    assert not registry.is_ready() and registry.status()["models"] == {}
+
+    engines = []
+    threads = [threading.Thread(target=lambda: engines.append(registry.get())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"📦 Estado: {registry.status()}")
+    assert registry.created == [("tiny", "int8")]
+    assert all(engine is engines[0] for engine in engines)
+    assert registry.is_ready() and registry.status()["ready"]
+
+
+def test_load_error():
+    """Un modelo que no carga queda en error y se puede reintentar"""
+    registry = CountingRegistry(default=("tiny", "int8"), device_models={})
+    for _ in range(2):
+        try:
+            registry.get("medium")
+        except RuntimeError:
+            pass
+    assert registry.status()["models"]["medium/int8"]["state"] == "error"
+    assert not registry.is_ready("medium")
+
+
+if __name__ == "__main__":
+    print("🚀 Probando registro de modelos ASR...")
+    test_resolve()
+    test_single_load_and_readiness()
+    test_load_error()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el planificador ASR (límite de decodificadores, cola
+acotada, parciales opcionales y degradación al modelo chico)
+"""
+import sys
+import os
+import asyncio
+import threading
+import time
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.asr.model_registry import ASRModelRegistry
+from services.asr.scheduler import ASRScheduler, ASRBusyError
+
+
+class FakeRegistry(ASRModelRegistry):
+    """Motores falsos: el "motor" es el nombre del modelo"""
+
+    def _create(self, key):
+        return key[0]
+
+
+class Decoder:
+    """Trabajo que dura un rato y registra cuántos corren a la vez"""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self.models = []
+        self._lock = threading.Lock()
+
+    def __call__(self, engine):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+            self.models.append(engine)
+        return engine
+
+
+def _scheduler(**kwargs) -> ASRScheduler:
+    registry = FakeRegistry(default=("small", "int8"), device_models={})
+    return ASRScheduler(registry=registry, **kwargs)
+
+
+def test_concurrency_limit():
+    """Nunca corren más decodificaciones que decodificadores"""
+    async def run():
+        scheduler = _scheduler(decoders=2, queue_max=10, degrade_depth=100)
+        decoder = Decoder()
+        await asyncio.gather(*(scheduler.submit(decoder) for _ in range(6)))
+        return scheduler, decoder
+
+    scheduler, decoder = asyncio.run(run())
+    print(f"⚙️ Pico de decodificaciones simultáneas: {decoder.peak}, stats: {scheduler.stats()}")
+    assert decoder.peak == 2 and scheduler.stats()["completed"] == 6
+    scheduler.shutdown()
+
+
+def test_created_outside_loop():
+    """
+    Instancia creada fuera del loop (como la global al importar) con más
+    trabajos simultáneos que decodificadores, en dos loops seguidos
+    """
+    scheduler = _scheduler(decoders=2, queue_max=10, degrade_depth=100)
+    decoder = Decoder()
+
+    async def run():
+        return await asyncio.gather(*(scheduler.submit(decoder) for _ in range(5)))
+
+    for _ in range(2):
+        assert asyncio.run(run()) == ["small"] * 5
+    assert decoder.peak == 2 and scheduler.stats()["completed"] == 10
+    scheduler.shutdown()
+
+
+def test_reject_and_best_effort():
+    """Con la cola llena se rechaza; las parciales no esperan"""
+    async def run():
+        scheduler = _scheduler(decoders=1, queue_max=2, degrade_depth=100)
+        decoder = Decoder()
+        tasks = [asyncio.create_task(scheduler.submit(decoder)) for _ in range(3)]
+        await asyncio.sleep(0.01)  # uno corriendo, dos esperando
+        errors = []
+        for best_effort in (False, True):
+            try:
+                await scheduler.submit(decoder, best_effort=best_effort)
+            except ASRBusyError as e:
+                errors.append(str(e))
+        await asyncio.gather(*tasks)
+        return scheduler, errors
+
+    scheduler, errors = asyncio.run(run())
+    print(f"🚫 Rechazos: {errors}")
+    stats = scheduler.stats()
+    assert len(errors) == 2 and stats["rejected"] == 1 and stats["skipped_partials"] == 1
+    scheduler.shutdown()
+
+
+def test_degrade_to_small_model():
+    """Con la cola profunda, las consultas sin modelo explícito usan el modelo chico cargado"""
+    async def run():
+        scheduler = _scheduler(decoders=1, queue_max=10, degrade_depth=2, degrade_model="tiny")
+        scheduler.registry.get("tiny")
+        decoder = Decoder()
+        tasks = [asyncio.create_task(scheduler.submit(decoder)) for _ in range(5)]
+        tasks.append(asyncio.create_task(scheduler.submit(decoder, model="base")))
+        await asyncio.gather(*tasks)
+        return scheduler, decoder
+
+    scheduler, decoder = asyncio.run(run())
+    print(f"📉 Modelos usados: {decoder.models}")
+    assert decoder.models.count("tiny") == 2 and "base" in decoder.models
+    assert scheduler.stats()["degraded"] == 2
+    scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    print("🚀 Probando planificador ASR...")
+    test_concurrency_limit()
+    test_created_outside_loop()
+    test_reject_and_best_effort()
+    test_degrade_to_small_model()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el reconocimiento en streaming (VAD, parciales y
+endpoint) con un motor ASR de prueba que no carga Whisper
+"""
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.asr.streaming import StreamingTranscriber, SAMPLE_RATE
+
+
+class EchoEngine:
+    """Motor de prueba: responde la duración del audio recibido"""
+
+    def __init__(self):
+        self.calls = []
+
+    def transcribe_array(self, audio, language="es", beam_size=5, initial_prompt=None):
+        self.calls.append((audio.size / SAMPLE_RATE, beam_size, initial_prompt))
+        return {"text": f"{audio.size / SAMPLE_RATE:.1f}s", "duration": audio.size / SAMPLE_RATE}
+
+
+def _pcm(seconds: float, amplitude: float) -> bytes:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = amplitude * np.sin(2 * np.pi * 220 * t)
+    return (audio * 32767).astype("<i2").tobytes()
+
+
+def _feed(transcriber, pcm: bytes, chunk: int = 3201):
+    """Envía el audio en trozos de tamaño impar (como llegan por la red)"""
+    events = []
+    for i in range(0, len(pcm), chunk):
+        events += transcriber.push(pcm[i:i + chunk])
+        while (job := transcriber.next_job()) is not None:
+            event = transcriber.run(job)
+            if event:
+                events.append(event)
+    return events
+
+
+def test_partials_and_endpoint():
+    """Voz entre silencios: inicio, parciales con beam 1 y un final al detectar silencio"""
+    engine = EchoEngine()
+    transcriber = StreamingTranscriber(engine)
+    events = _feed(transcriber, _pcm(0.6, 0.001) + _pcm(2.0, 0.3) + _pcm(1.0, 0.001))
+
+    kinds = [e["type"] for e in events]
+    print(f"🎙️ Eventos: {kinds}")
+    assert kinds[0] == "speech_start" and kinds[-1] == "final"
+    assert kinds.count("final") == 1 and kinds.count("partial") >= 2
+
+    final = events[-1]
+    print(f"📝 Final: {final['text']} ({final['start']}s - {final['end']}s)")
+    assert 0.2 <= final["start"] <= 0.6 and 2.4 <= final["end"] <= 3.4
+    assert all(beam == 1 for _, beam, _ in engine.calls[:-1]) and engine.calls[-1][1] == 5
+    assert not transcriber.in_speech
+
+
+def test_window_split_and_flush():
+    """Los enunciados largos se cortan en la ventana y el corte siguiente usa el texto anterior"""
+    engine = EchoEngine()
+    transcriber = StreamingTranscriber(engine)
+    events = _feed(transcriber, _pcm(20.0, 0.3))
+    transcriber.flush()
+    while (job := transcriber.next_job()) is not None:
+        events.append(transcriber.run(job))
+
+    finals = [e for e in events if e["type"] == "final"]
+    print(f"✂️ Finales: {[f['text'] for f in finals]}")
+    assert len(finals) == 2 and finals[1]["utterance"] == 2
+    assert engine.calls[-1][2] == finals[0]["text"]
+
+
+if __name__ == "__main__":
+    print("🚀 Probando ASR en streaming...")
+    test_partials_and_endpoint()
+    test_window_split_and_flush()
+    print("✅ Pruebas completadas!")
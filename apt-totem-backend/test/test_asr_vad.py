@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el VAD previo al ASR (recorte de silencio,
+segmentación de enunciados y descarte de clips sin voz)
+"""
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.asr.vad import speech_segments, split_utterances, SAMPLE_RATE
+from services.asr.engine import ASREngine
+
+_rng = np.random.default_rng(0)
+
+
+def _noise(seconds: float, level: float = 0.002) -> np.ndarray:
+    return (level * _rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+
+def _voice(seconds: float) -> np.ndarray:
+    """Tono modulado en amplitud (la energía varía como en la voz)"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 3 * t)
+    return (0.2 * envelope * np.sin(2 * np.pi * 200 * t)).astype(np.float32) + _noise(seconds)
+
+
+def test_trim_and_split():
+    """Dos preguntas separadas por silencio: dos enunciados sin los extremos"""
+    audio = np.concatenate([_noise(1.0), _voice(1.5), _noise(2.0), _voice(1.0), _noise(1.5)])
+    segments = [(round(s / SAMPLE_RATE, 2), round(e / SAMPLE_RATE, 2)) for s, e in speech_segments(audio)]
+    print(f"✂️ Enunciados: {segments}")
+    assert len(segments) == 2
+    (s1, e1), (s2, e2) = segments
+    assert 0.7 <= s1 <= 1.0 and 2.5 <= e1 <= 2.8
+    assert 4.3 <= s2 <= 4.5 and 5.5 <= e2 <= 5.8
+
+    kept = sum(u.size for u in split_utterances(audio)) / audio.size
+    print(f"📉 Audio enviado a Whisper: {kept:.0%}")
+    assert kept < 0.5
+
+
+def test_short_pauses_and_clicks():
+    """Las pausas cortas quedan dentro del enunciado y los golpes sueltos se descartan"""
+    audio = np.concatenate([_noise(1.0), _voice(0.8), _noise(0.3), _voice(0.8), _noise(1.0),
+                            _voice(0.09), _noise(1.0)])
+    segments = speech_segments(audio)
+    assert len(segments) == 1
+
+
+def test_empty_and_long_clips():
+    """Sin voz (silencio o ruido estacionario) no hay enunciados; los largos se cortan en 30 s"""
+    assert speech_segments(_noise(3.0)) == []
+    assert speech_segments(_noise(3.0, level=0.05)) == []
+    assert speech_segments(np.zeros(100, dtype=np.float32)) == []
+
+    segments = speech_segments(_voice(70.0))
+    print(f"📏 Cortes de 70 s: {[(e - s) / SAMPLE_RATE for s, e in segments]}")
+    assert len(segments) == 3 and all(e - s <= 30 * SAMPLE_RATE for s, e in segments)
+
+
+def test_engine_skips_silence():
+    """El motor no llama a Whisper con un clip vacío y decodifica cada enunciado"""
+    class Segment:
+        def __init__(self, text):
+            self.text = text
+
+    class FakeModel:
+        def __init__(self):
+            self.calls = []
+
+        def transcribe(self, audio, **kwargs):
+            self.calls.append(audio.size / SAMPLE_RATE)
+            return [Segment(f"parte {len(self.calls)}")], None
+
+    engine = ASREngine.__new__(ASREngine)
+    engine.model = FakeModel()
+
+    result = engine.transcribe(_noise(5.0))
+    assert result["text"] == "" and engine.model.calls == [] and result["duration"] == 5.0
+
+    result = engine.transcribe(np.concatenate([_noise(1.0), _voice(1.5), _noise(2.0), _voice(1.0)]))
+    print(f"📝 Resultado: {result}")
+    assert result["text"] == "parte 1 parte 2" and len(engine.model.calls) == 2
+    assert result["speech_duration"] < result["duration"]
+
+
+if __name__ == "__main__":
+    print("🚀 Probando VAD previo al ASR...")
+    test_trim_and_split()
+    test_short_pauses_and_clicks()
+    test_empty_and_long_clips()
+    test_engine_skips_silence()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la decodificación de audio en memoria del ASR
+"""
+import sys
+import os
+import io
+import wave
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.asr.audio_io import decode_audio, decode_wav, resample, SAMPLE_RATE
+
+
+def _tone(seconds: float, rate: int) -> np.ndarray:
+    t = np.arange(int(seconds * rate)) / rate
+    return 0.5 * np.sin(2 * np.pi * 440 * t)
+
+
+def _wav(samples: np.ndarray, rate: int, channels: int = 1, width: int = 2) -> bytes:
+    if channels > 1:
+        samples = np.repeat(samples, channels)
+    if width == 1:
+        raw = (samples * 127 + 128).astype(np.uint8).tobytes()
+    else:
+        raw = (samples * 32767).astype("<i2").tobytes()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(width)
+        wav.setframerate(rate)
+        wav.writeframes(raw)
+    return buffer.getvalue()
+
+
+def test_wav_resample_and_downmix():
+    """WAV estéreo a 44.1 kHz -> mono a 16 kHz con la misma amplitud"""
+    audio = decode_audio(_wav(_tone(1.0, 44100), 44100, channels=2))
+    print(f"🔊 WAV estéreo 44.1 kHz: {audio.size} muestras, pico {audio.max():.2f}")
+    assert audio.dtype == np.float32 and audio.size == SAMPLE_RATE
+    assert abs(audio.max() - 0.5) < 0.01
+
+    audio = decode_wav(_wav(_tone(0.5, 8000), 8000, width=1))
+    assert audio.size == SAMPLE_RATE // 2 and abs(audio.max() - 0.5) < 0.02
+
+
+def test_raw_pcm():
+    """PCM crudo (sin cabecera) con la frecuencia indicada"""
+    pcm = (_tone(1.0, 48000) * 32767).astype("<i2").tobytes()
+    audio = decode_audio(pcm, audio_format="pcm", sample_rate=48000)
+    assert audio.size == SAMPLE_RATE
+    assert resample(audio, SAMPLE_RATE) is audio
+
+
+def test_compressed_in_memory():
+    """Opus en WebM se decodifica desde memoria con PyAV"""
+    import av
+
+    buffer = io.BytesIO()
+    with av.open(buffer, "w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=48000)
+        stream.layout = "mono"
+        samples = (_tone(1.0, 48000) * 32767).astype(np.int16).reshape(1, -1)
+        frame = av.AudioFrame.from_ndarray(samples, format="s16", layout="mono")
+        frame.sample_rate = 48000
+        for packet in stream.encode(frame):
+            container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+
+    audio = decode_audio(buffer.getvalue())
+    print(f"🎧 WebM/Opus: {audio.size} muestras")
+    assert abs(audio.size - SAMPLE_RATE) < SAMPLE_RATE * 0.05
+
+
+def test_invalid_audio():
+    try:
+        decode_audio(b"esto no es audio")
+    except ValueError as e:
+        print(f"❌ Error esperado: {e}")
+    else:
+        raise AssertionError("Se esperaba ValueError")
+
+
+if __name__ == "__main__":
+    print("🚀 Probando decodificación de audio en memoria...")
+    test_wav_resample_and_downmix()
+    test_raw_pcm()
+    test_compressed_in_memory()
+    test_invalid_audio()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para las tablas compiladas de nombres de color
+"""
+import sys
+import os
+import time
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cv.color_lut import ColorLUT
+from services.ai.real_detection import RGB_COLOR_RULES, RGB_COLOR_LUT, get_color_name
+from services.cv.color import COLOR_MAP, NEUTRAL_RULES, _map_color_name
+
+
+def _first_rule(rules, c0, c1, c2, default="desconocido"):
+    """Referencia: recorrer las reglas en orden como antes de compilar la tabla"""
+    for name, (low, high) in rules:
+        if low[0] <= c0 <= high[0] and low[1] <= c1 <= high[1] and low[2] <= c2 <= high[2]:
+            return name
+    return default
+
+
+def test_lut_matches_ordered_rules():
+    """La tabla da el mismo nombre que recorrer las reglas, también en los bordes de cada rango"""
+    edges = sorted({v for _, (low, high) in RGB_COLOR_RULES for bound in (low, high) for v in bound}
+                   | {v + 1 for _, (_, high) in RGB_COLOR_RULES for v in high if v < 255})
+    rng = np.random.default_rng(0)
+    samples = [tuple(rng.choice(edges, 3)) for _ in range(3000)]
+    samples += [tuple(p) for p in rng.integers(0, 256, (3000, 3))]
+
+    for r, g, b in samples:
+        assert get_color_name(r, g, b) == _first_rule(RGB_COLOR_RULES, r, g, b), (r, g, b)
+
+
+def test_hsv_table():
+    """Neutros por saturación y alias rojo2 -> rojo"""
+    assert _map_color_name((0, 10, 20)) == "negro"
+    assert _map_color_name((90, 10, 250)) == "blanco"
+    assert _map_color_name((90, 10, 120)) == "gris"
+    assert _map_color_name((175, 200, 200)) == "rojo"
+    assert _map_color_name((115, 200, 200)) == "azul"
+    assert _map_color_name((115, 200, 200)) == _first_rule(NEUTRAL_RULES + list(COLOR_MAP.items()), 115, 200, 200)
+
+
+def test_label_and_histogram():
+    """Etiquetado vectorizado de una región completa y distribución por nombre"""
+    region = np.zeros((100, 100, 3), dtype=np.uint8)
+    region[:70] = (10, 10, 10)       # negro
+    region[70:] = (20, 20, 200)      # azul
+
+    start = time.perf_counter()
+    labels = RGB_COLOR_LUT.label(region)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"🎨 Etiquetado 100x100 en {elapsed:.3f} ms")
+    assert labels.shape == (100, 100)
+    assert RGB_COLOR_LUT.names[labels[0, 0]] == "negro"
+
+    distribution = RGB_COLOR_LUT.histogram(region)
+    print(f"🎨 Distribución: {distribution}")
+    assert distribution == {"negro": 0.7, "azul": 0.3}
+
+    mask = np.zeros((100, 100), dtype=np.uint8)
+    mask[80:] = 255
+    assert RGB_COLOR_LUT.histogram(region, mask=mask) == {"azul": 1.0}
+
+    lut = ColorLUT([("a", [(0, 0, 0), (10, 10, 10)])], default="otro")
+    assert lut.name(5, 5, 5) == "a" and lut.name(11, 5, 5) == "otro"
+
+
+if __name__ == "__main__":
+    print("🚀 Probando tablas de nombres de color...")
+    test_lut_matches_ordered_rules()
+    test_hsv_table()
+    test_label_and_histogram()
+    print("✅ Pruebas completadas!")
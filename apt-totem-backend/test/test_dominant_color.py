@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el motor de colores dominantes
+"""
+import sys
+import os
+import time
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cv.dominant_color import dominant_colors
+from services.cv.color import detect_dominant_hsv
+
+
+def _three_color_image():
+    """Imagen con tres bloques de color (60%, 30%, 10%) y ruido"""
+    rng = np.random.default_rng(0)
+    image = np.zeros((100, 100, 3), dtype=np.uint8)
+    image[:60] = (200, 40, 30)
+    image[60:90] = (20, 160, 60)
+    image[90:] = (240, 240, 240)
+    noise = rng.normal(0, 8, image.shape)
+    return np.clip(image + noise, 0, 255).astype(np.uint8)
+
+
+def test_dominant_colors_sorted_by_frequency():
+    """Los centros salen ordenados por cantidad de píxeles y cerca de los colores reales"""
+    image = _three_color_image()
+
+    start = time.perf_counter()
+    centers, counts = dominant_colors(image, k=3)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"🎨 Centros: {centers.astype(int).tolist()} conteos: {counts.tolist()} ({elapsed:.2f} ms)")
+
+    assert counts.sum() == 100 * 100
+    assert list(counts) == sorted(counts, reverse=True)
+    assert np.abs(centers[0] - (200, 40, 30)).max() < 10
+    assert np.abs(centers[1] - (20, 160, 60)).max() < 10
+    assert np.abs(centers[2] - (240, 240, 240)).max() < 10
+
+
+def test_mask_and_degenerate_inputs():
+    """Con máscara solo cuentan los píxeles marcados; una imagen plana da un solo color"""
+    image = _three_color_image()
+    mask = np.zeros(image.shape[:2], dtype=np.uint8)
+    mask[60:90] = 255
+    centers, counts = dominant_colors(image, k=3, mask=mask)
+    assert counts.sum() == 30 * 100
+    assert np.abs(centers[0] - (20, 160, 60)).max() < 10
+
+    flat = np.full((50, 50, 3), 90, dtype=np.uint8)
+    centers, counts = dominant_colors(flat, k=3)
+    assert len(centers) == 1 and counts[0] == 2500
+
+    centers, counts = dominant_colors(flat, k=3, mask=np.zeros((50, 50), dtype=np.uint8))
+    assert len(centers) == 0
+
+
+def test_color_endpoint_helper():
+    """detect_dominant_hsv sigue nombrando el color más frecuente"""
+    image = np.full((120, 120, 3), (200, 60, 10), dtype=np.uint8)  # BGR azul
+    result = detect_dominant_hsv(image)
+    print(f"🎨 detect_dominant_hsv: {result}")
+    assert result["color_name"] == "azul"
+
+
+if __name__ == "__main__":
+    print("🚀 Probando colores dominantes...")
+    test_dominant_colors_sorted_by_frequency()
+    test_mask_and_degenerate_inputs()
+    test_color_endpoint_helper()
+    print("✅ Pruebas completadas!")
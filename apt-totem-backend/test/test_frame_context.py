@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para FrameContext (planos del frame calculados una sola vez)
+"""
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cv.frame_context import FrameContext
+
+_rng = np.random.default_rng(0)
+
+
+def _frame() -> np.ndarray:
+    return _rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+
+
+def test_planes_cached_and_equal_to_cv2():
+    """Cada plano se convierte una vez y coincide con la conversión directa"""
+    bgr = _frame()
+    ctx = FrameContext(bgr)
+    assert ctx.bgr is bgr
+    assert ctx.rgb is ctx.rgb and ctx.gray is ctx.gray
+    assert np.array_equal(ctx.rgb, cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+    assert np.array_equal(ctx.gray, cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY))
+
+    small = ctx.resized((100, 100))
+    assert ctx.resized((100, 100)) is small
+    assert np.array_equal(small, cv2.resize(bgr, (100, 100)))
+
+    # Desde RGB (como llega de MediaPipe) el gris sale del BGR si ya está calculado
+    rgb_ctx = FrameContext.wrap(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB))
+    assert np.array_equal(rgb_ctx.bgr, bgr)
+    assert np.array_equal(rgb_ctx.gray, cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY))
+    assert FrameContext.wrap(rgb_ctx) is rgb_ctx
+
+
+def test_crop_reuses_parent_planes():
+    """Los planos de un recorte son vistas de los del frame completo (sin convertir de nuevo)"""
+    bgr = _frame()
+    ctx = FrameContext(bgr)
+    gray = ctx.gray
+    crop = ctx.crop(20, 10, 80, 70)
+    print(f"✂️ Recorte {crop.box}: {crop.shape}")
+    assert crop.shape == (60, 60) and crop.box == (20, 10, 80, 70)
+    assert np.shares_memory(crop.gray, gray)
+    assert np.array_equal(crop.gray, cv2.cvtColor(bgr[10:70, 20:80], cv2.COLOR_BGR2GRAY))
+    assert np.array_equal(crop.rgb, cv2.cvtColor(bgr[10:70, 20:80], cv2.COLOR_BGR2RGB))
+    assert np.shares_memory(crop.rgb, ctx.rgb)
+
+
+if __name__ == "__main__":
+    print("🚀 Probando FrameContext...")
+    test_planes_cached_and_equal_to_cv2()
+    test_crop_reuses_parent_planes()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la compuerta de cambio de escena del pipeline de visión
+"""
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.frame_gate import FrameChangeGate
+
+
+def _jpeg(image: np.ndarray) -> bytes:
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def test_reuses_result_for_same_scene():
+    """Un frame casi idéntico reutiliza el resultado; uno distinto no"""
+    gate = FrameChangeGate(threshold=4.0, max_reuse_s=0)
+    scene = np.full((480, 640, 3), 120, dtype=np.uint8)
+
+    cached, signature = gate.lookup(_jpeg(scene))
+    assert cached is None
+    gate.store(signature, {"primary_color": "gris"})
+
+    noisy = cv2.add(scene, np.full_like(scene, 2))
+    cached, _ = gate.lookup(_jpeg(noisy))
+    assert cached == {"primary_color": "gris"}
+
+    changed = scene.copy()
+    changed[100:400, 200:500] = 255
+    cached, _ = gate.lookup(_jpeg(changed))
+    assert cached is None
+
+    print(f"🚦 Compuerta: {gate.stats()}")
+    assert gate.stats()["hits"] == 1
+    assert gate.stats()["misses"] == 2
+
+
+def test_variant_and_errors_not_reused():
+    """No se reutilizan resultados de otra variante ni errores"""
+    gate = FrameChangeGate(threshold=4.0, max_reuse_s=0)
+    frame = _jpeg(np.full((240, 320, 3), 80, dtype=np.uint8))
+
+    _, signature = gate.lookup(frame, variant="image")
+    gate.store(signature, {"primary_color": "gris"}, variant="image")
+    assert gate.lookup(frame, variant="overlay")[0] is None
+
+    gate.reset()
+    _, signature = gate.lookup(frame)
+    gate.store(signature, {"error": "fallo"})
+    assert gate.lookup(frame)[0] is None
+
+
+if __name__ == "__main__":
+    print("🚀 Probando compuerta de cambio de escena...")
+    test_reuses_result_for_same_scene()
+    test_variant_and_errors_not_reused()
+    print("✅ Pruebas completadas!")
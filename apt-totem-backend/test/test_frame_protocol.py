@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el protocolo binario de frames del WebSocket /ws
+"""
+import sys
+import os
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.frame_protocol import (
+    KIND_CAMERA_FRAME, HEADER_SIZE, FrameProtocolError, pack_frame, unpack_frame
+)
+
+
+def test_roundtrip():
+    """Un frame empaquetado se recupera con la misma meta y payload"""
+    jpeg = b"\xff\xd8" + bytes(range(256)) + b"\xff\xd9"
+    data = pack_frame(KIND_CAMERA_FRAME, {"session_id": "abc", "camera_active": True}, jpeg)
+
+    kind, meta, payload = unpack_frame(data)
+    print(f"📦 Frame: tipo={kind}, meta={meta}, payload={len(payload)} bytes")
+    assert kind == KIND_CAMERA_FRAME
+    assert meta == {"session_id": "abc", "camera_active": True}
+    assert bytes(payload) == jpeg
+    assert len(data) == HEADER_SIZE + len(b'{"session_id":"abc","camera_active":true}') + len(jpeg)
+
+
+def test_invalid_frames():
+    """Cabeceras inválidas o truncadas se rechazan"""
+    valid = pack_frame(KIND_CAMERA_FRAME, {"a": 1}, b"x")
+    for bad in (b"", b"junk", b"XX" + valid[2:], valid[:HEADER_SIZE + 2]):
+        try:
+            unpack_frame(bad)
+        except FrameProtocolError as e:
+            print(f"✅ Rechazado: {e}")
+        else:
+            raise AssertionError(f"Frame inválido aceptado: {bad!r}")
+
+
+
+def test_invalid_meta():
+    """Meta que no es JSON, no es UTF-8 o no es un objeto se rechaza como error de protocolo"""
+    for meta in (b"{x}", b"\xff\xfe", b"[1, 2]", b"null"):
+        data = b"NT" + bytes([1, KIND_CAMERA_FRAME]) + len(meta).to_bytes(4, "big") + meta + b"jpeg"
+        try:
+            unpack_frame(data)
+        except FrameProtocolError as e:
+            print(f"✅ Meta rechazada: {e}")
+        else:
+            raise AssertionError(f"Meta inválida aceptada: {meta!r}")
+
+
+if __name__ == "__main__":
+    print("🚀 Probando protocolo binario de frames...")
+    test_roundtrip()
+    test_invalid_frames()
+    test_invalid_meta()
+    print("✅ Pruebas completadas!")
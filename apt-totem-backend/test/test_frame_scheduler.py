@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el planificador latest-frame-wins del WebSocket /ws
+"""
+import sys
+import os
+import asyncio
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.frame_scheduler import LatestFrameScheduler
+
+
+def test_latest_frame_wins():
+    """Solo el frame más reciente sobrevive cuando el pipeline va atrasado"""
+
+    async def run():
+        scheduler = LatestFrameScheduler()
+        for i in range(5):
+            scheduler.submit({"frame": i})
+
+        frame = await scheduler.next()
+        print(f"📦 Frame procesado: {frame} | stats: {scheduler.stats()}")
+        assert frame == {"frame": 4}
+        assert scheduler.stats()["dropped"] == 4
+        assert scheduler.stats()["processed"] == 1
+
+    asyncio.run(run())
+
+
+def test_close_releases_consumer():
+    """Cerrar el planificador despierta al consumidor con None"""
+
+    async def run():
+        scheduler = LatestFrameScheduler()
+        consumer = asyncio.create_task(scheduler.next())
+        await asyncio.sleep(0)
+        scheduler.close()
+        assert await consumer is None
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    print("🚀 Probando planificador de frames...")
+    test_latest_frame_wins()
+    test_close_releases_consumer()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la decodificación compartida de imágenes
+"""
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.cv.image_io import decode_image, image_size, limit_size, reduction_for
+
+
+def _jpeg(width, height):
+    image = np.full((height, width, 3), 90, dtype=np.uint8)
+    return cv2.imencode('.jpg', image)[1].tobytes()
+
+
+def test_decode_image():
+    """Decodifica bytes o memoryview, reduce al decodificar y rechaza basura"""
+    data = _jpeg(640, 480)
+    assert decode_image(data).shape == (480, 640, 3)
+    assert decode_image(memoryview(data)).shape == (480, 640, 3)
+    assert decode_image(data, reduce=2).shape == (240, 320, 3)
+    assert decode_image(data, reduce=4).shape == (120, 160, 3)
+    assert decode_image(b"no es imagen") is None
+    assert decode_image(b"") is None
+
+
+def test_header_probe():
+    """El tamaño se lee de la cabecera (JPEG base/progresivo y PNG) sin decodificar"""
+    image = np.full((1080, 1920, 3), 90, dtype=np.uint8)
+    progressive = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_PROGRESSIVE, 1])[1].tobytes()
+    png = cv2.imencode('.png', image[:50, :60])[1].tobytes()
+
+    assert image_size(_jpeg(1920, 1080)) == ("jpeg", 1920, 1080)
+    assert image_size(progressive) == ("jpeg", 1920, 1080)
+    assert image_size(png) == ("png", 60, 50)
+    assert image_size(b"no es imagen") is None
+
+
+def test_reduced_decode_for_target():
+    """Se elige el mayor factor que deja la imagen en el tamaño objetivo o más"""
+    assert reduction_for(_jpeg(640, 480), 800) == 1
+    assert reduction_for(_jpeg(1920, 1080), 800) == 2
+    assert reduction_for(_jpeg(4000, 3000), 800) == 4
+
+    decoded = decode_image(_jpeg(1920, 1080), max_dimension=800)
+    print(f"⚡ 1920x1080 decodificado a {decoded.shape[1]}x{decoded.shape[0]}")
+    assert decoded.shape == (540, 960, 3)
+    assert limit_size(decoded).shape == (450, 800, 3)
+
+
+def test_limit_size():
+    """Solo reduce cuando un lado supera el máximo, manteniendo la proporción"""
+    small = np.zeros((480, 640, 3), dtype=np.uint8)
+    assert limit_size(small) is small
+
+    big = np.zeros((1200, 1600, 3), dtype=np.uint8)
+    assert limit_size(big).shape == (600, 800, 3)
+
+
+if __name__ == "__main__":
+    print("🚀 Probando decodificación de imágenes...")
+    test_decode_image()
+    test_header_probe()
+    test_reduced_decode_for_target()
+    test_limit_size()
+    print("✅ Pruebas completadas!")
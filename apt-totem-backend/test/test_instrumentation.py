@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para la instrumentación por etapa del pipeline de visión
+"""
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.instrumentation import (
+    StageHistogram, record, span, frame_trace, stage_stats, reset_stage_stats, merge_stage_stats
+)
+
+
+def test_histogram_percentiles():
+    """Los percentiles son la cota del bucket correspondiente (acotada por el máximo)"""
+    histogram = StageHistogram()
+    for ms in [1.5] * 90 + [40] * 9 + [3000]:
+        histogram.observe(ms)
+
+    snapshot = histogram.snapshot()
+    print(f"📊 Histograma: p50={snapshot['p50_ms']} p95={snapshot['p95_ms']} p99={snapshot['p99_ms']}")
+    assert snapshot["count"] == 100 and snapshot["max_ms"] == 3000
+    assert snapshot["p50_ms"] == 2 and snapshot["p95_ms"] == 50 and snapshot["p99_ms"] == 50
+    assert histogram.percentile(1.0) == 3000
+    assert sum(snapshot["buckets"]) == 100
+
+
+def test_frame_trace_nesting():
+    """Una traza interna reutiliza la externa y ambas alimentan el histograma del proceso"""
+    reset_stage_stats()
+    with frame_trace() as outer:
+        record("decode", 2.0)
+        with frame_trace() as inner:
+            with span("face"):
+                pass
+            record("decode", 1.0)
+        assert inner is outer
+    assert outer["decode"] == 3.0 and "face" in outer
+
+    # Fuera de una traza solo se acumula en el histograma
+    record("decode", 5.0)
+    stats = stage_stats()
+    assert stats["decode"]["count"] == 3 and stats["face"]["count"] == 1
+    reset_stage_stats()
+    assert stage_stats() == {}
+
+
+def test_merge_snapshots():
+    """Las instantáneas de varios workers se combinan por etapa"""
+    a, b = StageHistogram(), StageHistogram()
+    for ms in np.linspace(1, 10, 10):
+        a.observe(float(ms))
+    b.observe(250.0)
+
+    merged = merge_stage_stats([{"pose": a.snapshot()}, {"pose": b.snapshot(), "color": b.snapshot()}])
+    print(f"🔀 Combinado: {merged['pose']['count']} mediciones, máx {merged['pose']['max_ms']} ms")
+    assert merged["pose"]["count"] == 11 and merged["pose"]["max_ms"] == 250
+    assert merged["color"]["count"] == 1
+
+
+if __name__ == "__main__":
+    print("🚀 Probando instrumentación del pipeline...")
+    test_histogram_percentiles()
+    test_frame_trace_nesting()
+    test_merge_snapshots()
+    print("✅ Pruebas completadas!")
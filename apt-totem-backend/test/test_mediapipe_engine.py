@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el motor MediaPipe perezoso y selectivo
+"""
+import sys
+import os
+import base64
+import time
+
+import cv2
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.model_pool import MediaPipeModelPool
+import services.ai.mediapipe_engine as mediapipe_engine_module
+from services.ai.mediapipe_engine import MediaPipeEngine, ALL_FEATURES
+
+
+def _frame_b64():
+    frame = np.full((240, 320, 3), 200, dtype=np.uint8)
+    _, buffer = cv2.imencode(".jpg", frame)
+    return base64.b64encode(buffer.tobytes()).decode()
+
+
+def test_lazy_construction():
+    """Crear el motor no construye ningún grafo"""
+    pool = MediaPipeModelPool(size=1)
+    start = time.perf_counter()
+    MediaPipeEngine(pool)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"⚡ Motor creado en {elapsed:.2f} ms")
+    assert all(stats["created"] == 0 for stats in pool.stats().values())
+
+
+def test_selected_features_only():
+    """Solo se construyen y ejecutan los grafos pedidos"""
+    pool = MediaPipeModelPool(size=1)
+    engine = MediaPipeEngine(pool)
+
+    analysis = engine.analyze_image_realtime(_frame_b64(), features={"face"})
+    print(f"👤 Análisis solo cara: {sorted(analysis)}")
+    assert "error" not in analysis
+    assert analysis["features"] == ["face"]
+    assert "face_detected" in analysis and "pose_detected" not in analysis and "hands_detected" not in analysis
+
+    stats = pool.stats()
+    assert stats["face_detection"]["created"] == 1
+    assert stats["pose"]["created"] == 0 and stats["hands"]["created"] == 0
+    assert stats["face_mesh"]["created"] == 0
+
+    analysis = engine.analyze_image_realtime(_frame_b64())
+    assert set(analysis["features"]) == ALL_FEATURES
+    assert "pose_detected" in analysis and "hands_detected" in analysis
+    # Las instancias se reutilizan entre análisis
+    assert pool.stats()["face_detection"]["created"] == 1
+    pool.close()
+
+
+def test_realtime_stream_skips_mesh_and_pose():
+    """El stream en tiempo real solo construye detección facial y manos"""
+    pool = MediaPipeModelPool(size=1)
+    original = mediapipe_engine_module.mediapipe_engine
+    mediapipe_engine_module.mediapipe_engine = MediaPipeEngine(pool)
+    try:
+        result = mediapipe_engine_module.analyze_realtime_stream(_frame_b64())
+    finally:
+        mediapipe_engine_module.mediapipe_engine = original
+    print(f"🎥 Stream: {result}")
+    assert "error" not in result and "attention_level" in result
+
+    stats = pool.stats()
+    assert stats["face_detection"]["created"] == 1 and stats["hands"]["created"] == 1
+    assert stats["face_mesh"]["created"] == 0 and stats["pose"]["created"] == 0
+    pool.close()
+
+
+def test_unknown_feature():
+    """Un análisis desconocido se reporta como error"""
+    engine = MediaPipeEngine(MediaPipeModelPool(size=1))
+    analysis = engine.analyze_image_realtime(_frame_b64(), features={"iris"})
+    assert analysis["analysis_type"] == "mediapipe_error"
+
+
+if __name__ == "__main__":
+    print("🚀 Probando motor MediaPipe...")
+    test_lazy_construction()
+    test_selected_features_only()
+    test_realtime_stream_skips_mesh_and_pose()
+    test_unknown_feature()
+    print("✅ Pruebas completadas!")
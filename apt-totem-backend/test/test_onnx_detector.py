@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el backend ONNX del detector de prendas
+(preprocesamiento y decodificación; la prueba de la sesión se omite sin
+onnxruntime y onnx)
+"""
+import sys
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.onnx_detector import letterbox, decode_predictions, OnnxYoloDetector
+
+
+def test_letterbox():
+    """Mantiene proporción, centra con relleno y entrega el tensor RGB normalizado"""
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+    image[:] = (255, 0, 0)  # azul en BGR
+
+    blob, scale, (pad_x, pad_y) = letterbox(image, 64)
+    print(f"📐 Letterbox: {blob.shape}, escala {scale}, relleno ({pad_x}, {pad_y})")
+    assert blob.shape == (3, 64, 64) and blob.dtype == np.float32
+    assert scale == 0.32 and (pad_x, pad_y) == (0, 16)
+    # Canal 2 (B en RGB) = 1.0 dentro de la imagen, relleno gris 114/255
+    assert blob[2, 32, 32] == 1.0 and blob[0, 32, 32] == 0.0
+    assert np.isclose(blob[0, 0, 0], 114 / 255)
+
+
+def test_decode_yolov8_layout():
+    """Formato (4 + clases, anclas): umbral, NMS por clase y cajas x1y1x2y2"""
+    anchors = np.array([
+        # cx, cy, w, h, clase0, clase1
+        [32, 32, 20, 20, 0.90, 0.10],
+        [33, 32, 20, 20, 0.80, 0.10],  # duplicado de la primera -> NMS
+        [32, 32, 20, 20, 0.10, 0.85],  # misma caja, otra clase -> se conserva
+        [10, 10, 8, 8, 0.05, 0.10],    # bajo el umbral
+    ], dtype=np.float32)
+
+    detections = decode_predictions(anchors.T, 2, 0.35, 0.45)
+    print(f"📦 Detecciones: {[(c, round(s, 2)) for _, s, c in detections]}")
+    assert sorted((c, round(s, 2)) for _, s, c in detections) == [(0, 0.9), (1, 0.85)]
+    assert np.allclose(detections[0][0], [22, 22, 42, 42])
+
+
+def test_decode_yolov5_layout():
+    """Formato (anclas, 5 + clases): la confianza es objectness x clase"""
+    anchors = np.array([
+        [32, 32, 20, 20, 0.5, 0.9, 0.1],   # 0.45
+        [10, 10, 8, 8, 0.2, 0.9, 0.1],     # 0.18 -> descartada
+    ], dtype=np.float32)
+
+    detections = decode_predictions(anchors, 2, 0.35, 0.45)
+    assert len(detections) == 1
+    assert detections[0][2] == 0 and np.isclose(detections[0][1], 0.45)
+    assert decode_predictions(anchors, 2, 0.5, 0.45) == []
+
+
+def test_failed_inference_does_not_hang():
+    """Si la inferencia falla, el error llega al llamador y los detect() siguientes no quedan colgados"""
+    class FlakyDetector(OnnxYoloDetector):
+        def __init__(self):
+            self._pending = []
+            self._lock = threading.Lock()
+            self._running = False
+            self.max_batch = 4
+            self.calls = 0
+
+        def _infer(self, images):
+            self.calls += 1
+            if self.calls == 1:
+                raise RuntimeError("sesión ONNX caída")
+            return [[] for _ in images]
+
+    detector = FlakyDetector()
+    image = np.zeros((8, 8, 3), dtype=np.uint8)
+    try:
+        detector.detect(image)
+        raise AssertionError("La falla debía propagarse")
+    except RuntimeError as e:
+        print(f"💥 Error propagado: {e}")
+    assert not detector._running and detector._pending == []
+    assert detector.detect(image) == []
+
+
+def _constant_model(output: np.ndarray) -> str:
+    """Modelo ONNX mínimo (entrada 1x3x64x64) que siempre entrega ``output``, sin metadata"""
+    from onnx import helper, numpy_helper, TensorProto
+    node = helper.make_node("Constant", [], ["output"], value=numpy_helper.from_array(output))
+    graph = helper.make_graph(
+        [node], "constante",
+        [helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, 64, 64])],
+        [helper.make_tensor_value_info("output", TensorProto.FLOAT, list(output.shape))]
+    )
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)])
+    model.ir_version = 8
+    path = os.path.join(tempfile.mkdtemp(), "constante.onnx")
+    with open(path, "wb") as f:
+        f.write(model.SerializeToString())
+    return path
+
+
+def test_class_names_required():
+    """Sin nombres de clases no se adivina el formato; con ellos, el v5 no corre los ids"""
+    try:
+        import onnx  # noqa: F401
+        import onnxruntime  # noqa: F401
+    except ImportError:
+        print("⏭️ onnx/onnxruntime no instalados; se omite la prueba de la sesión")
+        return
+
+    # Formato v5 (5 + 2 clases): objectness 0.9, clase 0 con 0.9
+    output = np.array([[[32, 32, 20, 20, 0.9, 0.9, 0.1]]], dtype=np.float32)
+    path = _constant_model(output)
+    try:
+        OnnxYoloDetector(path)
+        raise AssertionError("Sin metadata ni NEOTOTEM_YOLO_CLASSES debía fallar")
+    except ValueError as e:
+        print(f"🚫 {e}")
+        assert "NEOTOTEM_YOLO_CLASSES" in str(e)
+
+    detector = OnnxYoloDetector(path, class_names=["camisa", "pantalon"])
+    detections = detector.detect(np.zeros((64, 64, 3), dtype=np.uint8))
+    print(f"📦 Detecciones v5: {detections}")
+    assert [d["class"] for d in detections] == ["camisa"]
+    assert np.isclose(detections[0]["confidence"], 0.81)
+
+
+if __name__ == "__main__":
+    print("🚀 Probando backend ONNX del detector de prendas...")
+    test_letterbox()
+    test_decode_yolov8_layout()
+    test_decode_yolov5_layout()
+    test_failed_inference_does_not_hang()
+    test_class_names_required()
+    print("✅ Pruebas completadas!")
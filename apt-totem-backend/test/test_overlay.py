@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el overlay de detecciones (geometría sin JPEG)
+"""
+import sys
+import os
+from types import SimpleNamespace
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.real_detection import build_overlay, draw_detections_on_image
+
+
+def _fake_pose_landmarks():
+    landmarks = [SimpleNamespace(x=0.3 + 0.01 * i, y=0.1 + 0.02 * i) for i in range(33)]
+    landmarks[7].x, landmarks[8].x = 0.4, 0.6  # Orejas
+    return SimpleNamespace(landmark=landmarks)
+
+
+def test_overlay_boxes_normalized():
+    """Las primitivas del overlay quedan en coordenadas 0-1"""
+    analysis = {
+        "person_detected": True,
+        "age_range": "26-35",
+        "detection_confidence": 0.8,
+        "head_accessory": "gorro",
+        "bag_accessory": "mochila"
+    }
+    overlay = build_overlay(analysis, _fake_pose_landmarks(), aspect=640 / 480)
+    print(f"🟩 Overlay: {[(b['kind'], b['box']) for b in overlay['boxes']]}")
+
+    assert [b["kind"] for b in overlay["boxes"]] == ["face", "clothing", "accessory", "bag"]
+    for item in overlay["boxes"]:
+        x1, y1, x2, y2 = item["box"]
+        assert 0.0 <= x1 <= x2 <= 1.0 and 0.0 <= y1 <= y2 <= 1.0
+        assert item["color"].startswith("#")
+    assert overlay["landmarks"]
+
+
+def test_overlay_without_person():
+    """Sin persona no hay recuadros y la imagen anotada se sigue generando"""
+    overlay = build_overlay({"person_detected": False})
+    assert overlay["boxes"] == [] and overlay["landmarks"] == []
+
+    image = np.zeros((240, 320, 3), dtype=np.uint8)
+    annotated = draw_detections_on_image(image, {"person_detected": False}, overlay=overlay)
+    assert annotated.shape == image.shape
+    assert image.sum() == 0  # No modifica la imagen original
+
+
+if __name__ == "__main__":
+    print("🚀 Probando overlay de detecciones...")
+    test_overlay_boxes_normalized()
+    test_overlay_without_person()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el análisis de color restringido a la persona
+"""
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ai.real_detection import _masked_region_color, _person_mask
+
+
+def test_mask_ignores_background():
+    """Con la máscara, la pared del fondo no se reporta como color de la prenda"""
+    region = np.zeros((120, 100, 3), dtype=np.uint8)
+    region[:] = (230, 230, 230)           # pared blanca (70%)
+    region[:, 35:65] = (20, 20, 200)      # persona con polera azul (30%)
+    mask = np.zeros(region.shape[:2], dtype=np.uint8)
+    mask[:, 35:65] = 255
+
+    name, rgb, distribution = _masked_region_color(region, mask)
+    print(f"🎨 Color con máscara: {name} {rgb} {distribution}")
+    assert name == "azul"
+    assert distribution == {"azul": 1.0}
+
+
+def test_small_person_falls_back():
+    """Si la persona cubre muy poco de la región no se usa la máscara"""
+    region = np.full((100, 100, 3), 230, dtype=np.uint8)
+    mask = np.zeros((100, 100), dtype=np.uint8)
+    mask[:4, :4] = 255
+    assert _masked_region_color(region, mask) is None
+
+
+def test_person_mask_shape():
+    """La máscara de SelfieSegmentation tiene el tamaño del frame"""
+    frame = np.full((240, 320, 3), 128, dtype=np.uint8)
+    mask = _person_mask(frame)
+    assert mask is not None
+    assert mask.shape == (240, 320)
+    print(f"👤 Píxeles de persona en frame vacío: {np.count_nonzero(mask)}")
+
+
+if __name__ == "__main__":
+    print("🚀 Probando color con máscara de persona...")
+    test_mask_ignores_background()
+    test_small_person_falls_back()
+    test_person_mask_shape()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el gestor de pipelines por cámara (varios totems)
+"""
+import sys
+import os
+import asyncio
+import zlib
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.pipeline_manager import PipelineManager, CAPTURE_LEVELS, TARGET_LATENCY_MS
+
+
+def test_busy_camera_does_not_starve_others():
+    """Con un solo cupo, una cámara que envía muchos frames se alterna con la otra"""
+
+    async def run():
+        manager = PipelineManager(slots=1, weights={})
+        order = []
+
+        async def handler(camera, message):
+            order.append(camera.camera_id)
+            await asyncio.sleep(0.01)
+
+        manager.attach("entrada")
+        manager.attach("caja")
+        # caja envía cada 40 ms: holgura de sobra para esperar un frame de entrada
+        for i in range(40):
+            manager.submit("entrada", handler, {"frame": i})
+            if i % 10 == 0:
+                manager.submit("caja", handler, {"frame": i})
+            await asyncio.sleep(0.004)
+        await asyncio.sleep(0.1)
+
+        print(f"🎥 Orden de análisis: {order}")
+        assert order.count("caja") == 4
+        # La cámara ocupada descarta sus propios frames (latest-frame-wins)
+        stats = manager.stats()["cameras"]
+        print(f"📊 Stats entrada: {stats['entrada']}")
+        assert stats["entrada"]["dropped"] > 0 and stats["caja"]["dropped"] == 0
+        assert stats["entrada"]["fps"] > 0 and stats["entrada"]["latency_ms"] > 0
+
+    asyncio.run(run())
+
+
+def test_weighted_round_robin():
+    """Con cámaras siempre pendientes, los cupos se reparten según el peso"""
+    manager = PipelineManager(slots=1, weights={"entrada": 2})
+    for camera_id in ("entrada", "caja", "pasillo"):
+        camera = manager.attach(camera_id)
+        camera.scheduler.submit("frame")
+
+    picks = []
+    for _ in range(8):
+        camera = manager._next_camera()
+        picks.append(camera.camera_id)
+    print(f"⚖️ Turnos: {picks}")
+    assert picks.count("entrada") == 4 and picks.count("caja") == 2 and picks.count("pasillo") == 2
+
+
+def test_attach_detach():
+    """Una cámara vive mientras alguna conexión la use"""
+    manager = PipelineManager(slots=1, weights={})
+    first = manager.attach("entrada")
+    assert manager.attach("entrada", weight=3) is first and first.weight == 3
+    assert manager.detach("entrada") is None
+    assert manager.detach("entrada") is first
+    assert manager.get("entrada") is None and manager.stats()["cameras"] == {}
+
+
+def test_colliding_cameras_use_separate_shards():
+    """
+    Dos cámaras cuya clave cae en el mismo shard por hash reciben shards
+    distintos, y un shard nunca analiza dos frames a la vez
+    """
+    assert zlib.crc32(b"cam-entrada") % 2 == zlib.crc32(b"cam-pasillo") % 2
+
+    async def run():
+        manager = PipelineManager(slots=0, weights={}, shards=2)
+        active = {0: 0, 1: 0}
+        peak = {0: 0, 1: 0, "total": 0}
+
+        async def handler(camera, message):
+            active[camera.shard] += 1
+            peak[camera.shard] = max(peak[camera.shard], active[camera.shard])
+            peak["total"] = max(peak["total"], sum(active.values()))
+            await asyncio.sleep(0.01)
+            active[camera.shard] -= 1
+
+        cameras = [manager.attach(camera_id) for camera_id in ("entrada", "pasillo", "caja")]
+        print(f"🧩 Shards: {[(c.camera_id, c.shard) for c in cameras]}")
+        assert [c.shard for c in cameras] == [0, 1, 0]
+        for i in range(10):
+            for camera in cameras:
+                manager.submit(camera.camera_id, handler, {"frame": i})
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(0.1)
+
+        assert peak == {0: 1, 1: 1, "total": 2}
+        # entrada y caja comparten el shard 0: cada una recibe la mitad de sus fps
+        for camera in cameras:
+            camera.service_ms = 100.0
+        hints = {c.camera_id: manager.capture_hints(c)["fps"] for c in cameras}
+        print(f"🎛️ fps por cámara: {hints}")
+        assert hints == {"entrada": 4.5, "pasillo": 9.0, "caja": 4.5}
+
+    asyncio.run(run())
+
+
+def test_capture_hints():
+    """fps según la parte de cupos y el tiempo de servicio; la calidad baja con latencia alta"""
+    manager = PipelineManager(slots=1, weights={})
+    entrada = manager.attach("entrada")
+    caja = manager.attach("caja")
+
+    hints = manager.capture_hints(entrada)
+    assert (hints["max_dimension"], hints["jpeg_quality"]) == CAPTURE_LEVELS[0]
+
+    # 100 ms por frame y un cupo compartido con otra cámara activa -> ~4.5 fps
+    entrada.service_ms = caja.service_ms = 100.0
+    caja.scheduler.submit("frame")
+    hints = manager.capture_hints(entrada)
+    print(f"🎛️ Hints con dos cámaras: {hints}")
+    assert hints["fps"] == 4.5 and hints["queue_depth"] == 1
+
+    # Latencia sostenida sobre el objetivo -> baja un nivel (con histéresis)
+    entrada.latency_ms = TARGET_LATENCY_MS * 2
+    entrada._update_level(now=100.0)
+    entrada._update_level(now=100.5)
+    assert entrada.level == 1
+    hints = manager.capture_hints(entrada)
+    assert (hints["max_dimension"], hints["jpeg_quality"]) == CAPTURE_LEVELS[1]
+    entrada.latency_ms = TARGET_LATENCY_MS * 0.2
+    entrada._update_level(now=103.0)
+    assert entrada.level == 0
+
+
+if __name__ == "__main__":
+    print("🚀 Probando gestor de pipelines por cámara...")
+    test_busy_camera_does_not_starve_others()
+    test_weighted_round_robin()
+    test_attach_detach()
+    test_colliding_cameras_use_separate_shards()
+    test_capture_hints()
+    print("✅ Pruebas completadas!")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para el analizador con tracking por stream (/ws)
+"""
+import sys
+import os
+
+import numpy as np
+
+# Agregar el directorio del backend al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import services.ai.stream_analyzer as stream_analyzer
+from services.ai.stream_analyzer import StreamAnalyzer
+
+
+def _fake_frames(colors):
+    """Reemplaza el análisis real por resultados fijos (persona trackeada con color dado)"""
+    calls = []
+    sequence = iter(colors)
+
+    def fake_analyze(image_np, face_graph=None, pose_graph=None, face_override=None):
+        calls.append(face_override)
+        results = {
+            "person_detected": True,
+            "pose_detected": True,
+            "face_detected": True,
+            "detection_confidence": 0.9,
+            "age_range": "26-35",
+            "clothing_item": "camiseta",
+            "primary_color": next(sequence)
+        }
+        if face_override is not None:
+            results.update(face_override)
+        return results
+
+    return fake_analyze, calls
+
+
+def test_face_interval_and_smoothing():
+    """La cara se detecta cada N frames y el color no parpadea"""
+    colors = ["azul", "azul", "rojo", "azul", "azul", "rojo", "rojo", "rojo"]
+    fake_analyze, calls = _fake_frames(colors)
+    original = stream_analyzer.analyze_real_clothing_simple
+    stream_analyzer.analyze_real_clothing_simple = fake_analyze
+    analyzer = StreamAnalyzer(face_interval=3, window=3)
+    try:
+        image = np.zeros((120, 160, 3), dtype=np.uint8)
+        smoothed = [analyzer.analyze(image)["primary_color"] for _ in colors]
+    finally:
+        stream_analyzer.analyze_real_clothing_simple = original
+        analyzer.close()
+
+    print(f"🎨 Colores crudos:     {colors}")
+    print(f"🎨 Colores suavizados: {smoothed}")
+    assert smoothed[2] == "azul"  # Un frame aislado no cambia el atributo
+    assert smoothed[-1] == "rojo"  # Un cambio sostenido sí
+
+    face_runs = [override is None for override in calls]
+    print(f"👤 Detección facial por frame: {face_runs} | stats: {analyzer.stats()}")
+    assert face_runs == [True, False, False, False, True, False, False, False]
+
+
+if __name__ == "__main__":
+    print("🚀 Probando analizador con tracking...")
+    test_face_interval_and_smoothing()
+    print("✅ Pruebas completadas!")